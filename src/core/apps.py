@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from .cache import watch_model
+        from .config import settings
+
+        for label in settings.CACHE_TAGGED_MODELS:
+            watch_model(self.apps.get_model(label))
@@ -1,16 +1,113 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
+import json
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache as memoize
 from functools import wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from django.core.cache import cache
+from asgiref.sync import sync_to_async
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .config import settings
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable
+
+    # a string, a model (any of its rows), or a row as an instance or (model, pk)
+    Tag = str | type[models.Model] | models.Model | tuple[type[models.Model], Any]
+
+# how often callers waiting for another caller's recomputation poll the cache
+LOCK_POLL_INTERVAL = 0.05
+
+# deletes a lock only while it still holds the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+logger = logging.getLogger("default")
 
+# models whose saves and deletes invalidate their tags
+_watched_models: set[type[models.Model]] = set()
+# models used as tags without being watched, already logged
+_unwatched_models: set[type[models.Model]] = set()
+# the longest lifetime of a tagged value (timeout and stale timeout), in seconds
+_tagged_timeout = 0
+
+# recomputations of async cacheable values in progress, by event loop and key
+_flights: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Future]
+] = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """A cached return value, so `None` and falsy values are told apart from misses.
+
+    Attributes:
+        value: The return value
+        expires_at: When the value goes stale (epoch seconds); it is still served while
+            a single caller recomputes it, until the cache drops the entry
+        delta: How long the value took to compute, in seconds
+        tags: The versions of the value's tags when it was computed
+    """
 
-def cacheable(cache_key: str | Callable, timeout: int = 600) -> Callable:
+    value: Any
+    expires_at: float
+    delta: float
+    tags: dict[str, str] | None = None
+
+    def should_refresh(self, beta: float) -> bool:
+        """Whether to recompute now: always once stale, and with a probability growing
+        towards expiry (and with `delta * beta`) before, see "Optimal Probabilistic Cache
+        Stampede Prevention" (Vattani et al.)
+        """
+        if beta <= 0:
+            return time.time() >= self.expires_at
+        return (
+            time.time() - self.delta * beta * math.log(random.random())
+            >= self.expires_at
+        )
+
+
+def cacheable(
+    cache_key: str | Callable,
+    timeout: int = 600,
+    *,
+    stale_timeout: int = 60,
+    lock_timeout: int = 10,
+    beta: float = 1.0,
+    local: bool = False,
+    tags: Iterable[Tag] | Callable | None = None,
+) -> Callable:
     """A decorator to cache function return value, preventing unnecessary calls to the function.
+
+    Any return value is cached, including `None` and falsy ones. Only one caller at a time
+    recomputes a key (single-flight): on a miss the others wait for its value, and once the
+    value is stale they keep serving it meanwhile. Values may also be recomputed shortly
+    before they expire, so hot keys are refreshed ahead of time rather than all at once.
+
+    Coroutine functions are cached with the async cache API, and concurrent awaiters of a
+    key in one event loop share a single recomputation.
+
     Args:
         cache_key: The key to use for the cache, can pass in a function to generate the key,
             the function should have the same signature as the decorated function
@@ -23,27 +120,802 @@ def cacheable(cache_key: str | Callable, timeout: int = 600) -> Callable:
             1. cached values are small enough
             2. you set a shorter `timeout`
         timeout: `TTL` for a cache key, in seconds. Default to 600 seconds (10 minutes)
+        stale_timeout: How long a stale value may still be served while it is recomputed,
+            in seconds
+        lock_timeout: How long a recomputation may hold the key's lock, and callers wait
+            for it on a miss before computing the value themselves, in seconds
+        beta: Eagerness of the early refresh, 0 disables it
+        local: Also keep the value in the in-process L1 cache (see `TwoTierCache`), for
+            small and very hot values
+        tags: What the value depends on, can pass in a function (with the same signature
+            as the decorated function) to generate them; invalidating any of the tags
+            (see `invalidate_tags`) invalidates the value
+            ```
+            @cacheable(lambda pk: f'results_{pk}', tags=lambda pk: [(Question, pk)])
+            def results(pk):
+                ...
+            ```
+            tags are strings, models, model instances or (model, pk) tuples; saving or
+            deleting a row invalidates the tags of the row and of its model, once the
+            model is watched (see `watch_model`). Checking the tags costs one more cache
+            read per call
     """
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args: tuple, refresh_cache: bool = False, **kwargs: dict) -> None:
+        global _tagged_timeout
+        # the lock is always taken in the shared cache
+        store = get_local_cache() if local else cache
+        if tags is not None:
+            _tagged_timeout = max(_tagged_timeout, timeout + stale_timeout)
+        static_tags = None
+        if tags is not None and not callable(tags):
+            tags_ = list(tags)
+            # connected in every process importing the function, not only the ones
+            # computing it
+            for model in {tag_model(tag) for tag in tags_} - {None}:
+                watch_model(model)
+            static_tags = tag_keys(tags_)
+
+        def get_keys(args: tuple, kwargs: dict) -> tuple[str, list[str] | None]:
             if callable(cache_key):
                 # pass self if the function is a bound method
                 cache_key_ = cache_key(*args, **kwargs)
             else:
                 cache_key_ = cache_key
+            if callable(tags):
+                tags_ = list(tags(*args, **kwargs))
+                warn_unwatched(tags_)
+                return cache_key_, tag_keys(tags_)
+            return cache_key_, static_tags
 
-            value = cache.get(cache_key_)
-            if value and not refresh_cache:
-                return value
+        @wraps(func)
+        def wrapper(*args: tuple, refresh_cache: bool = False, **kwargs: dict) -> None:
+            cache_key_, tags_ = get_keys(args, kwargs)
+            lock_key = f"{cache_key_}:lock"
+            versions = None if tags_ is None else tag_versions(tags_)
+            token = uuid.uuid4().hex
+            locked = False
 
-            value = func(*args, **kwargs)
+            if not refresh_cache:
+                entry = get_entry(cache_key_, store)
+                if entry is not None and entry.tags != versions:
+                    # invalidated by a tag
+                    entry = None
+                if entry is not None and not entry.should_refresh(beta):
+                    return entry.value
+                locked = cache.add(lock_key, token, lock_timeout)
+                if not locked:
+                    # another caller is recomputing the value
+                    if entry is not None:
+                        return entry.value
+                    entry = wait_for_entry(cache_key_, lock_key, lock_timeout, store)
+                    if entry is not None:
+                        return entry.value
+                    # the recomputation failed or outlived its lock
+                    locked = cache.add(lock_key, token, lock_timeout)
 
-            cache.set(cache_key_, value, timeout)
+            try:
+                started_at = time.time()
+                value = func(*args, **kwargs)
+                finished_at = time.time()
+                store.set(
+                    cache_key_,
+                    CacheEntry(
+                        value,
+                        finished_at + timeout,
+                        finished_at - started_at,
+                        versions,
+                    ),
+                    timeout + stale_timeout,
+                )
+            finally:
+                if locked:
+                    release_lock(lock_key, token)
 
             return value
 
+        @wraps(func)
+        async def awrapper(
+            *args: tuple, refresh_cache: bool = False, **kwargs: dict
+        ) -> None:
+            cache_key_, tags_ = get_keys(args, kwargs)
+            lock_key = f"{cache_key_}:lock"
+            versions = None if tags_ is None else await atag_versions(tags_)
+
+            entry = None
+            if not refresh_cache:
+                entry = await aget_entry(cache_key_, store)
+                if entry is not None and entry.tags != versions:
+                    # invalidated by a tag
+                    entry = None
+                if entry is not None and not entry.should_refresh(beta):
+                    return entry.value
+
+            async def recompute() -> Any:
+                token = uuid.uuid4().hex
+                locked = False
+                if not refresh_cache:
+                    locked = await cache.aadd(lock_key, token, lock_timeout)
+                if not refresh_cache and not locked:
+                    # another process is recomputing the value
+                    if entry is not None:
+                        return entry.value
+                    waited = await await_for_entry(
+                        cache_key_, lock_key, lock_timeout, store
+                    )
+                    if waited is not None:
+                        return waited.value
+                    locked = await cache.aadd(lock_key, token, lock_timeout)
+
+                try:
+                    started_at = time.time()
+                    value = await func(*args, **kwargs)
+                    finished_at = time.time()
+                    await store.aset(
+                        cache_key_,
+                        CacheEntry(
+                            value,
+                            finished_at + timeout,
+                            finished_at - started_at,
+                            versions,
+                        ),
+                        timeout + stale_timeout,
+                    )
+                finally:
+                    if locked:
+                        await arelease_lock(lock_key, token)
+                return value
+
+            if refresh_cache:
+                return await recompute()
+
+            flights = _flights.setdefault(asyncio.get_running_loop(), {})
+            flight = flights.get(cache_key_)
+            if flight is None:
+                flight = asyncio.ensure_future(recompute())
+                flights[cache_key_] = flight
+                flight.add_done_callback(
+                    lambda done: (
+                        flights.pop(cache_key_)
+                        if flights.get(cache_key_) is done
+                        else None
+                    )
+                )
+            elif entry is not None:
+                # another coroutine is recomputing the value
+                return entry.value
+            # a cancelled awaiter does not cancel the others
+            return await asyncio.shield(flight)
+
+        return awrapper if inspect.iscoroutinefunction(func) else wrapper
+
+    return decorator
+
+
+def cacheable_many(
+    cache_key: Callable,
+    timeout: int = 600,
+    *,
+    default: Any = None,
+    local: bool = False,
+) -> Callable:
+    """A decorator to cache the per-id values of a list-in/list-out function.
+
+    The decorated function takes the ids as its first argument and returns a dict of
+    id -> value. A call reads every id's value with one `get_many`, calls the function
+    once for the missing ids only and writes the new values with one `set_many`.
+    ```
+    @cacheable_many(lambda user_id: f'unread_{user_id}')
+    def unread_counts(user_ids):
+        return dict(
+            Notification.objects.filter(user__in=user_ids, read=False)
+            .values_list('user').annotate(Count('pk'))
+        )
+    ```
+
+    Args:
+        cache_key: A function generating the key of one id, it is called with the id
+            and the other arguments of the decorated function
+        timeout: `TTL` for a cache key, in seconds. Default to 600 seconds (10 minutes)
+        default: The value of ids the function leaves out, cached too
+        local: Also keep the values in the in-process L1 cache (see `TwoTierCache`)
+    """
+
+    def decorator(func: Callable) -> Callable:
+        store = get_local_cache() if local else cache
+
+        @wraps(func)
+        def wrapper(
+            ids: Iterable, *args: tuple, refresh_cache: bool = False, **kwargs: dict
+        ) -> dict:
+            keys = {id_: cache_key(id_, *args, **kwargs) for id_ in ids}
+            values = {}
+            if not refresh_cache:
+                entries = store.get_many(keys.values())
+                for id_, key in keys.items():
+                    entry = entries.get(key)
+                    # values cached before entries were introduced count as misses
+                    if isinstance(entry, CacheEntry):
+                        values[id_] = entry.value
+
+            missing = [id_ for id_ in keys if id_ not in values]
+            if missing:
+                started_at = time.time()
+                computed = func(missing, *args, **kwargs)
+                finished_at = time.time()
+                delta = (finished_at - started_at) / len(missing)
+                new_entries = {}
+                for id_ in missing:
+                    values[id_] = computed.get(id_, default)
+                    new_entries[keys[id_]] = CacheEntry(
+                        values[id_], finished_at + timeout, delta
+                    )
+                store.set_many(new_entries, timeout)
+
+            return {id_: values[id_] for id_ in keys}
+
         return wrapper
 
     return decorator
+
+
+def get_entry(cache_key: str, store: BaseCache = cache) -> CacheEntry | None:
+    entry = store.get(cache_key)
+    # values cached before entries were introduced count as misses
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+def wait_for_entry(
+    cache_key: str, lock_key: str, lock_timeout: int, store: BaseCache = cache
+) -> CacheEntry | None:
+    """Wait for the caller holding `lock_key` to cache the value, up to `lock_timeout`."""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = get_entry(cache_key, store)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            # the recomputation failed
+            return None
+    return None
+
+
+def release_lock(lock_key: str, token: str) -> None:
+    """Delete the lock if the caller still holds it, and not another caller that took
+    it over once it expired.
+    """
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if isinstance(backend, RedisCache):
+        key = backend.make_and_validate_key(lock_key)
+        client = backend._cache.get_client(key, write=True)
+        client.eval(
+            RELEASE_LOCK_SCRIPT, 1, key, backend._cache._serializer.dumps(token)
+        )
+    elif backend.get(lock_key) == token:
+        # not atomic on other backends, the lock may expire in between
+        backend.delete(lock_key)
+
+
+async def arelease_lock(lock_key: str, token: str) -> None:
+    """Async `release_lock`."""
+    await sync_to_async(release_lock)(lock_key, token)
+
+
+async def aget_entry(cache_key: str, store: BaseCache = cache) -> CacheEntry | None:
+    """Async `get_entry`."""
+    entry = await store.aget(cache_key)
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+async def await_for_entry(
+    cache_key: str, lock_key: str, lock_timeout: int, store: BaseCache = cache
+) -> CacheEntry | None:
+    """Async `wait_for_entry`."""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await aget_entry(cache_key, store)
+        if entry is not None:
+            return entry
+        if await cache.aget(lock_key) is None:
+            return None
+    return None
+
+
+def tag_model(tag: Tag) -> type[models.Model] | None:
+    """Return the model of a model or row tag."""
+    if isinstance(tag, str):
+        return None
+    if isinstance(tag, tuple):
+        return tag[0]
+    return type(tag) if isinstance(tag, models.Model) else tag
+
+
+def tag_key(tag: Tag) -> str:
+    """Return the cache key of the tag's version."""
+    if isinstance(tag, str):
+        return f"core.cache:tag:{tag}"
+    if isinstance(tag, tuple):
+        model, pk = tag
+    elif isinstance(tag, models.Model):
+        model, pk = type(tag), tag.pk
+    else:
+        model, pk = tag, None
+    label = model._meta.label_lower
+    return f"core.cache:tag:model:{label}" + ("" if pk is None else f":{pk}")
+
+
+def tag_keys(tags: Iterable[Tag]) -> list[str]:
+    return sorted({tag_key(tag) for tag in tags})
+
+
+def tag_timeout() -> int:
+    """Return the lifetime of tag versions, which outlive every tagged value.
+
+    A dropped version reads as a new one and invalidates the values tagged with it, so
+    the lifetime bounds the versions kept (one per row ever saved) without ever making
+    values stale.
+    """
+    return max(settings.CACHE_TAG_TIMEOUT, _tagged_timeout)
+
+
+def tag_versions(keys: list[str]) -> dict[str, str]:
+    """Return the current version of each tag key, creating missing ones."""
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, tag_timeout())
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+async def atag_versions(keys: list[str]) -> dict[str, str]:
+    """Async `tag_versions`."""
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, uuid.uuid4().hex, tag_timeout())
+        versions.update(await cache.aget_many(missing))
+    return versions
+
+
+def invalidate_tags(*tags: Tag) -> None:
+    """Invalidate every value cached with any of the tags, once the transaction commits.
+
+    Needed after changes that send no signals, like `QuerySet.update()`.
+    """
+    versions = {tag_key(tag): uuid.uuid4().hex for tag in tags}
+    transaction.on_commit(lambda: cache.set_many(versions, tag_timeout()))
+
+
+def watch_model(model: type[models.Model]) -> None:
+    """Invalidate the tags of the model and of its rows when rows are saved or deleted.
+
+    Every process saving rows must watch the model, not only the ones computing tagged
+    values: `cacheable` watches the models of static tags when it decorates, and
+    `CoreConfig.ready()` the `CACHE_TAGGED_MODELS`, which must list the models only
+    tagged by tag functions.
+    """
+    if model in _watched_models:
+        return
+    _watched_models.add(model)
+    uid = f"core.cache:{model._meta.label_lower}"
+    post_save.connect(invalidate_row, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(invalidate_row, sender=model, weak=False, dispatch_uid=uid)
+
+
+def unwatch_model(model: type[models.Model]) -> None:
+    """Undo `watch_model`, the receivers are never garbage collected otherwise."""
+    _watched_models.discard(model)
+    uid = f"core.cache:{model._meta.label_lower}"
+    post_save.disconnect(sender=model, dispatch_uid=uid)
+    post_delete.disconnect(sender=model, dispatch_uid=uid)
+
+
+def warn_unwatched(tags: Iterable[Tag]) -> None:
+    """Log the models of the tags not watched, once each, as their values go stale."""
+    for model in {tag_model(tag) for tag in tags} - {None}:
+        if model not in _watched_models and model not in _unwatched_models:
+            _unwatched_models.add(model)
+            logger.warning(
+                "%s is used as a cache tag but not in CACHE_TAGGED_MODELS, saving its"
+                " rows does not invalidate the tagged values",
+                model._meta.label,
+            )
+
+
+def invalidate_row(sender: type[models.Model], instance: models.Model, **kwargs):
+    invalidate_tags(sender, (sender, instance.pk))
+
+
+def key_namespace(key: str) -> str:
+    """Return the namespace of a cache key, the part before its last colon."""
+    return key.rpartition(":")[0]
+
+
+class LocalCache:
+    """An in-process LRU cache, bounded by entry count and total pickled size.
+
+    Values are stored pickled, like in the local-memory backend, so callers never share
+    mutable values and sizes are known.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        # key -> (pickled value, expiry on the monotonic clock)
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return default
+            if item[1] <= time.monotonic():
+                self._pop(key)
+                return default
+            self._entries.move_to_end(key)
+        return pickle.loads(item[0])  # noqa: S301
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._pop(key)
+            if len(pickled) > self.max_bytes:
+                return
+            self._entries[key] = (pickled, time.monotonic() + timeout)
+            self.size += len(pickled)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._pop(key)
+
+    def delete_namespace(self, namespace: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if key_namespace(k) == namespace]:
+                self._pop(key)
+
+    def namespaces(self) -> set[str]:
+        with self._lock:
+            return {key_namespace(key) for key in self._entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key: str) -> bool:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return False
+        self.size -= len(item[0])
+        return True
+
+
+class VersionKeyInvalidation:
+    """Cross-worker L1 invalidation through version keys in the L2 cache, one per key
+    namespace (see `key_namespace`).
+
+    Every write bumps the version of its namespace; each worker compares the versions
+    of the namespaces in its L1 at most every `check_interval` seconds, and evicts the
+    namespaces whose version moved.
+    """
+
+    def __init__(self, local: LocalCache, l2: str, check_interval: float) -> None:
+        self.local = local
+        self.l2 = l2
+        self.check_interval = check_interval
+        # namespace -> version when its L1 entries were read
+        self._versions: dict[str, int | None] = {}
+        self._checked_at = -math.inf
+        self._lock = threading.Lock()
+
+    def version_key(self, namespace: str) -> str:
+        return f"core.cache:l1_version:{namespace}"
+
+    def check(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        # forget the namespaces left with no entries
+        namespaces = self.local.namespaces()
+        with self._lock:
+            known = {ns: v for ns, v in self._versions.items() if ns in namespaces}
+            self._versions = known
+        if not known:
+            return
+        keys = {self.version_key(namespace): namespace for namespace in known}
+        versions = caches[self.l2].get_many(keys)
+        for key, namespace in keys.items():
+            version = versions.get(key)
+            if version != known[namespace]:
+                self.local.delete_namespace(namespace)
+                with self._lock:
+                    self._versions[namespace] = version
+
+    def track(self, key: str) -> None:
+        """Record the version of the key's namespace, before the key is read from the L2."""
+        namespace = key_namespace(key)
+        if namespace not in self._versions:
+            version = caches[self.l2].get(self.version_key(namespace))
+            with self._lock:
+                self._versions.setdefault(namespace, version)
+
+    def publish(self, keys: Iterable[str] | None) -> None:
+        if keys is None:
+            # the L2 was cleared along with the versions
+            with self._lock:
+                self._versions.clear()
+            return
+        l2 = caches[self.l2]
+        for namespace in {key_namespace(key) for key in keys}:
+            key = self.version_key(namespace)
+            # a random start, so versions restarted after a clear are not mistaken
+            # for the old ones
+            l2.add(key, random.getrandbits(62), None)
+            version = l2.incr(key)
+            known = self._versions.get(namespace)
+            # evict anyway if another worker wrote since the last check
+            if known is None or version != known + 1:
+                self.local.delete_namespace(namespace)
+            with self._lock:
+                self._versions[namespace] = version
+
+
+class PubSubInvalidation:
+    """Cross-worker L1 invalidation over a Redis pub/sub channel.
+
+    Written keys are published; a daemon thread of each worker evicts them from its L1.
+    Messages missed while disconnected are bounded by the L1 timeout.
+    """
+
+    def __init__(self, local: LocalCache, location: str, channel: str) -> None:
+        import redis
+
+        self.local = local
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.client = redis.Redis.from_url(location)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: self._receive})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def check(self) -> None:
+        pass
+
+    def track(self, key: str) -> None:
+        pass
+
+    def publish(self, keys: Iterable[str] | None) -> None:
+        """Publish written keys, or None when the whole cache was cleared."""
+        keys = None if keys is None else list(keys)
+        self.client.publish(self.channel, json.dumps([self.origin, keys]))
+
+    def _receive(self, message: dict) -> None:
+        origin, keys = json.loads(message["data"])
+        if origin == self.origin:
+            return
+        if keys is None:
+            self.local.clear()
+        for key in keys or ():
+            self.local.delete(key)
+
+
+# process wide L1 caches of the `TwoTierCache` instances, by location
+_l1_caches: dict[str, tuple[LocalCache, Any]] = {}
+_l1_caches_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """A cache backend keeping values of another cache (L2) in an in-process LRU (L1).
+
+    Reads are served from the L1 when possible, writes go to both and are published to
+    the other workers, which evict their L1 copy (see `PubSubInvalidation` and
+    `VersionKeyInvalidation`). Workers may serve a value overwritten elsewhere for up to
+    `CACHE_L1_CHECK_INTERVAL` (or until the invalidation arrives), and never for longer
+    than the L1 timeout. Values read from the L2 are not kept past their L2 expiry where
+    it is known: `cacheable` entries carry theirs and a Redis L2 reports its TTLs; other
+    values of other L2 backends are kept for the L1 timeout.
+    ```
+    CACHES = {
+        "default": {...},
+        "local": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "local",
+            "OPTIONS": {"L2": "default", "MAX_ENTRIES": 1024, "MAX_BYTES": 8388608},
+        },
+    }
+    ```
+    Options default to the `CACHE_L1_*` settings; `L1_TIMEOUT`, `PUBSUB_LOCATION` and
+    `CHECK_INTERVAL` are also accepted.
+    """
+
+    def __init__(self, location: str, params: dict) -> None:
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.l2_alias = options.get("L2", "default")
+        self.l1_timeout = options.get("L1_TIMEOUT", settings.CACHE_L1_TIMEOUT)
+        name = location or self.l2_alias
+        with _l1_caches_lock:
+            if name not in _l1_caches:
+                local = LocalCache(
+                    options.get("MAX_ENTRIES", settings.CACHE_L1_MAX_ENTRIES),
+                    options.get("MAX_BYTES", settings.CACHE_L1_MAX_BYTES),
+                )
+                pubsub = options.get(
+                    "PUBSUB_LOCATION", settings.CACHE_L1_PUBSUB_LOCATION
+                )
+                if pubsub:
+                    invalidation = PubSubInvalidation(
+                        local, pubsub, f"core.cache:l1_invalidation:{name}"
+                    )
+                else:
+                    invalidation = VersionKeyInvalidation(
+                        local,
+                        self.l2_alias,
+                        options.get("CHECK_INTERVAL", settings.CACHE_L1_CHECK_INTERVAL),
+                    )
+                _l1_caches[name] = (local, invalidation)
+        self.local, self.invalidation = _l1_caches[name]
+
+    @property
+    def l2(self) -> BaseCache:
+        return caches[self.l2_alias]
+
+    def _l1_timeout(self, timeout: float | None) -> float:
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+
+    def get(self, key: str, default: Any = None, version: int | None = None) -> Any:
+        l1_key = self.make_and_validate_key(key, version)
+        self.invalidation.check()
+        value = self.local.get(l1_key, self._missing_key)
+        if value is not self._missing_key:
+            return value
+        self.invalidation.track(l1_key)
+        value = self.l2.get(key, self._missing_key, version=version)
+        if value is self._missing_key:
+            return default
+        self._set_local({key: value}, version)
+        return value
+
+    def get_many(self, keys: Iterable[str], version: int | None = None) -> dict:
+        self.invalidation.check()
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(
+                self.make_and_validate_key(key, version), self._missing_key
+            )
+            if value is self._missing_key:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            for key in missing:
+                self.invalidation.track(self.make_key(key, version))
+            fetched = self.l2.get_many(missing, version=version)
+            self._set_local(fetched, version)
+            found.update(fetched)
+        return found
+
+    def _set_local(self, values: dict, version: int | None) -> None:
+        """Keep values read from the L2 in the L1, not beyond their L2 expiry when known."""
+        now = time.time()
+        ttls = {}
+        for key, value in values.items():
+            if isinstance(value, CacheEntry):
+                # the L2 keeps `cacheable` entries until they are stale and more
+                ttls[key] = value.expires_at - now
+        if isinstance(self.l2, RedisCache):
+            redis_keys = [key for key in values if key not in ttls]
+            if redis_keys:
+                ttls.update(
+                    zip(redis_keys, self._redis_ttls(redis_keys, version), strict=True)
+                )
+        for key, value in values.items():
+            timeout = min(ttls.get(key, self.l1_timeout), self.l1_timeout)
+            if timeout > 0:
+                self.local.set(self.make_key(key, version), value, timeout)
+
+    def _redis_ttls(self, keys: list[str], version: int | None) -> list[float]:
+        """Return the remaining TTL of the L2 keys, in seconds."""
+        l2_keys = [self.l2.make_and_validate_key(key, version) for key in keys]
+        pipeline = self.l2._cache.get_client(write=False).pipeline(transaction=False)
+        for l2_key in l2_keys:
+            pipeline.pttl(l2_key)
+        # -1 for keys without expiry, -2 for keys already dropped
+        return [math.inf if ttl == -1 else ttl / 1000 for ttl in pipeline.execute()]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> None:
+        l1_key = self.make_and_validate_key(key, version)
+        self.l2.set(key, value, timeout, version=version)
+        self.invalidation.publish([l1_key])
+        self.local.set(l1_key, value, self._l1_timeout(timeout))
+
+    def set_many(
+        self,
+        data: dict,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> list:
+        failed = self.l2.set_many(data, timeout, version=version)
+        l1_keys = {key: self.make_and_validate_key(key, version) for key in data}
+        self.invalidation.publish(l1_keys.values())
+        for key, value in data.items():
+            if key not in failed:
+                self.local.set(l1_keys[key], value, self._l1_timeout(timeout))
+        return failed
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> bool:
+        l1_key = self.make_and_validate_key(key, version)
+        if not self.l2.add(key, value, timeout, version=version):
+            return False
+        self.invalidation.publish([l1_key])
+        self.local.set(l1_key, value, self._l1_timeout(timeout))
+        return True
+
+    def touch(
+        self,
+        key: str,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> bool:
+        return self.l2.touch(key, timeout, version=version)
+
+    def incr(self, key: str, delta: int = 1, version: int | None = None) -> int:
+        l1_key = self.make_and_validate_key(key, version)
+        value = self.l2.incr(key, delta, version=version)
+        self.local.delete(l1_key)
+        self.invalidation.publish([l1_key])
+        return value
+
+    def delete(self, key: str, version: int | None = None) -> bool:
+        l1_key = self.make_and_validate_key(key, version)
+        deleted = self.l2.delete(key, version=version)
+        self.local.delete(l1_key)
+        self.invalidation.publish([l1_key])
+        return deleted
+
+    def delete_many(self, keys: Iterable[str], version: int | None = None) -> None:
+        keys = list(keys)
+        self.l2.delete_many(keys, version=version)
+        l1_keys = [self.make_and_validate_key(key, version) for key in keys]
+        for l1_key in l1_keys:
+            self.local.delete(l1_key)
+        self.invalidation.publish(l1_keys)
+
+    def clear(self) -> None:
+        self.l2.clear()
+        self.local.clear()
+        self.invalidation.publish(None)
+
+
+@memoize
+def get_local_cache() -> TwoTierCache:
+    """Return the two-tier cache over the default cache, used by `cacheable(local=True)`."""
+    return TwoTierCache("cacheable", {"OPTIONS": {"L2": "default"}})
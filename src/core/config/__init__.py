@@ -8,6 +8,7 @@ from core.config.filtration import FiltrationSettings
 from core.config.frontend import FrontendRedirectSettings
 from core.config.messaging import MessagingSettings
 from core.config.notification import NotificationSettings
+from core.config.polls import PollsSettings
 from core.config.sftp import SftpSettings
 from core.config.short_url import ShortUrlSettings
 from core.config.storage import StorageSettings
@@ -47,6 +48,7 @@ class Settings(
     FiltrationSettings,
     CacheSettings,
     MessagingSettings,
+    PollsSettings,
 ):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -6,5 +6,22 @@ class CacheSettings(BaseSettings):
     CACHE_BACKEND: str = "django.core.cache.backends.redis.RedisCache"
     CACHE_LOCATION: str = "redis://127.0.0.1:6379"
 
+    # models ("app_label.ModelName") whose saves invalidate the cacheable values
+    # tagged by tag functions, watched by every process at startup
+    CACHE_TAGGED_MODELS: list[str] = []
+    # lifetime of the tag versions (seconds), raised to the longest lifetime of the
+    # values tagged in the process
+    CACHE_TAG_TIMEOUT: int = 86400
+
     # chart cache (seconds)
     CHART_CACHE_TIMEOUT: int = 288000
+
+    # in-process L1 cache in front of the Django cache, see core.cache.TwoTierCache
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_L1_MAX_BYTES: int = 8_388_608
+    # L1 lifetime (seconds), bounds staleness when an invalidation is missed
+    CACHE_L1_TIMEOUT: int = 10
+    # Redis URL of the invalidation channel; when unset workers compare the version
+    # keys of their L1 key namespaces every CACHE_L1_CHECK_INTERVAL seconds instead
+    CACHE_L1_PUBSUB_LOCATION: str | None = None
+    CACHE_L1_CHECK_INTERVAL: float = 1.0
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pydantic_settings import BaseSettings
+
+
+class PollsSettings(BaseSettings):
+    # write-behind vote buffer
+    ENABLE_VOTE_BUFFER: bool = False
+    VOTE_BUFFER_BACKEND: str = "polls.buffers.LocalVoteBuffer"
+    # defaults to CACHE_LOCATION when unset
+    VOTE_BUFFER_LOCATION: str | None = None
+    # flush interval (seconds)
+    VOTE_BUFFER_FLUSH_INTERVAL: int = 5
+
+    # sharded vote counters
+    VOTE_SHARD_MAX_COUNT: int = 64
+    # compaction interval (seconds)
+    VOTE_SHARD_COMPACT_INTERVAL: int = 30
+    # grow the shard count of questions whose vote UPDATEs keep waiting on locks
+    ENABLE_VOTE_SHARD_AUTOSCALE: bool = False
+    VOTE_SHARD_CONTENTION_THRESHOLD_MS: int = 50
+    VOTE_SHARD_CONTENTION_LIMIT: int = 20
+    # window (seconds) the slow votes are counted in
+    VOTE_SHARD_CONTENTION_WINDOW: int = 10
+
+    # results fragment cache, entries of stale versions expire after the timeout
+    ENABLE_RESULTS_CACHE: bool = True
+    RESULTS_CACHE_TIMEOUT: int = 3600
+    # lifetime (seconds) of the results versions, longer than the entries cached
+    # under them; a version reseeded after it expired is a new one
+    RESULTS_VERSION_TIMEOUT: int = 86400
+
+    # append-only vote log, votes are counted into Choice.votes by the rollup
+    ENABLE_VOTE_LOG: bool = False
+    # events per bulk INSERT, 1 inserts every vote right away
+    VOTE_LOG_BATCH_SIZE: int = 100
+    # flush interval (seconds) of partial batches
+    VOTE_LOG_FLUSH_INTERVAL: int = 1
+    # rollup interval (seconds)
+    VOTE_ROLLUP_INTERVAL: int = 30
+    # events younger than this (seconds) wait for the next rollup, so ids taken
+    # by still open transactions are not skipped
+    VOTE_ROLLUP_LAG: int = 5
+
+    # URL names of the polls views served by their async variants under ASGI,
+    # e.g. ["detail", "results", "vote"]
+    ASYNC_POLLS_VIEWS: list[str] = []
+
+    # live results over websockets, at most one broadcast per question per tick
+    LIVE_RESULTS_TICK_MS: int = 250
+
+    # text search configuration of the PostgreSQL search indexes
+    POLLS_SEARCH_CONFIG: str = "english"
+
+    # deferred signal handlers, events are dispatched when the window closes or
+    # the batch is full
+    DEFERRED_SIGNALS_WINDOW_MS: int = 200
+    DEFERRED_SIGNALS_MAX_BATCH_SIZE: int = 500
+
+    # vote time series, minute buckets are folded into hours and hours into days
+    # once older than their retention
+    ENABLE_VOTE_TIMESERIES: bool = True
+    VOTE_MINUTE_BUCKET_RETENTION_HOURS: int = 48
+    VOTE_HOUR_BUCKET_RETENTION_DAYS: int = 60
+    # compaction interval (seconds)
+    VOTE_BUCKET_COMPACT_INTERVAL: int = 3600
+    # flush interval (seconds) of the time series and trending counts of votes
+    # applied directly, which are kept in process until then
+    VOTE_SERIES_FLUSH_INTERVAL: int = 5
+
+    # demographic cube of logged votes, dimension name -> voter field path
+    # (from the user model); rebuild the cube after changing the dimensions
+    ENABLE_DEMOGRAPHIC_CUBE: bool = True
+    DEMOGRAPHIC_DIMENSIONS: dict[str, str] = {
+        "skill_level": "profile__skill_level",
+        "preferred_language": "preferred_language",
+    }
+
+    # max-age (seconds) of the frozen results pages of closed polls
+    CLOSED_RESULTS_MAX_AGE: int = 86400
+
+    # one vote per signed-in user or session and question, enforced by a unique
+    # receipt; an in-memory Bloom filter of the receipts can spare repeat voters
+    # their failed INSERT, measure with benchmark_duplicate_votes first
+    ENABLE_ONE_VOTE_PER_VOTER: bool = False
+    ENABLE_VOTER_FILTER: bool = False
+    VOTER_FILTER_CAPACITY: int = 100_000
+    VOTER_FILTER_ERROR_RATE: float = 0.01
+    # lifetime (seconds) of the cached and in-process filters, new voters of
+    # other processes are picked up when they are rebuilt
+    VOTER_FILTER_TTL: int = 300
+
+    # trending polls, ranked by votes decaying by half every half-life; scores
+    # counted before the half-life changes keep the old one
+    ENABLE_TRENDING: bool = True
+    TRENDING_HALF_LIFE_HOURS: float = 6.0
+    TRENDING_PAGE_SIZE: int = 20
@@ -0,0 +1,18 @@
+"""
+Fixtures shared by the core tests.
+"""
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """
+    A local-memory default cache, emptied after the test.
+    """
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    cache.clear()
@@ -0,0 +1,435 @@
+"""
+cacheable decorator tests.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from django.apps import apps
+from django.core.cache import cache, caches
+from django.utils import timezone
+
+from core.cache import (
+    CacheEntry,
+    LocalCache,
+    _unwatched_models,
+    _watched_models,
+    cacheable,
+    cacheable_many,
+    get_local_cache,
+    invalidate_tags,
+    tag_key,
+    tag_timeout,
+    unwatch_model,
+)
+from core.config import settings as core_settings
+from polls.models import Question
+
+
+@pytest.fixture(autouse=True)
+def watched_models():
+    watched = set(_watched_models)
+    yield
+    # the receivers are connected for good
+    for model in _watched_models - watched:
+        unwatch_model(model)
+    _unwatched_models.clear()
+
+
+def counting(value, **options):
+    calls = []
+
+    @cacheable(lambda: "test:value", **options)
+    def compute():
+        calls.append(1)
+        return value
+
+    return compute, calls
+
+
+@pytest.mark.parametrize("value", [None, 0, [], {}, ""])
+def test_falsy_values_are_cached(value):
+    compute, calls = counting(value)
+
+    assert compute() == value
+    assert compute() == value
+    assert len(calls) == 1
+
+
+def test_refresh_cache_recomputes():
+    compute, calls = counting(1)
+
+    compute()
+    compute(refresh_cache=True)
+
+    assert len(calls) == 2
+
+
+def test_values_cached_before_entries_are_misses():
+    cache.set("test:value", 5)
+    compute, calls = counting(1)
+
+    assert compute() == 1
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    @cacheable("test:slow", beta=0)
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(slow())) for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+
+
+def test_stale_value_is_served_while_recomputed():
+    cache.set("test:value", CacheEntry("stale", time.time() - 1, 0.1))
+    compute, calls = counting("fresh")
+
+    cache.add("test:value:lock", 1)
+    assert compute() == "stale"
+    assert calls == []
+
+    cache.delete("test:value:lock")
+    assert compute() == "fresh"
+    assert compute() == "fresh"
+    assert len(calls) == 1
+
+
+def test_waiter_takes_the_lock_after_a_failed_recomputation():
+    locks = []
+
+    @cacheable("test:value")
+    def compute():
+        locks.append(cache.get("test:value:lock"))
+        return "value"
+
+    cache.add("test:value:lock", "other")
+    threading.Timer(0.1, cache.delete, ["test:value:lock"]).start()
+
+    assert compute() == "value"
+    assert locks[0] not in (None, "other")
+    assert cache.get("test:value:lock") is None
+
+
+def test_lock_of_another_caller_is_kept():
+    compute, calls = counting("value", lock_timeout=0.1)
+
+    # taken over by another caller, after a recomputation outlived it
+    cache.add("test:value:lock", "other")
+
+    assert compute() == "value"
+    assert len(calls) == 1
+    assert cache.get("test:value:lock") == "other"
+
+
+def test_early_refresh():
+    entry = CacheEntry("value", time.time() + 60, delta=1.0)
+
+    assert not entry.should_refresh(beta=0)
+    assert entry.should_refresh(beta=1e9)
+    assert CacheEntry("value", time.time() - 1, delta=0).should_refresh(beta=0)
+
+
+@pytest.fixture
+def two_tier(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        # two workers, each with its own L1
+        "worker1": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "worker1",
+            "OPTIONS": {"CHECK_INTERVAL": 0},
+        },
+        "worker2": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "worker2",
+            "OPTIONS": {"CHECK_INTERVAL": 0},
+        },
+    }
+    yield caches["worker1"], caches["worker2"]
+    caches["worker1"].clear()
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, max_bytes=1000)
+    local.set("a", 1, 60)
+    local.set("b", 2, 60)
+    local.get("a")
+    local.set("c", 3, 60)
+
+    assert local.get("a") == 1
+    assert local.get("b") is None
+    assert local.get("c") == 3
+
+
+def test_local_cache_is_bounded_by_size():
+    local = LocalCache(max_entries=100, max_bytes=200)
+    local.set("a", "x" * 100, 60)
+    local.set("b", "y" * 100, 60)
+    local.set("too big", "z" * 300, 60)
+
+    assert local.size <= 200
+    assert local.get("too big") is None
+    assert local.get("a") is None
+    assert local.get("b") == "y" * 100
+
+
+def test_local_cache_expires():
+    local = LocalCache(max_entries=10, max_bytes=1000)
+    local.set("a", 1, 0)
+
+    assert local.get("a", "missing") == "missing"
+    assert len(local) == 0
+
+
+def test_two_tier_serves_hits_from_l1(two_tier):
+    worker1, _ = two_tier
+    worker1.set("key", [1, 2])
+    # bypassing the two-tier cache, so nothing is invalidated
+    cache.set("key", "changed")
+
+    assert worker1.get("key") == [1, 2]
+    assert worker1.get("missing", "default") == "default"
+    assert worker1.get_many(["key", "missing"]) == {"key": [1, 2]}
+
+
+def test_two_tier_invalidates_other_workers(two_tier):
+    worker1, worker2 = two_tier
+    worker1.set("key", "old")
+    assert worker2.get("key") == "old"
+
+    worker1.set("key", "new")
+    assert worker2.get("key") == "new"
+
+    worker1.delete("key")
+    assert worker2.get("key") is None
+
+
+def test_two_tier_invalidates_the_written_namespace_only(two_tier):
+    worker1, worker2 = two_tier
+    worker1.set("results:1", "old")
+    worker1.set("charts:1", "chart")
+    assert worker2.get("results:1") == "old"
+    assert worker2.get("charts:1") == "chart"
+    # bypassing the two-tier cache, so nothing is invalidated
+    cache.set("charts:1", "changed")
+
+    worker1.set("results:2", "new")
+
+    assert worker2.get("charts:1") == "chart"
+    assert worker2.local.namespaces() == {worker2.make_key("charts")}
+    assert worker2.get("results:1") == "old"
+
+
+def test_two_tier_keeps_entries_no_longer_than_the_l2(two_tier):
+    worker1, _ = two_tier
+    cache.set("value", CacheEntry("value", time.time() + 0.1, 0.0), 1)
+    cache.set("stale", CacheEntry("stale", time.time() - 1, 0.0), 1)
+
+    assert worker1.get("value").value == "value"
+    assert worker1.get_many(["stale"])["stale"].value == "stale"
+    assert worker1.local.get(worker1.make_key("stale")) is None
+    time.sleep(0.1)
+    assert worker1.local.get(worker1.make_key("value")) is None
+
+
+def test_local_cacheable_skips_the_shared_cache():
+    get_local_cache().local.clear()
+    compute, calls = counting("value", local=True)
+
+    assert compute() == "value"
+    cache.delete("test:value")
+    assert compute() == "value"
+    assert len(calls) == 1
+    get_local_cache().local.clear()
+
+
+@pytest.mark.django_db
+def test_tags_invalidate_values(django_capture_on_commit_callbacks):
+    compute, calls = counting("value", tags=["charts"])
+    compute()
+    compute()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        invalidate_tags("charts")
+    compute()
+
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+def test_tag_versions_expire(monkeypatch, django_capture_on_commit_callbacks):
+    monkeypatch.setattr("core.cache._tagged_timeout", 0)
+    monkeypatch.setattr(core_settings, "CACHE_TAG_TIMEOUT", 60)
+    counting("value", timeout=600, stale_timeout=30, tags=["charts"])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        invalidate_tags("charts")
+
+    expires_at = cache._expire_info[cache.make_key(tag_key("charts"))]
+    assert tag_timeout() == 630
+    assert time.time() < expires_at <= time.time() + 630
+
+
+@pytest.mark.django_db
+def test_saves_invalidate_model_tags(monkeypatch, django_capture_on_commit_callbacks):
+    first = Question.objects.create(question_text="First?", pub_date=timezone.now())
+    other = Question.objects.create(question_text="Other?", pub_date=timezone.now())
+    calls = []
+    monkeypatch.setattr(core_settings, "CACHE_TAGGED_MODELS", ["polls.Question"])
+    apps.get_app_config("core").ready()
+
+    @cacheable(lambda pk: f"test:question:{pk}", tags=lambda pk: [(Question, pk)])
+    def question_text(pk):
+        calls.append(pk)
+        return Question.objects.get(pk=pk).question_text
+
+    assert question_text(first.pk) == "First?"
+    with django_capture_on_commit_callbacks(execute=True):
+        other.save()
+    assert question_text(first.pk) == "First?"
+    assert calls == [first.pk]
+
+    first.question_text = "Renamed?"
+    with django_capture_on_commit_callbacks(execute=True):
+        first.save()
+    assert question_text(first.pk) == "Renamed?"
+    assert calls == [first.pk, first.pk]
+
+
+@pytest.mark.django_db
+def test_unwatched_tag_functions_do_not_watch(caplog):
+    @cacheable(lambda pk: f"test:question:{pk}", tags=lambda pk: [(Question, pk)])
+    def question_text(pk):
+        return "?"
+
+    question_text(1)
+    question_text(2)
+
+    assert Question not in _watched_models
+    assert "polls.Question is used as a cache tag" in caplog.text
+    assert len(caplog.records) == 1
+
+
+@pytest.mark.django_db
+def test_model_tags_cover_every_row(django_capture_on_commit_callbacks):
+    @cacheable("test:question_count", tags=[Question])
+    def question_count():
+        return Question.objects.count()
+
+    # watched before any value is computed
+    assert Question in _watched_models
+    assert question_count() == 0
+    with django_capture_on_commit_callbacks(execute=True):
+        question = Question.objects.create(
+            question_text="New?", pub_date=timezone.now()
+        )
+    assert question_count() == 1
+    with django_capture_on_commit_callbacks(execute=True):
+        question.delete()
+    assert question_count() == 0
+
+
+def test_cacheable_many_computes_missing_ids_only():
+    calls = []
+
+    @cacheable_many(lambda pk, scale: f"test:scaled:{pk}:{scale}", default=0)
+    def scaled(pks, scale):
+        calls.append(list(pks))
+        # leaves out 3, which gets the default
+        return {pk: pk * scale for pk in pks if pk != 3}
+
+    assert scaled([1, 2, 3], 10) == {1: 10, 2: 20, 3: 0}
+    assert scaled([4, 3, 2, 1], 10) == {4: 40, 3: 0, 2: 20, 1: 10}
+    assert scaled([1, 2, 3, 4], 10) == {1: 10, 2: 20, 3: 0, 4: 40}
+    assert calls == [[1, 2, 3], [4]]
+
+    scaled([1], 10, refresh_cache=True)
+    assert calls[-1] == [1]
+
+
+def test_cacheable_many_uses_one_round_trip_each_way(monkeypatch):
+    @cacheable_many(lambda pk: f"test:many:{pk}")
+    def values(pks):
+        return dict.fromkeys(pks)
+
+    trips = []
+    for name in ("get_many", "set_many"):
+        method = getattr(cache, name)
+        monkeypatch.setattr(
+            cache,
+            name,
+            lambda *args, method=method, name=name, **kwargs: (
+                trips.append(name) or method(*args, **kwargs)
+            ),
+        )
+
+    values(range(50))
+    values(range(50))
+
+    assert trips == ["get_many", "set_many", "get_many"]
+
+
+def test_async_cacheable_caches_falsy_values():
+    calls = []
+
+    @cacheable("test:async")
+    async def compute():
+        calls.append(1)
+        return 0
+
+    async def run():
+        return [await compute(), await compute()]
+
+    assert asyncio.run(run()) == [0, 0]
+    assert len(calls) == 1
+
+
+def test_async_concurrent_awaiters_share_one_computation():
+    calls = []
+
+    @cacheable(lambda pk: f"test:async:{pk}", beta=0)
+    async def compute(pk):
+        calls.append(pk)
+        await asyncio.sleep(0.05)
+        return pk * 2
+
+    async def run():
+        return await asyncio.gather(*[compute(pk) for pk in [1, 1, 1, 2, 2]])
+
+    assert asyncio.run(run()) == [2, 2, 2, 4, 4]
+    assert sorted(calls) == [1, 2]
+
+
+def test_async_stale_value_is_served_while_recomputed():
+    cache.set("test:async", CacheEntry("stale", time.time() - 1, 0.1))
+    calls = []
+
+    @cacheable("test:async")
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "fresh"
+
+    async def run():
+        return await asyncio.gather(compute(), compute(), compute())
+
+    assert asyncio.run(run()) == ["fresh", "stale", "stale"]
+    assert len(calls) == 1
+    assert asyncio.run(compute()) == "fresh"
@@ -81,6 +81,28 @@ CELERY_BROKER_TRANSPORT_OPTIONS: dict = {  # type: ignore
 # Celery broker configuration
 CELERY_TASK_DEFAULT_QUEUE = QueueName.CELERY.value
 
+CELERY_BEAT_SCHEDULE: dict = {
+    "compact-vote-shards": {
+        "task": "polls.tasks.compact_vote_shards",
+        "schedule": settings.VOTE_SHARD_COMPACT_INTERVAL,
+    },
+}
+if settings.ENABLE_VOTE_BUFFER:
+    CELERY_BEAT_SCHEDULE["flush-vote-buffer"] = {
+        "task": "polls.tasks.flush_vote_buffer",
+        "schedule": settings.VOTE_BUFFER_FLUSH_INTERVAL,
+    }
+if settings.ENABLE_VOTE_LOG:
+    CELERY_BEAT_SCHEDULE["roll-up-votes"] = {
+        "task": "polls.tasks.roll_up_votes",
+        "schedule": settings.VOTE_ROLLUP_INTERVAL,
+    }
+if settings.ENABLE_VOTE_TIMESERIES:
+    CELERY_BEAT_SCHEDULE["compact-vote-buckets"] = {
+        "task": "polls.tasks.compact_vote_buckets",
+        "schedule": settings.VOTE_BUCKET_COMPACT_INTERVAL,
+    }
+
 if USE_PUBSUB and GOOGLE_CLOUD_PROJECT:
     # Configure Celery to use Google Cloud Pub/Sub
     CELERY_BROKER_URL = f"gcpubsub://projects/{GOOGLE_CLOUD_PROJECT}"
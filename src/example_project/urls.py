@@ -15,6 +15,7 @@ urlpatterns = [
     # Polls app
     path("polls/", include("polls.urls")),
     # API Routes
+    path("api/polls/", include("polls.api_urls")),
 ]
 
 # Serve media files in development
@@ -1,6 +1,27 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 
 from .models import Choice, Question
+from .search import search_choices, search_questions
+from .snapshots import close_poll
+
+
+class SearchIndexMixin:
+    """
+    Route changelist searches through `polls.search` instead of `icontains`
+    lookups, and order the matches by relevance.
+    """
+
+    search_function = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        queryset = self.search_function(queryset, search_term)
+        if ORDER_VAR not in request.GET:
+            # most relevant first, unless a column is sorted explicitly
+            queryset = queryset.order_by("-search_rank", "-pk")
+        return queryset, False
 
 
 class ChoiceInline(admin.TabularInline):
@@ -13,14 +34,15 @@ class ChoiceInline(admin.TabularInline):
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(SearchIndexMixin, admin.ModelAdmin):
     """
     Admin configuration for Question model.
     """
 
     fieldsets = [
-        (None, {"fields": ["question_text"]}),
+        (None, {"fields": ["question_text", "ballot_type"]}),
         ("Date information", {"fields": ["pub_date"], "classes": ["collapse"]}),
+        ("Vote counting", {"fields": ["vote_shard_count"], "classes": ["collapse"]}),
     ]
     inlines = [ChoiceInline]
     list_display = (
@@ -29,13 +51,31 @@ class QuestionAdmin(admin.ModelAdmin):
         "was_published_recently",
         "total_votes",
     )
-    list_filter = ["pub_date"]
+    list_filter = ["pub_date", "closed_at"]
     search_fields = ["question_text"]
+    search_function = staticmethod(search_questions)
     date_hierarchy = "pub_date"
+    actions = ["close_polls"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_live_vote_count()
+
+    @admin.display(description="Total votes", ordering="live_vote_count")
+    def total_votes(self, obj):
+        """Display the annotated total, including un-compacted shard votes."""
+        return obj.live_vote_count
+
+    @admin.action(description="Close selected polls and freeze their results")
+    def close_polls(self, request, queryset):
+        closed = 0
+        for question in queryset.filter(closed_at__isnull=True):
+            close_poll(question)
+            closed += 1
+        self.message_user(request, f"Closed {closed} poll(s).")
 
 
 @admin.register(Choice)
-class ChoiceAdmin(admin.ModelAdmin):
+class ChoiceAdmin(SearchIndexMixin, admin.ModelAdmin):
     """
     Admin configuration for Choice model.
     """
@@ -43,7 +83,15 @@ class ChoiceAdmin(admin.ModelAdmin):
     list_display = ("choice_text", "question", "votes", "vote_percentage")
     list_filter = ["question__pub_date"]
     search_fields = ["choice_text", "question__question_text"]
+    search_function = staticmethod(search_choices)
     readonly_fields = ("vote_percentage",)
+    list_select_related = ["question"]
+
+    def get_queryset(self, request):
+        # annotated so the changelist runs no query per row
+        return (
+            super().get_queryset(request).with_live_votes().with_question_live_votes()
+        )
 
     def vote_percentage(self, obj):
         """Display vote percentage in admin."""
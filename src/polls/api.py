@@ -0,0 +1,283 @@
+"""
+Read-only polls JSON API.
+
+Built for load: a page costs two queries however many polls and choices it
+holds (the annotated questions plus one prefetch of their choices), lists are
+paginated with keyset cursors, and every response carries an ETag derived from
+the results versions, so revalidations are answered with a 304 from the cache,
+before the database is touched for a detail and after one query for a list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
+
+from core.config import settings
+
+from .ballots import get_tally
+from .demographics import demographic_breakdown
+from .models import Choice, Question, VoteBucket
+from .pagination import InvalidCursorError, KeysetPaginator
+from .search import search_questions
+from .timeseries import vote_series
+from .versions import get_results_version, get_results_versions
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+DEFAULT_SERIES_POINTS = 60
+MAX_SERIES_POINTS = 1440
+
+
+def question_queryset():
+    return Question.objects.with_live_vote_count().only(
+        "id", "question_text", "pub_date", "vote_count"
+    )
+
+
+def choices_prefetch() -> Prefetch:
+    return Prefetch(
+        "choice_set",
+        queryset=Choice.objects.with_live_votes()
+        .only("id", "question_id", "choice_text", "votes")
+        .order_by("pk"),
+        to_attr="api_choices",
+    )
+
+
+def serialize_question(question: Question) -> dict:
+    """
+    Serialize an annotated question with prefetched choices, from attributes
+    only.
+    """
+    return {
+        "id": question.pk,
+        "question_text": question.question_text,
+        "pub_date": question.pub_date,
+        "total_votes": question.live_vote_count,
+        "choices": [
+            {
+                "id": choice.pk,
+                "choice_text": choice.choice_text,
+                "votes": choice.live_votes,
+            }
+            for choice in question.api_choices
+        ],
+    }
+
+
+def conditional_response(request, etag: str):
+    """
+    Return a 304 when the client already holds `etag`, None otherwise.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def with_etag(response: JsonResponse, etag: str) -> JsonResponse:
+    response["ETag"] = etag
+    # let clients and proxies keep the body, but revalidate every time
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+class PollListAPIView(View):
+    """
+    List polls, newest first.
+
+    Query parameters: `search`, `per_page` (up to 100) and `cursor`, as
+    returned in `next` / `previous`.
+
+    Search results keep the newest-first order rather than `search_rank`: the
+    keyset cursors need a stable, indexed ordering, while ranks are computed
+    per query (from corpus statistics that shift with every edit), so pages
+    ordered by them would skip or repeat polls.
+    """
+
+    ordering = ("-pub_date", "-id")
+
+    def get(self, request):
+        queryset = question_queryset()
+        search = request.GET.get("search", "").strip()
+        if search:
+            queryset = search_questions(queryset, search)
+
+        try:
+            page_size = int(request.GET.get("per_page", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"error": "per_page must be a number"}, status=400)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+
+        paginator = KeysetPaginator(queryset, self.ordering, page_size)
+        try:
+            page = paginator.get_page(request.GET.get("cursor"))
+        except InvalidCursorError as e:
+            raise Http404("Invalid cursor") from e
+
+        etag = self.get_etag(request, page.object_list)
+        if (response := conditional_response(request, etag)) is not None:
+            return response
+
+        prefetch_related_objects(page.object_list, choices_prefetch())
+        return with_etag(
+            JsonResponse(
+                {
+                    "results": [serialize_question(q) for q in page.object_list],
+                    "next": self.page_url(request, page.next_cursor),
+                    "previous": self.page_url(request, page.previous_cursor),
+                }
+            ),
+            etag,
+        )
+
+    def get_etag(self, request, questions: list[Question]) -> str:
+        """
+        Hash of the request and the results versions of the page's questions,
+        so it changes with any vote, edit or membership change of the page.
+        """
+        versions = get_results_versions(q.pk for q in questions)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(request.get_full_path().encode())
+        for question in questions:
+            digest.update(f"|{question.pk}:{versions[question.pk]}".encode())
+        return quote_etag(digest.hexdigest())
+
+    def page_url(self, request, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        params = request.GET.copy()
+        params["cursor"] = cursor
+        return f"{request.path}?{params.urlencode()}"
+
+
+class PollDetailAPIView(View):
+    """
+    A poll with its choices and vote counts.
+    """
+
+    def get(self, request, pk):
+        etag = quote_etag(f"{pk}-{get_results_version(pk)}")
+        if (response := conditional_response(request, etag)) is not None:
+            return response
+
+        question = get_object_or_404(
+            question_queryset().prefetch_related(choices_prefetch()), pk=pk
+        )
+        return with_etag(JsonResponse(serialize_question(question)), etag)
+
+
+class PollSeriesAPIView(View):
+    """
+    Vote trend of a poll and its choices, for charts.
+
+    Query parameters: `resolution` (minute, hour or day) and `points`, the
+    number of buckets up to and including the current one (up to 1440).
+    """
+
+    def get(self, request, pk):
+        resolution = request.GET.get("resolution", VoteBucket.Resolution.HOUR)
+        if resolution not in VoteBucket.Resolution.values:
+            return JsonResponse({"error": "Unknown resolution"}, status=400)
+        resolution = VoteBucket.Resolution(resolution)
+        try:
+            points = int(request.GET.get("points", DEFAULT_SERIES_POINTS))
+        except ValueError:
+            return JsonResponse({"error": "points must be a number"}, status=400)
+        points = min(max(points, 1), MAX_SERIES_POINTS)
+
+        until = resolution.truncate(timezone.now()) + resolution.width
+        key = (
+            f"polls:series:{pk}:{get_results_version(pk)}:{resolution}:{points}"
+            f":{int(until.timestamp())}"
+        )
+        payload = cache.get(key)
+        if payload is None:
+            if not Question.objects.filter(pk=pk).exists():
+                raise Http404("No poll matches the given query.")
+            series = vote_series(pk, resolution, points, until)
+            payload = {
+                "id": pk,
+                "resolution": series.resolution,
+                "starts": series.starts,
+                "totals": series.totals,
+                "choices": [
+                    {"id": choice_id, "votes": votes}
+                    for choice_id, votes in sorted(series.choices.items())
+                ],
+            }
+            cache.set(key, payload, settings.CHART_CACHE_TIMEOUT)
+        return JsonResponse(payload)
+
+
+class PollBreakdownAPIView(View):
+    """
+    Votes of a poll split by a voter attribute, from the demographic cube.
+
+    Query parameter: `dimension`, one of `DEMOGRAPHIC_DIMENSIONS`.
+    """
+
+    def get(self, request, pk):
+        dimension = request.GET.get("dimension", "")
+        if dimension not in settings.DEMOGRAPHIC_DIMENSIONS:
+            return JsonResponse({"error": "Unknown dimension"}, status=400)
+
+        breakdown = demographic_breakdown(pk, dimension)
+        if not breakdown and not Question.objects.filter(pk=pk).exists():
+            raise Http404("No poll matches the given query.")
+        return JsonResponse(
+            {
+                "id": pk,
+                "dimension": dimension,
+                "values": [
+                    {
+                        "value": value,
+                        "total": sum(choices.values()),
+                        "choices": [
+                            {"id": choice_id, "votes": votes}
+                            for choice_id, votes in sorted(choices.items())
+                        ],
+                    }
+                    for value, choices in sorted(breakdown.items())
+                ],
+            }
+        )
+
+
+class PollTallyAPIView(View):
+    """
+    Tally of a poll's ballots: approval counts, or the instant-runoff rounds
+    of a ranked poll, with the winner.
+    """
+
+    def get(self, request, pk):
+        question = get_object_or_404(Question.objects.only("ballot_type"), pk=pk)
+        tally = get_tally(question)
+        return JsonResponse(
+            {
+                "id": pk,
+                "ballot_type": tally.ballot_type,
+                "ballots": tally.ballots,
+                "winner": tally.winner,
+                "rounds": [
+                    {
+                        "choices": [
+                            {"id": choice_id, "votes": votes}
+                            for choice_id, votes in sorted(tally_round.counts.items())
+                        ],
+                        "exhausted": tally_round.exhausted,
+                        "eliminated": tally_round.eliminated,
+                    }
+                    for tally_round in tally.rounds
+                ],
+            }
+        )
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import api
+
+app_name = "polls_api"
+urlpatterns = [
+    # ex: /api/polls/
+    path("", api.PollListAPIView.as_view(), name="list"),
+    # ex: /api/polls/5/
+    path("<int:pk>/", api.PollDetailAPIView.as_view(), name="detail"),
+    # ex: /api/polls/5/series/?resolution=minute&points=60
+    path("<int:pk>/series/", api.PollSeriesAPIView.as_view(), name="series"),
+    # ex: /api/polls/5/breakdown/?dimension=skill_level
+    path("<int:pk>/breakdown/", api.PollBreakdownAPIView.as_view(), name="breakdown"),
+    # ex: /api/polls/5/tally/
+    path("<int:pk>/tally/", api.PollTallyAPIView.as_view(), name="tally"),
+]
@@ -0,0 +1,253 @@
+"""
+Multi-select and ranked ballots, and their NumPy tally engine.
+
+Every ballot is stored as its picked choice ids packed into an int32 array,
+and also counted into `Choice.votes` like plain votes: every pick for
+approval polls, the first preference for ranked ones. The full tally
+(approval counts, or instant-runoff rounds) is computed over all ballots at
+once:
+
+- the packed ballots are joined into one buffer and mapped to dense choice
+  indexes with `np.searchsorted`
+- ranked ballots become a ballots x ranks matrix padded with a sentinel index;
+  each round finds every ballot's highest continuing preference with one
+  `argmax` over the matrix and counts them with `np.bincount`
+
+Tallies are cached under the question's results version, which every new
+ballot bumps.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from core.config import settings
+
+from .models import Ballot, Choice, Question
+from .results import results_cache_key
+from .versions import bump_results_version, get_results_version
+from .votes import record_vote
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from django.http import HttpRequest, QueryDict
+
+BALLOT_DTYPE = np.dtype("<i4")
+
+
+def pack_ballot(choice_ids: Iterable[int]) -> bytes:
+    return np.asarray(list(choice_ids), dtype=BALLOT_DTYPE).tobytes()
+
+
+def unpack_ballot(packed: bytes) -> list[int]:
+    return np.frombuffer(packed, dtype=BALLOT_DTYPE).tolist()
+
+
+def parse_ballot(question: Question, data: QueryDict) -> list[Choice]:
+    """
+    Return the picked choices of a posted ballot, in order of preference.
+
+    Approval ballots post the picked ids as `choice`, ranked ballots post
+    `rank_<choice id>=<rank>` for the ranked choices. Raises ValueError for
+    empty, duplicate or unknown picks.
+    """
+    if question.ballot_type == Question.BallotType.RANKED:
+        ranks = {
+            int(key.removeprefix("rank_")): int(value)
+            for key, value in data.items()
+            if key.startswith("rank_") and value
+        }
+        if len(set(ranks.values())) != len(ranks):
+            msg = "Each rank can only be given once"
+            raise ValueError(msg)
+        picked = sorted(ranks, key=ranks.get)
+    else:
+        picked = [int(value) for value in data.getlist("choice")]
+
+    choices = question.choice_set.in_bulk(picked)
+    if not picked or len(set(picked)) != len(picked) or len(choices) != len(picked):
+        msg = "Invalid ballot"
+        raise ValueError(msg)
+    return [choices[pk] for pk in picked]
+
+
+def record_ballot(
+    question: Question, choices: list[Choice], request: HttpRequest | None = None
+) -> Ballot:
+    """
+    Store the ballot and count it into `Choice.votes`.
+    """
+    with transaction.atomic():
+        ballot = Ballot.objects.create(
+            question=question, choices=pack_ballot(c.pk for c in choices)
+        )
+        ranked = question.ballot_type == Question.BallotType.RANKED
+        counted = choices[:1] if ranked else choices
+        for choice in counted:
+            record_vote(question, choice, request)
+        bump_results_version([question.pk])
+    return ballot
+
+
+@dataclass(frozen=True)
+class TallyRound:
+    # choice id -> votes, for the choices still running
+    counts: dict[int, int]
+    # ballots without any continuing preference left
+    exhausted: int
+    eliminated: int | None = None
+
+
+@dataclass(frozen=True)
+class Tally:
+    question_id: int
+    ballot_type: str
+    ballots: int
+    rounds: list[TallyRound]
+    winner: int | None
+
+
+def get_tally(question: Question) -> Tally:
+    """
+    Return the tally of the question's ballots, cached until the next ballot.
+    """
+    key = results_cache_key(question.pk, get_results_version(question.pk), "tally")
+    tally = cache.get(key)
+    if tally is None:
+        tally = tally_question(question)
+        cache.set(key, tally, settings.RESULTS_CACHE_TIMEOUT)
+    return tally
+
+
+def tally_question(question: Question) -> Tally:
+    """
+    Tally every ballot of the question.
+    """
+    choice_ids = np.array(
+        sorted(question.choice_set.values_list("pk", flat=True)), dtype=np.int64
+    )
+    ballots = load_ballots(question.pk, choice_ids)
+    if not len(ballots):
+        rounds = []
+    elif question.ballot_type == Question.BallotType.RANKED:
+        rounds = instant_runoff(ballots, len(choice_ids))
+    else:
+        rounds = [approval(ballots, len(choice_ids))]
+
+    tally_rounds = [
+        TallyRound(
+            counts={
+                int(choice_ids[i]): int(counts[i]) for i in np.flatnonzero(counts >= 0)
+            },
+            # approval ballots count for every pick, none is ever exhausted
+            exhausted=len(ballots) - int(counts[counts >= 0].sum())
+            if question.ballot_type == Question.BallotType.RANKED
+            else 0,
+            eliminated=None if loser is None else int(choice_ids[loser]),
+        )
+        for counts, loser in rounds
+    ]
+    return Tally(
+        question_id=question.pk,
+        ballot_type=question.ballot_type,
+        ballots=len(ballots),
+        rounds=tally_rounds,
+        winner=winner(tally_rounds),
+    )
+
+
+def load_ballots(question_id: int, choice_ids: np.ndarray) -> np.ndarray:
+    """
+    Load the question's ballots as a ballots x ranks matrix of indexes into
+    `choice_ids`, padded (and with picks of deleted choices replaced) with
+    `len(choice_ids)`.
+    """
+    packed = list(
+        Ballot.objects.filter(question_id=question_id)
+        .order_by()
+        .values_list("choices", flat=True)
+        .iterator(chunk_size=settings.BATCH_SIZE)
+    )
+    sentinel = len(choice_ids)
+    lengths = np.fromiter(
+        (len(p) // BALLOT_DTYPE.itemsize for p in packed),
+        dtype=np.int64,
+        count=len(packed),
+    )
+    if not lengths.any():
+        return np.full((len(packed), 1), sentinel, dtype=np.int32)
+
+    picks = np.frombuffer(b"".join(packed), dtype=BALLOT_DTYPE)
+    indexes = np.searchsorted(choice_ids, picks)
+    known = indexes < sentinel
+    known[known] = choice_ids[indexes[known]] == picks[known]
+    indexes[~known] = sentinel
+
+    matrix = np.full((len(packed), lengths.max()), sentinel, dtype=np.int32)
+    rows = np.repeat(np.arange(len(packed)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, np.arange(len(picks)) - starts] = indexes
+    return matrix
+
+
+def approval(ballots: np.ndarray, choice_count: int) -> tuple[np.ndarray, None]:
+    counts = np.bincount(ballots.ravel(), minlength=choice_count + 1)
+    return counts[:choice_count], None
+
+
+def instant_runoff(
+    ballots: np.ndarray, choice_count: int
+) -> list[tuple[np.ndarray, int | None]]:
+    """
+    Run instant-runoff rounds until a choice holds a majority of the
+    continuing ballots or one choice is left.
+
+    Returns (counts, eliminated index) per round, eliminated choices count -1.
+    The lowest choice is eliminated; ties are broken by the earlier rounds'
+    counts, then by eliminating the later choice.
+    """
+    if choice_count == 0:
+        return []
+    # the padding sentinel is "eliminated" from the start
+    eliminated = np.zeros(choice_count + 1, dtype=bool)
+    eliminated[choice_count] = True
+    rows = np.arange(len(ballots))
+    rounds: list[tuple[np.ndarray, int | None]] = []
+
+    while True:
+        continuing = ~eliminated[ballots]
+        first = continuing.argmax(axis=1)
+        top = ballots[rows, first][continuing[rows, first]]
+        counts = np.bincount(top, minlength=choice_count + 1)[:choice_count]
+        counts[eliminated[:choice_count]] = -1
+
+        running = np.flatnonzero(counts >= 0)
+        if len(running) == 1 or counts.max() * 2 > counts[running].sum():
+            rounds.append((counts, None))
+            return rounds
+
+        # lowest first, then lowest in the latest earlier round, then latest
+        keys = [counts[running]]
+        keys += [previous[running] for previous, _ in reversed(rounds)]
+        order = np.lexsort([-running, *reversed(keys)])
+        loser = int(running[order[0]])
+        eliminated[loser] = True
+        rounds.append((counts, loser))
+
+
+def winner(rounds: list[TallyRound]) -> int | None:
+    """
+    The choice leading the last round alone, if any.
+    """
+    if not rounds or not rounds[-1].counts:
+        return None
+    counts = rounds[-1].counts
+    best = max(counts.values())
+    leaders = [pk for pk, votes in counts.items() if votes == best]
+    return leaders[0] if len(leaders) == 1 and best > 0 else None
@@ -0,0 +1,361 @@
+"""
+Write-behind vote buffers.
+
+Votes are absorbed into a counter buffer and periodically flushed to
+``Choice.votes`` as aggregated deltas, so a hot poll costs a handful of batched
+UPDATEs per flush instead of one row-locking UPDATE per vote.
+
+Every flush first moves the pending counters into a *processing* area under a
+new flush id, applies them in the transaction that records the id, and only
+then acknowledges (drops) the processing area. A flush that dies midway leaves
+the processing area in place, so the next flush, e.g. the one run on startup,
+reconciles those deltas before anything else: it applies them, unless their id
+shows they were committed before the flush died.
+"""
+
+from __future__ import annotations
+
+import atexit
+import datetime
+import logging
+import secrets
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import cache
+from typing import TYPE_CHECKING
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.config import settings
+
+from .models import Choice, VoteBucket, VoteBufferFlush, count_vote_series
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+logger = logging.getLogger("default")
+
+
+class VoteBuffer:
+    """
+    Base class of vote buffers, subclasses implement the storage primitives.
+    """
+
+    # name of the VoteBufferFlush recording the id of the last applied flush
+    flush_name = "vote_buffer"
+
+    def add(self, choice_id: int, count: int = 1) -> None:
+        """Buffer `count` votes for the choice."""
+        raise NotImplementedError
+
+    def claim(self) -> tuple[int, dict[int, int]] | None:
+        """
+        Return the flush id and deltas of the processing area: the ones left
+        over by an interrupted flush, else the pending deltas moved there
+        under a new flush id. Returns None when there is nothing to flush.
+        """
+        raise NotImplementedError
+
+    def ack(self) -> None:
+        """Drop the processing area once its deltas have been applied."""
+        raise NotImplementedError
+
+    def pending(self) -> dict[int, int]:
+        """Return the deltas not yet applied, without claiming them."""
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self) -> Generator[None, None, None]:
+        """Serialize flushes, claiming while another flush applies is unsafe."""
+        yield
+
+    def flush(self) -> int:
+        """
+        Apply buffered deltas to `Choice.votes`.
+        Returns the number of votes flushed.
+        """
+        flushed = choices = 0
+        with self.lock():
+            # the deltas of an interrupted flush first, then the pending ones
+            for _ in range(2):
+                claimed = self.claim()
+                if claimed is None:
+                    break
+                deltas = self.apply(*claimed)
+                self.ack()
+                flushed += sum(deltas.values())
+                choices += len(deltas)
+
+        if flushed:
+            msg = f"Flushed {flushed} buffered votes over {choices} choices"
+            logger.info(msg)
+        return flushed
+
+    def apply(self, flush_id: int, deltas: dict[int, int]) -> dict[int, int]:
+        """
+        Apply the deltas claimed under `flush_id` and record the id with them,
+        unless it is already recorded. Returns the deltas applied.
+        """
+        with transaction.atomic():
+            last, _ = VoteBufferFlush.objects.select_for_update().get_or_create(
+                name=self.flush_name
+            )
+            # flushes are serialized and acknowledged before the next claim,
+            # so only the last one applied can still be in the processing area
+            if last.last_flush_id == flush_id:
+                msg = f"Skipped buffered votes of flush {flush_id}, already applied"
+                logger.warning(msg)
+                return {}
+
+            deltas = {pk: count for pk, count in deltas.items() if count}
+            if deltas:
+                # buffered votes land in the time series when flushed
+                Choice.objects.add_votes(deltas, cast_at=timezone.now())
+            last.last_flush_id = flush_id
+            last.save(update_fields=["last_flush_id", "updated_at"])
+        return deltas
+
+
+def new_flush_id() -> int:
+    """
+    Return a random flush id, unique across workers and restarts.
+    """
+    return secrets.randbits(63)
+
+
+class LocalVoteBuffer(VoteBuffer):
+    """
+    In-process stand-in for local runs and tests.
+
+    The counters live in the worker's memory and are flushed by a daemon timer
+    (and once more at interpreter exit), so they do NOT survive a crash.
+    """
+
+    def __init__(self, flush_interval: float | None = None) -> None:
+        self.flush_interval = (
+            settings.VOTE_BUFFER_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self._pending: Counter[int] = Counter()
+        self._processing: Counter[int] = Counter()
+        self._flush_id: int | None = None
+        self._mutex = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self._flush_quietly)
+
+    def add(self, choice_id: int, count: int = 1) -> None:
+        with self._mutex:
+            self._pending[choice_id] += count
+            if self._timer is None and self.flush_interval > 0:
+                self._schedule()
+
+    def claim(self) -> tuple[int, dict[int, int]] | None:
+        with self._mutex:
+            if self._flush_id is None:
+                if not self._pending:
+                    return None
+                self._processing, self._pending = self._pending, Counter()
+                self._flush_id = new_flush_id()
+            return self._flush_id, dict(self._processing)
+
+    def ack(self) -> None:
+        with self._mutex:
+            self._processing.clear()
+            self._flush_id = None
+
+    def pending(self) -> dict[int, int]:
+        with self._mutex:
+            return dict(self._processing + self._pending)
+
+    @contextmanager
+    def lock(self) -> Generator[None, None, None]:
+        with self._flush_lock:
+            yield
+
+    def _schedule(self) -> None:
+        self._timer = threading.Timer(self.flush_interval, self._run_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush the local vote buffer")
+
+    def _run_timer(self) -> None:
+        try:
+            self._flush_quietly()
+        finally:
+            with self._mutex:
+                self._timer = None
+                if self._pending or self._processing:
+                    self._schedule()
+
+
+class RedisVoteBuffer(VoteBuffer):
+    """
+    Redis hash backed buffer, shared by every worker and crash-safe.
+
+    Votes are `HINCRBY`s on the pending hash; a claim atomically renames the
+    pending hash to the processing hash and stamps it with a flush id, unless
+    an interrupted flush left one behind. The processing hash is deleted only
+    after the deltas are committed.
+    """
+
+    pending_key = "polls:vote_buffer:pending"
+    processing_key = "polls:vote_buffer:processing"
+    lock_key = "polls:vote_buffer:lock"
+
+    # hash field of the flush id, the other fields are choice ids
+    flush_id_field = "flush_id"
+
+    claim_script = """
+    if redis.call('EXISTS', KEYS[2]) == 0 then
+        if redis.call('EXISTS', KEYS[1]) == 0 then
+            return false
+        end
+        redis.call('RENAME', KEYS[1], KEYS[2])
+    end
+    redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[2])
+    return redis.call('HGETALL', KEYS[2])
+    """
+
+    def __init__(self, location: str | None = None) -> None:
+        import redis
+
+        self.client = redis.Redis.from_url(
+            location or settings.VOTE_BUFFER_LOCATION or settings.CACHE_LOCATION
+        )
+        self._claim = self.client.register_script(self.claim_script)
+
+    def add(self, choice_id: int, count: int = 1) -> None:
+        self.client.hincrby(self.pending_key, choice_id, count)
+
+    def claim(self) -> tuple[int, dict[int, int]] | None:
+        items = self._claim(
+            keys=[self.pending_key, self.processing_key],
+            args=[self.flush_id_field, new_flush_id()],
+        )
+        if items is None:
+            return None
+        fields = dict(zip(items[::2], items[1::2], strict=True))
+        flush_id = int(fields.pop(self.flush_id_field.encode()))
+        return flush_id, {int(k): int(v) for k, v in fields.items()}
+
+    def ack(self) -> None:
+        self.client.delete(self.processing_key)
+
+    def pending(self) -> dict[int, int]:
+        deltas: Counter[int] = Counter()
+        for key in (self.processing_key, self.pending_key):
+            for k, v in self.client.hgetall(key).items():
+                if k != self.flush_id_field.encode():
+                    deltas[int(k)] += int(v)
+        return dict(deltas)
+
+    @contextmanager
+    def lock(self) -> Generator[None, None, None]:
+        # generous timeout, a flush is a few batched UPDATEs
+        with self.client.lock(self.lock_key, timeout=300, blocking_timeout=60):
+            yield
+
+
+class VoteSeriesBuffer:
+    """
+    Write-behind counts of directly applied votes for the vote time series and
+    trending scores, so a vote request only updates its choice and question.
+
+    The counts are kept per minute in the worker's memory and written by a
+    daemon timer (and once more at interpreter exit). They do NOT survive a
+    crash: the series and scores may then miss a few seconds of votes, while
+    `Choice.votes` stays exact.
+    """
+
+    def __init__(self, flush_interval: float | None = None) -> None:
+        self.flush_interval = (
+            settings.VOTE_SERIES_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self._pending: Counter[tuple[datetime.datetime, int, int]] = Counter()
+        self._mutex = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self._flush_quietly)
+
+    def add(
+        self,
+        question_id: int,
+        choice_id: int,
+        cast_at: datetime.datetime,
+        count: int = 1,
+    ) -> None:
+        """Count `count` votes for the choice, cast at `cast_at`."""
+        minute = VoteBucket.Resolution.MINUTE.truncate(cast_at)
+        with self._mutex:
+            self._pending[minute, question_id, choice_id] += count
+            if self._timer is None and self.flush_interval > 0:
+                self._schedule()
+
+    def flush(self) -> int:
+        """
+        Write the pending counts, which are put back if that fails.
+        Returns the number of votes written.
+        """
+        with self._mutex:
+            counts, self._pending = self._pending, Counter()
+        if not counts:
+            return 0
+        try:
+            with transaction.atomic():
+                # choices deleted since their votes were counted have no rows
+                live = set(
+                    Choice.objects.filter(
+                        pk__in={choice_id for _, _, choice_id in counts}
+                    ).values_list("pk", flat=True)
+                )
+                count_vote_series(
+                    {key: votes for key, votes in counts.items() if key[2] in live}
+                )
+        except Exception:
+            with self._mutex:
+                self._pending.update(counts)
+            raise
+        return sum(counts.values())
+
+    def _schedule(self) -> None:
+        self._timer = threading.Timer(self.flush_interval, self._run_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush the vote series buffer")
+
+    def _run_timer(self) -> None:
+        try:
+            self._flush_quietly()
+        finally:
+            with self._mutex:
+                self._timer = None
+                if self._pending:
+                    self._schedule()
+
+
+@cache
+def get_vote_buffer() -> VoteBuffer:
+    """Return the process wide buffer configured by `VOTE_BUFFER_BACKEND`."""
+    return import_string(settings.VOTE_BUFFER_BACKEND)()
+
+
+@cache
+def get_vote_series_buffer() -> VoteSeriesBuffer:
+    """Return the process wide buffer of direct votes' series counts."""
+    return VoteSeriesBuffer()
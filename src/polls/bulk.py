@@ -0,0 +1,230 @@
+"""
+Bulk loading of polls.
+
+Polls are streamed from a generator or a JSON lines / CSV source and written in
+chunks with `bulk_create`, a few INSERTs per chunk instead of one per row. The
+denormalized `Question.vote_count` is filled in directly, and model signals are
+skipped unless asked for, as `bulk_create` never sends them.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from django.db import router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.config import settings
+
+from .models import Choice, Question, Vote
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from typing import TextIO
+
+# the default end of the pub_date range of synthetic polls, fixed so a seed
+# always gives the same dataset
+SYNTHETIC_EPOCH = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@dataclass
+class PollRecord:
+    question_text: str
+    pub_date: datetime
+    choices: list[tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class LoadStats:
+    questions: int = 0
+    choices: int = 0
+    votes: int = 0
+
+
+def generate_polls(
+    count: int,
+    choices_per_question: int = 4,
+    votes_per_question: int = 100,
+    days: int = 365,
+    seed: int | None = None,
+    now: datetime | None = None,
+) -> Iterator[PollRecord]:
+    """
+    Yield `count` synthetic polls, the same ones for the same `seed` and `now`.
+
+    Vote totals vary around `votes_per_question` and are spread over the
+    choices with a heavy tail, like real polls with a clear favourite. The
+    pub_dates are spread over the `days` before `now`, `SYNTHETIC_EPOCH` by
+    default.
+    """
+    rng = random.Random(seed)
+    if now is None:
+        now = SYNTHETIC_EPOCH
+    for i in range(count):
+        total = rng.randint(0, 2 * votes_per_question)
+        weights = [rng.paretovariate(1.5) for _ in range(choices_per_question)]
+        shares = [int(total * weight / sum(weights)) for weight in weights]
+        shares[0] += total - sum(shares)
+        yield PollRecord(
+            question_text=f"Synthetic question {i}?",
+            pub_date=now - timedelta(seconds=rng.randrange(days * 86400 or 1)),
+            choices=[(f"Choice {j}", votes) for j, votes in enumerate(shares, start=1)],
+        )
+
+
+def read_polls_jsonl(stream: TextIO) -> Iterator[PollRecord]:
+    """
+    Yield polls from JSON lines such as
+    `{"question_text": ..., "pub_date": ..., "choices": [{"choice_text": ..., "votes": ...}]}`.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        yield PollRecord(
+            question_text=data["question_text"],
+            pub_date=parse_pub_date(data.get("pub_date")),
+            choices=[
+                (choice["choice_text"], int(choice.get("votes", 0)))
+                for choice in data.get("choices", [])
+            ],
+        )
+
+
+def read_polls_csv(stream: TextIO) -> Iterator[PollRecord]:
+    """
+    Yield polls from CSV rows of `question_text,pub_date,choice_text,votes`,
+    with the choices of one question on consecutive rows.
+    """
+    record: PollRecord | None = None
+    last_key = None
+    for row in csv.DictReader(stream):
+        key = (row["question_text"], row.get("pub_date"))
+        if record is None or key != last_key:
+            if record is not None:
+                yield record
+            record = PollRecord(row["question_text"], parse_pub_date(key[1]))
+            last_key = key
+        if row.get("choice_text"):
+            record.choices.append((row["choice_text"], int(row.get("votes") or 0)))
+    if record is not None:
+        yield record
+
+
+def parse_pub_date(value: str | None) -> datetime:
+    if not value:
+        return timezone.now()
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        msg = f"Invalid pub_date: {value!r}"
+        raise ValueError(msg)
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+class PollLoader:
+    """
+    Writes polls in chunks of `chunk_size` questions, one transaction each.
+
+    With `vote_events`, votes are written as `Vote` events instead of
+    counters, for the rollup to count.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int | None = None,
+        send_signals: bool = False,
+        vote_events: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        self.chunk_size = chunk_size or settings.BATCH_SIZE
+        self.send_signals = send_signals
+        self.vote_events = vote_events
+        self.rng = random.Random(seed)
+
+    def load(
+        self,
+        records: Iterable[PollRecord],
+        progress: Callable[[LoadStats], None] | None = None,
+    ) -> LoadStats:
+        stats = LoadStats()
+        records = iter(records)
+        while chunk := list(islice(records, self.chunk_size)):
+            with transaction.atomic():
+                self._load_chunk(chunk, stats)
+            if progress is not None:
+                progress(stats)
+        return stats
+
+    def _load_chunk(self, chunk: list[PollRecord], stats: LoadStats) -> None:
+        counted = not self.vote_events
+        questions = Question.objects.bulk_create(
+            [
+                Question(
+                    question_text=record.question_text,
+                    pub_date=record.pub_date,
+                    vote_count=sum(v for _, v in record.choices) if counted else 0,
+                )
+                for record in chunk
+            ],
+            batch_size=settings.BATCH_SIZE,
+        )
+        choices = Choice.objects.bulk_create(
+            [
+                Choice(
+                    question=question,
+                    choice_text=choice_text,
+                    votes=votes if counted else 0,
+                )
+                for question, record in zip(questions, chunk, strict=True)
+                for choice_text, votes in record.choices
+            ],
+            batch_size=settings.BATCH_SIZE,
+        )
+
+        votes = [v for record in chunk for _, v in record.choices]
+        if self.vote_events:
+            events = self._vote_events(choices, votes)
+            while batch := list(islice(events, settings.BATCH_SIZE)):
+                Vote.objects.bulk_create(batch)
+
+        if self.send_signals:
+            self._send_post_save(Question, questions)
+            self._send_post_save(Choice, choices)
+
+        stats.questions += len(questions)
+        stats.choices += len(choices)
+        stats.votes += sum(votes)
+
+    def _vote_events(self, choices: list[Choice], votes: list[int]) -> Iterator[Vote]:
+        now = timezone.now()
+        for choice, count in zip(choices, votes, strict=True):
+            pub_date = choice.question.pub_date
+            span = max((now - pub_date).total_seconds(), 0)
+            for _ in range(count):
+                yield Vote(
+                    choice=choice,
+                    question_id=choice.question_id,
+                    created_at=pub_date + timedelta(seconds=self.rng.random() * span),
+                )
+
+    def _send_post_save(self, model: type, instances: list) -> None:
+        using = router.db_for_write(model)
+        for instance in instances:
+            post_save.send(
+                sender=model,
+                instance=instance,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=using,
+            )
@@ -0,0 +1,51 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.core.cache import cache
+
+from .live import (
+    broadcast_version_key,
+    get_results_ticker,
+    results_group,
+    results_message,
+)
+from .models import Question
+from .versions import aget_results_version
+
+
+class ResultsConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams the results of a question.
+
+    Clients get the current results on connect, then at most one update per
+    tick while votes come in (see `polls.live`).
+    """
+
+    question_id: int | None = None
+
+    async def connect(self):
+        question_id = self.scope["url_route"]["kwargs"]["question_id"]
+        if not await Question.objects.filter(pk=question_id).aexists():
+            await self.close()
+            return
+
+        self.question_id = question_id
+        await self.channel_layer.group_add(
+            results_group(question_id), self.channel_name
+        )
+        await self.accept()
+
+        version = await aget_results_version(question_id)
+        await self.send_json(await results_message(question_id, version))
+        # nothing to broadcast until the results change
+        await cache.aadd(broadcast_version_key(question_id), version, None)
+        get_results_ticker().watch(question_id)
+
+    async def disconnect(self, code):
+        if self.question_id is None:
+            return
+        get_results_ticker().unwatch(self.question_id)
+        await self.channel_layer.group_discard(
+            results_group(self.question_id), self.channel_name
+        )
+
+    async def results_update(self, event):
+        await self.send_json(event["results"])
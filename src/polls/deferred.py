@@ -0,0 +1,239 @@
+"""
+Deferred, batched signal handlers.
+
+Receivers connected with `deferred_receiver` stay out of the save path: the
+signal only records a `SignalEvent`, which is queued once the transaction
+commits (and dropped if it rolls back). Queued events are dispatched when the
+batching window closes or the batch is full, either in-process or, with
+`task=True`, by the `dispatch_deferred_signals` Celery task. With `batch=True`
+the handler is called once with every event of the window, so a bulk import or
+a vote burst costs one call instead of one per row.
+
+    @deferred_receiver(post_save, sender=Choice, batch=True)
+    def refresh_reports(events: list[SignalEvent]) -> None: ...
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from django.apps import apps
+from django.db import models, router, transaction
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.dispatch import Signal
+
+logger = logging.getLogger("default")
+
+JSON_SCALARS = (str, int, float, bool, type(None))
+UNSERIALIZABLE = object()
+
+
+def to_json(value: Any) -> Any:
+    if isinstance(value, JSON_SCALARS):
+        return value
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (set, frozenset)):
+        value = sorted(value)
+    if isinstance(value, (list, tuple)) and all(
+        isinstance(item, JSON_SCALARS) for item in value
+    ):
+        return list(value)
+    return UNSERIALIZABLE
+
+
+@dataclass(frozen=True)
+class SignalEvent:
+    """
+    One signal sent for `model`.
+
+    `kwargs` holds the JSON-able signal arguments (`created`, `update_fields`,
+    ..., model instances as their pk). `instance` is only available to
+    in-process handlers, task handlers get `pk` and reload what they need.
+    """
+
+    model: type[models.Model]
+    pk: Any
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    instance: models.Model | None = field(default=None, compare=False)
+
+    @classmethod
+    def from_signal(cls, sender: type, **kwargs: Any) -> SignalEvent:
+        kwargs.pop("signal", None)
+        instance = kwargs.pop("instance", None)
+        return cls(
+            model=sender,
+            pk=instance.pk if instance is not None else None,
+            kwargs={
+                name: value
+                for name, value in ((k, to_json(v)) for k, v in kwargs.items())
+                if value is not UNSERIALIZABLE
+            },
+            instance=instance,
+        )
+
+    def to_payload(self) -> dict[str, Any]:
+        return {"model": self.model._meta.label, "pk": self.pk, "kwargs": self.kwargs}
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> SignalEvent:
+        return cls(
+            model=apps.get_model(payload["model"]),
+            pk=payload["pk"],
+            kwargs=payload["kwargs"],
+        )
+
+
+class DeferredReceiver:
+    """
+    Queues the events of a signal and hands them to `handler` in batches.
+
+    Full batches are dispatched by the committing thread, partial ones by a
+    daemon timer once the window closes (and once more at interpreter exit).
+    """
+
+    def __init__(
+        self,
+        handler: Callable,
+        *,
+        batch: bool = False,
+        task: bool = False,
+        window_ms: int | None = None,
+        max_batch_size: int | None = None,
+    ) -> None:
+        self.handler = handler
+        self.path = f"{handler.__module__}.{handler.__qualname__}"
+        self.batch = batch
+        self.task = task
+        self.window_ms = (
+            settings.DEFERRED_SIGNALS_WINDOW_MS if window_ms is None else window_ms
+        )
+        self.max_batch_size = (
+            settings.DEFERRED_SIGNALS_MAX_BATCH_SIZE
+            if max_batch_size is None
+            else max_batch_size
+        )
+        self._pending: list[SignalEvent] = []
+        self._mutex = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self._flush_quietly)
+
+    def __repr__(self) -> str:
+        return f"<DeferredReceiver {self.path}>"
+
+    def receive(self, sender: type, **kwargs: Any) -> None:
+        """Signal receiver, records the event until the transaction commits."""
+        event = SignalEvent.from_signal(sender, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(sender)
+        transaction.on_commit(partial(self.enqueue, event), using=using)
+
+    def enqueue(self, event: SignalEvent) -> None:
+        with self._mutex:
+            self._pending.append(event)
+            full = len(self._pending) >= self.max_batch_size or self.window_ms <= 0
+            if not full and self._timer is None:
+                self._schedule()
+
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Dispatch the pending events.
+        Returns the number of events dispatched.
+        """
+        with self._mutex:
+            events, self._pending = self._pending, []
+        if not events:
+            return 0
+
+        if self.task:
+            from .tasks import dispatch_deferred_signals
+
+            for start in range(0, len(events), self.max_batch_size):
+                dispatch_deferred_signals.delay(
+                    self.path,
+                    [
+                        e.to_payload()
+                        for e in events[start : start + self.max_batch_size]
+                    ],
+                )
+        else:
+            self.run(events)
+        return len(events)
+
+    def run(self, events: list[SignalEvent]) -> int:
+        """
+        Call the handler with `events`, as one list or one event at a time.
+        """
+        if self.batch:
+            self.handler(events)
+        else:
+            for event in events:
+                self.handler(event)
+        return len(events)
+
+    def _schedule(self) -> None:
+        self._timer = threading.Timer(self.window_ms / 1000, self._run_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            msg = f"Failed to dispatch the deferred events of {self.path}"
+            logger.exception(msg)
+
+    def _run_timer(self) -> None:
+        try:
+            self._flush_quietly()
+        finally:
+            with self._mutex:
+                self._timer = None
+                if self._pending:
+                    self._schedule()
+
+
+def deferred_receiver(
+    signal: Signal,
+    *,
+    sender: type | None = None,
+    batch: bool = False,
+    task: bool = False,
+    window_ms: int | None = None,
+    max_batch_size: int | None = None,
+) -> Callable[[Callable], DeferredReceiver]:
+    """
+    Connect the decorated handler to `signal` as a `DeferredReceiver`.
+
+    The handler is called with one `SignalEvent`, or with a list of them when
+    `batch` is set. With `task` the batches are dispatched by a Celery task,
+    which imports the handler by its dotted path: decorate module level
+    functions only.
+    """
+
+    def decorator(handler: Callable) -> DeferredReceiver:
+        receiver = DeferredReceiver(
+            handler,
+            batch=batch,
+            task=task,
+            window_ms=window_ms,
+            max_batch_size=max_batch_size,
+        )
+        signal.connect(
+            receiver.receive, sender=sender, weak=False, dispatch_uid=receiver.path
+        )
+        return receiver
+
+    return decorator
@@ -0,0 +1,144 @@
+"""
+Coalesced live results broadcasts.
+
+Every process serving `ResultsConsumer`s runs one ticker task. Each tick it
+compares the results version of the questions its clients watch against the
+version last broadcast, and a question that changed gets one broadcast of its
+latest results, however many votes arrived during the tick. A per-tick leader
+key in the cache makes sure only one process broadcasts a question per tick,
+so the channel layer sees at most one message per question per tick.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from collections import Counter
+from dataclasses import asdict
+
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from core.config import settings
+
+from .models import Question
+from .results import abuild_results, results_cache_key
+from .versions import results_version_key
+
+logger = logging.getLogger("default")
+
+
+def results_group(question_id: int) -> str:
+    return f"polls.results.{question_id}"
+
+
+def broadcast_version_key(question_id: int) -> str:
+    return f"polls:live:broadcast_version:{question_id}"
+
+
+async def results_message(question_id: int, version: int | None) -> dict:
+    """
+    Build the results message of the question, reusing the results page cache
+    of `version` when it is there.
+    """
+    # without a version nothing can be cached under it yet
+    if version is not None:
+        keys = [
+            results_cache_key(question_id, version, part) for part in ("json", "html")
+        ]
+        cached = await cache.aget_many(keys)
+        if len(cached) == len(keys):
+            payload, html = cached[keys[0]], cached[keys[1]]
+            return {
+                "question_id": question_id,
+                "total_votes": payload["total_votes"],
+                "choices": payload["choices"],
+                "html": str(html),
+            }
+
+    results = await abuild_results(Question(pk=question_id))
+    return {
+        "question_id": question_id,
+        "total_votes": results.total_votes,
+        "choices": [asdict(choice) for choice in results.choices],
+        "html": render_to_string("polls/results_choices.html", {"results": results}),
+    }
+
+
+class ResultsTicker:
+    """
+    Broadcasts changed results of the watched questions once per tick.
+    """
+
+    def __init__(self, tick_ms: int | None = None) -> None:
+        self.tick = (
+            settings.LIVE_RESULTS_TICK_MS if tick_ms is None else tick_ms
+        ) / 1000
+        self.watched: Counter[int] = Counter()
+        self._task: asyncio.Task | None = None
+
+    def watch(self, question_id: int) -> None:
+        self.watched[question_id] += 1
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def unwatch(self, question_id: int) -> None:
+        self.watched[question_id] -= 1
+        if self.watched[question_id] <= 0:
+            del self.watched[question_id]
+        if not self.watched and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while self.watched:
+            started_at = time.monotonic()
+            try:
+                await self.broadcast_changes()
+            except Exception:
+                logger.exception("Failed to broadcast live poll results")
+            await asyncio.sleep(max(self.tick - (time.monotonic() - started_at), 0))
+
+    async def broadcast_changes(self) -> int:
+        """
+        Broadcast the questions whose results changed since their last
+        broadcast. Returns the number of broadcasts sent by this process.
+        """
+        question_ids = list(self.watched)
+        versions = await cache.aget_many(
+            [results_version_key(pk) for pk in question_ids]
+        )
+        broadcast = await cache.aget_many(
+            [broadcast_version_key(pk) for pk in question_ids]
+        )
+
+        tick = int(time.time() / self.tick)
+        channel_layer = get_channel_layer()
+        sent = 0
+        for pk in question_ids:
+            version = versions.get(results_version_key(pk))
+            if version is None or version == broadcast.get(broadcast_version_key(pk)):
+                continue
+            # one leader per question and tick among all processes
+            if not await cache.aadd(
+                f"polls:live:leader:{pk}:{tick}", 1, max(int(self.tick * 2), 1)
+            ):
+                continue
+
+            message = await results_message(pk, version)
+            await channel_layer.group_send(
+                results_group(pk), {"type": "results.update", "results": message}
+            )
+            await cache.aset(broadcast_version_key(pk), version, None)
+            sent += 1
+        return sent
+
+
+@functools.cache
+def get_results_ticker() -> ResultsTicker:
+    """Return the ticker of this process."""
+    return ResultsTicker()
@@ -0,0 +1,65 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from polls.models import Question
+from polls.voters import claim_vote, get_voter_filter
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the one-vote-per-voter check as a plain receipt INSERT, which "
+        "repeat voters fail, and with the voter filter in front of it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--voters", type=int, default=1000)
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=10_000,
+            help="Voters who already voted on the question before the run",
+        )
+
+    def handle(self, *args, **options):
+        voters = options["voters"]
+        question = Question.objects.create(
+            question_text="Duplicate vote benchmark?", pub_date=timezone.now()
+        )
+        try:
+            for i in range(options["existing"]):
+                claim_vote(question.pk, f"existing:{i}", use_filter=False)
+            self.stdout.write(
+                f"{voters} new and {voters} repeat voters per run, "
+                f"{options['existing']} earlier voters"
+            )
+
+            for label, use_filter in (("insert", False), ("filter", True)):
+                if use_filter:
+                    # built once per TTL, not part of the vote latency
+                    get_voter_filter(question.pk)
+                new = [f"{label}:{uuid.uuid4().hex}" for _ in range(voters)]
+                self._report(f"{label}, new", self._run(question.pk, new, use_filter))
+                self._report(
+                    f"{label}, repeat", self._run(question.pk, new, use_filter)
+                )
+        finally:
+            question.delete()
+
+    def _run(self, question_id: int, voters: list[str], use_filter: bool):
+        latencies = []
+        for voter in voters:
+            started_at = time.perf_counter()
+            claim_vote(question_id, voter, use_filter=use_filter)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+        return latencies
+
+    def _report(self, label: str, latencies: list[float]) -> None:
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        self.stdout.write(
+            f"{label:<15} mean {statistics.fmean(latencies):>7.3f} ms"
+            f"  p95 {p95:>7.3f} ms"
+        )
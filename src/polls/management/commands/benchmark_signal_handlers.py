@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from polls.deferred import DeferredReceiver
+from polls.models import Choice, Question
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Question save latency without post_save handlers, with a heavy "
+        "inline handler and with the same handler deferred and batched"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--saves", type=int, default=200)
+        parser.add_argument(
+            "--handler-ms",
+            type=float,
+            default=2.0,
+            help="Simulated fixed cost of one handler call, on top of its query",
+        )
+
+    def handle(self, *args, **options):
+        saves = options["saves"]
+        handler_cost = options["handler_ms"] / 1000
+
+        def heavy(sender, instance, **kwargs):
+            Choice.objects.filter(question_id=instance.pk).count()
+            time.sleep(handler_cost)
+
+        def heavy_batch(events):
+            pks = [event.pk for event in events]
+            dict(
+                Choice.objects.filter(question_id__in=pks)
+                .values_list("question_id")
+                .annotate(Count("pk"))
+            )
+            time.sleep(handler_cost)
+
+        deferred = DeferredReceiver(
+            heavy_batch, batch=True, window_ms=3_600_000, max_batch_size=saves + 1
+        )
+        self.stdout.write(f"{saves} saves per run")
+
+        self._report("no handlers", self._run(saves))
+
+        post_save.connect(heavy, sender=Question, weak=False)
+        try:
+            self._report("inline handler", self._run(saves))
+        finally:
+            post_save.disconnect(heavy, sender=Question)
+
+        post_save.connect(deferred.receive, sender=Question, weak=False)
+        try:
+            latencies = self._run(saves)
+        finally:
+            post_save.disconnect(deferred.receive, sender=Question)
+        started_at = time.perf_counter()
+        deferred.flush()
+        drained = (time.perf_counter() - started_at) * 1000
+        self._report("deferred batch", latencies, f"  drained in {drained:.1f} ms")
+
+    def _run(self, saves: int) -> list[float]:
+        latencies = []
+        pks = []
+        try:
+            for i in range(saves):
+                question = Question(
+                    question_text=f"Signal benchmark {i}?", pub_date=timezone.now()
+                )
+                started_at = time.perf_counter()
+                question.save()
+                latencies.append((time.perf_counter() - started_at) * 1000)
+                pks.append(question.pk)
+        finally:
+            Question.objects.filter(pk__in=pks).delete()
+        return latencies
+
+    def _report(self, label: str, latencies: list[float], extra: str = "") -> None:
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        self.stdout.write(
+            f"{label:<15} mean {statistics.fmean(latencies):>7.2f} ms"
+            f"  p95 {p95:>7.2f} ms{extra}"
+        )
@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.models import F
+
+from polls.models import Choice, Question
+from polls.votes import add_sharded_vote, compact_vote_shards, pick_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure vote throughput on a single hot choice for several shard counts "
+        "under concurrent writers (meaningful on PostgreSQL, SQLite serializes "
+        "every write)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--votes", type=int, default=2000)
+        parser.add_argument(
+            "--shards",
+            default="1,2,4,8,16",
+            help="Comma separated shard counts to benchmark",
+        )
+
+    def handle(self, *args, **options):
+        writers = options["writers"]
+        total_votes = options["votes"]
+        shard_counts = [int(count) for count in options["shards"].split(",")]
+
+        question = Question.objects.create(question_text="Vote shard benchmark?")
+        choice = Choice.objects.create(question=question, choice_text="Hot choice")
+        self.stdout.write(
+            f"{writers} writers, {total_votes} votes per run on {connection.vendor}"
+        )
+
+        try:
+            for shard_count in shard_counts:
+                elapsed = self._run(choice, shard_count, writers, total_votes)
+                compact_vote_shards()
+                self.stdout.write(
+                    f"shards={shard_count:>3}  {total_votes / elapsed:>10.0f} votes/s"
+                )
+
+            choice.refresh_from_db()
+            expected = total_votes * len(shard_counts)
+            if choice.votes != expected:
+                self.stderr.write(f"Lost votes: {choice.votes} != {expected}")
+        finally:
+            question.delete()
+
+    def _run(
+        self, choice: Choice, shard_count: int, writers: int, total_votes: int
+    ) -> float:
+        def write(votes: int) -> None:
+            try:
+                for _ in range(votes):
+                    if shard_count > 1:
+                        add_sharded_vote(choice.pk, pick_shard(shard_count))
+                    else:
+                        Choice.objects.filter(pk=choice.pk).update(votes=F("votes") + 1)
+            finally:
+                connections.close_all()
+
+        share, remainder = divmod(total_votes, writers)
+        batches = [share + (i < remainder) for i in range(writers)]
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as executor:
+            list(executor.map(write, batches))
+        return time.perf_counter() - started_at
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.config import settings
+from polls.buffers import get_vote_buffer
+
+
+class Command(BaseCommand):
+    help = "Flush buffered votes, reconciling deltas left by an interrupted flush"
+
+    def handle(self, *args, **options):
+        if not settings.ENABLE_VOTE_BUFFER:
+            self.stdout.write("Vote buffer is disabled, nothing to flush.")
+            return
+
+        flushed = get_vote_buffer().flush()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} buffered votes."))
@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.config import settings
+from polls.bulk import (
+    PollLoader,
+    generate_polls,
+    parse_pub_date,
+    read_polls_csv,
+    read_polls_jsonl,
+)
+from polls.votelog import roll_up_votes
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load polls from a JSON lines or CSV file, or generate a reproducible "
+        "synthetic dataset when no source is given"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            nargs="?",
+            help="JSON lines or CSV file to import, - for stdin",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="Source format, guessed from the file extension by default",
+        )
+        parser.add_argument("--questions", type=int, default=1000)
+        parser.add_argument("--choices", type=int, default=4)
+        parser.add_argument(
+            "--votes", type=int, default=100, help="Average votes per question"
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Spread pub_date over this many days"
+        )
+        parser.add_argument(
+            "--until",
+            type=parse_pub_date,
+            help="End of the pub_date range (ISO 8601), a fixed date by default so "
+            "a seed always gives the same dataset",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the synthetic dataset"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.BATCH_SIZE,
+            help="Number of questions written per transaction",
+        )
+        parser.add_argument(
+            "--send-signals",
+            action="store_true",
+            help="Send post_save for every created question and choice",
+        )
+        parser.add_argument(
+            "--vote-events",
+            action="store_true",
+            help="Write the votes to the vote log and roll them up, instead of "
+            "setting the counters",
+        )
+
+    def handle(self, *args, **options):
+        loader = PollLoader(
+            chunk_size=options["chunk_size"],
+            send_signals=options["send_signals"],
+            vote_events=options["vote_events"],
+            seed=options["seed"],
+        )
+
+        def progress(stats):
+            self.stdout.write(
+                f"Loaded {stats.questions} questions, {stats.choices} choices, "
+                f"{stats.votes} votes..."
+            )
+
+        source = options["source"]
+        if source is None:
+            records = generate_polls(
+                options["questions"],
+                choices_per_question=options["choices"],
+                votes_per_question=options["votes"],
+                days=options["days"],
+                seed=options["seed"],
+                now=options["until"],
+            )
+            stats = loader.load(records, progress)
+        else:
+            fmt = options["format"] or Path(source).suffix.lstrip(".")
+            readers = {"jsonl": read_polls_jsonl, "csv": read_polls_csv}
+            if fmt not in readers:
+                msg = f"Unknown format {fmt!r}, pass --format jsonl or --format csv"
+                raise CommandError(msg)
+
+            if source == "-":
+                stats = loader.load(readers[fmt](sys.stdin), progress)
+            else:
+                with Path(source).open(newline="", encoding="utf-8") as stream:
+                    stats = loader.load(readers[fmt](stream), progress)
+
+        if options["vote_events"]:
+            roll_up_votes(lag=0)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully loaded {stats.questions} questions, "
+                f"{stats.choices} choices and {stats.votes} votes!"
+            )
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from polls.demographics import rebuild_demographic_cube
+
+
+class Command(BaseCommand):
+    help = "Recount the demographic cube of poll results from the vote log"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50_000,
+            help="Number of vote events counted per chunk",
+        )
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        cells = rebuild_demographic_cube(chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {cells} demographic cells in {elapsed:.1f}s!")
+        )
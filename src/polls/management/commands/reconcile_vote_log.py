@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count, F, Max, Min, Q, Subquery
+
+from core.config import settings
+from polls.models import Choice, VoteRollupMark
+from polls.votelog import ROLLUP_MARK
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify Choice.votes against the vote log up to the rollup high-water "
+        "mark, in parallel chunks of choices"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.BATCH_SIZE,
+            help="Number of choice ids checked per query",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Reset drifted counters to the logged count, only correct when "
+            "every vote of those choices went through the log",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        bounds = Choice.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            self.stdout.write("No choices to reconcile.")
+            return
+
+        chunks = [
+            (start, start + chunk_size)
+            for start in range(bounds["low"], bounds["high"] + 1, chunk_size)
+        ]
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                results = list(executor.map(self._check_in_thread, chunks))
+        else:
+            results = [self._check(chunk) for chunk in chunks]
+
+        drifted = [row for rows in results for row in rows]
+        for pk, votes, logged in drifted:
+            self.stdout.write(f"Choice {pk}: {votes} counted, {logged} logged")
+
+        if not drifted:
+            self.stdout.write(
+                self.style.SUCCESS(f"All counters of {len(chunks)} chunks match!")
+            )
+        elif options["repair"]:
+            Choice.objects.add_votes(
+                {pk: logged - votes for pk, votes, logged in drifted}
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {len(drifted)} drifted counters!")
+            )
+        else:
+            self.stderr.write(f"{len(drifted)} counters drifted from the log.")
+
+    def _check_in_thread(self, chunk: tuple[int, int]) -> list[tuple[int, int, int]]:
+        try:
+            return self._check(chunk)
+        finally:
+            connections.close_all()
+
+    def _check(self, chunk: tuple[int, int]) -> list[tuple[int, int, int]]:
+        # the mark is read by the same statement, so a concurrent rollup is seen
+        # either entirely or not at all
+        mark = VoteRollupMark.objects.filter(name=ROLLUP_MARK).values("last_vote_id")
+        start, stop = chunk
+        return list(
+            Choice.objects.filter(pk__gte=start, pk__lt=stop)
+            .annotate(logged=Count("vote", filter=Q(vote__pk__lte=Subquery(mark))))
+            .exclude(votes=F("logged"))
+            .values_list("pk", "votes", "logged")
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from core.config import settings
+from polls.models import Question
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Question.vote_count from Choice.votes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.BATCH_SIZE,
+            help="Number of questions recounted per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        recounted = 0
+
+        while True:
+            pks = list(
+                Question.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            recounted += Question.objects.filter(pk__in=pks).recount_votes()
+            last_pk = pks[-1]
+            self.stdout.write(f"Recounted {recounted} questions...")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully recounted {recounted} questions!")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from polls.results import get_results_cache_stats, reset_results_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show the results page cache hit ratio"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the hit and miss counters after reporting them",
+        )
+
+    def handle(self, *args, **options):
+        stats = get_results_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / lookups * 100 if lookups else 0
+
+        self.stdout.write(
+            f"{stats['hits']} hits, {stats['misses']} misses ({ratio:.1f}% hit ratio)"
+        )
+
+        if options["reset"]:
+            reset_results_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Successfully reset the counters!"))
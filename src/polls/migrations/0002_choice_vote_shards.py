@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='vote_shard_count',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Number of counter rows each choice spreads its votes over, raise it for polls with heavy concurrent voting'),
+        ),
+        migrations.CreateModel(
+            name='ChoiceVoteShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(help_text='Shard number')),
+                ('votes', models.IntegerField(default=0, help_text='Votes not yet compacted')),
+                ('choice', models.ForeignKey(help_text='The choice this shard counts votes for', on_delete=django.db.models.deletion.CASCADE, related_name='vote_shards', to='polls.choice')),
+            ],
+            options={
+                'verbose_name': 'Choice Vote Shard',
+                'verbose_name_plural': 'Choice Vote Shards',
+                'constraints': [models.UniqueConstraint(fields=('choice', 'shard'), name='unique_choice_vote_shard')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:39
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_vote_count(apps, schema_editor):
+    Choice = apps.get_model('polls', 'Choice')
+    Question = apps.get_model('polls', 'Question')
+    totals = (
+        Choice.objects.filter(question=OuterRef('pk'))
+        .order_by()
+        .values('question')
+        .annotate(total=Sum('votes'))
+        .values('total')
+    )
+    Question.objects.update(vote_count=Coalesce(Subquery(totals), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_choice_vote_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='vote_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Denormalized sum of the votes of all choices', verbose_name='total votes'),
+        ),
+        migrations.RunPython(populate_vote_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0003_question_vote_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteRollupMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_vote_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vote Rollup Mark',
+                'verbose_name_plural': 'Vote Rollup Marks',
+            },
+        ),
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('session_key', models.CharField(blank=True, help_text="The voter's session, if any", max_length=40)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the vote was cast')),
+                ('choice', models.ForeignKey(help_text='The chosen choice', on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(help_text='The question voted on', on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+                ('user', models.ForeignKey(blank=True, help_text='The voter, if signed in', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Vote',
+                'verbose_name_plural': 'Votes',
+                'indexes': [models.Index(fields=['created_at'], name='polls_vote_created_at'), models.Index(fields=['question', 'created_at'], name='polls_vote_question_time')],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Text search indexes, see polls.search
+
+from django.db import migrations
+
+from core.config import settings
+
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS polls_question_text_trgm "
+    "ON polls_question USING gin (question_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS polls_choice_text_trgm "
+    "ON polls_choice USING gin (choice_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS polls_question_text_tsv "
+    "ON polls_question USING gin (to_tsvector('{config}'::regconfig, question_text))",
+    "CREATE INDEX IF NOT EXISTS polls_choice_text_tsv "
+    "ON polls_choice USING gin (to_tsvector('{config}'::regconfig, choice_text))",
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS polls_question_text_trgm",
+    "DROP INDEX IF EXISTS polls_choice_text_trgm",
+    "DROP INDEX IF EXISTS polls_question_text_tsv",
+    "DROP INDEX IF EXISTS polls_choice_text_tsv",
+]
+
+# external content FTS5 tables, kept in sync by triggers
+SQLITE_FTS_TABLE = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id')",
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+    "INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+]
+
+SQLITE_TABLES = [
+    ("polls_question", "polls_question_fts", "question_text"),
+    ("polls_choice", "polls_choice_fts", "choice_text"),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRESQL_FORWARD:
+            schema_editor.execute(sql.format(config=settings.POLLS_SEARCH_CONFIG))
+    elif vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+                # polls.search falls back to icontains
+                return
+        for table, fts, column in SQLITE_TABLES:
+            for sql in SQLITE_FTS_TABLE:
+                schema_editor.execute(sql.format(table=table, fts=fts, column=column))
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRESQL_REVERSE:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        for _, fts, _ in SQLITE_TABLES:
+            for trigger in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_question_pub_date_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
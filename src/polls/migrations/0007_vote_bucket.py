@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], help_text='Width of the bucket', max_length=6)),
+                ('start', models.DateTimeField(help_text='Start of the bucket')),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('choice', models.ForeignKey(help_text='The chosen choice', on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(help_text='The question voted on', on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'verbose_name': 'Vote Bucket',
+                'verbose_name_plural': 'Vote Buckets',
+                'indexes': [models.Index(fields=['question', 'start'], name='polls_vote_bucket_series'), models.Index(fields=['resolution', 'start'], name='polls_vote_bucket_age')],
+                'constraints': [models.UniqueConstraint(fields=('choice', 'resolution', 'start'), name='unique_choice_vote_bucket')],
+            },
+        ),
+    ]
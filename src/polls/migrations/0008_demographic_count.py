@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_vote_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemographicCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(help_text='Voter attribute', max_length=50)),
+                ('value', models.CharField(blank=True, help_text='Attribute value, blank when unknown', max_length=50)),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('choice', models.ForeignKey(help_text='The chosen choice', on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(help_text='The question voted on', on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'verbose_name': 'Demographic Count',
+                'verbose_name_plural': 'Demographic Counts',
+                'indexes': [models.Index(fields=['question', 'dimension'], name='polls_demographic_breakdown')],
+                'constraints': [models.UniqueConstraint(fields=('choice', 'dimension', 'value'), name='unique_choice_demographic_value')],
+            },
+        ),
+    ]
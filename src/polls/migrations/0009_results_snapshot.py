@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_demographic_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultsSnapshot',
+            fields=[
+                ('question', models.OneToOneField(help_text='The closed question', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='results_snapshot', serialize=False, to='polls.question')),
+                ('payload', models.JSONField(help_text='Question and results, as dumped')),
+                ('html', models.TextField(help_text='Rendered choices fragment')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Results Snapshot',
+                'verbose_name_plural': 'Results Snapshots',
+            },
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the poll was closed, its results are frozen from then on', null=True),
+        ),
+    ]
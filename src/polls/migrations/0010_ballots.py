@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_results_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='ballot_type',
+            field=models.CharField(choices=[('single', 'Single choice'), ('approval', 'Multiple choice (approval)'), ('ranked', 'Ranked choice (instant runoff)')], default='single', help_text='How voters pick: one choice, any number of choices, or a ranking', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='Ballot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('choices', models.BinaryField(help_text='Packed choice ids')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the ballot was cast')),
+                ('question', models.ForeignKey(help_text='The question voted on', on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'verbose_name': 'Ballot',
+                'verbose_name_plural': 'Ballots',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_ballots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteReceipt',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('voter', models.CharField(help_text='The user id or session key of the voter', max_length=48)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the vote was cast')),
+                ('question', models.ForeignKey(help_text='The question voted on', on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'verbose_name': 'Vote Receipt',
+                'verbose_name_plural': 'Vote Receipts',
+                'constraints': [models.UniqueConstraint(fields=('question', 'voter'), name='polls_vote_receipt_unique')],
+            },
+        ),
+    ]
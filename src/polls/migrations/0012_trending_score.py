@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0011_vote_receipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='polls.question')),
+                ('score', models.FloatField(default=-1000000000.0)),
+            ],
+            options={
+                'verbose_name': 'Trending Score',
+                'verbose_name_plural': 'Trending Scores',
+                'indexes': [models.Index(fields=['-score'], name='polls_trending_score')],
+            },
+        ),
+    ]
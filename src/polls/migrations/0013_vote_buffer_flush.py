@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:12
+
+from django.db import migrations, models
+
+
+def move_flush_marks(apps, schema_editor):
+    # the last flush id used to be kept in the vote rollup marks
+    VoteRollupMark = apps.get_model('polls', 'VoteRollupMark')
+    VoteBufferFlush = apps.get_model('polls', 'VoteBufferFlush')
+    for mark in VoteRollupMark.objects.filter(name='vote_buffer'):
+        VoteBufferFlush.objects.create(name=mark.name, last_flush_id=mark.last_vote_id)
+        mark.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0012_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteBufferFlush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_flush_id', models.BigIntegerField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vote Buffer Flush',
+                'verbose_name_plural': 'Vote Buffer Flushes',
+            },
+        ),
+        migrations.RunPython(move_flush_marks, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,120 @@
 import datetime
+import math
+from collections import Counter
 
+from django.conf import settings as django_settings
 from django.contrib import admin
-from django.db import models
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Abs, Coalesce, Exp, Greatest, Ln
+from django.db.models.lookups import GreaterThan
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
+from core.config import settings
+
+from .versions import bump_results_version
+
+
+def delta_case(deltas: dict[int, int]) -> Case:
+    """
+    Build a `CASE pk WHEN ... THEN delta` expression for batched UPDATEs.
+    """
+    return Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class QuestionQuerySet(models.QuerySet):
+    def recount_votes(self) -> int:
+        """
+        Recompute the denormalized `vote_count` from `Choice.votes` in a single
+        UPDATE. Returns the number of questions updated.
+        """
+        totals = (
+            Choice.objects.filter(question=OuterRef("pk"))
+            .order_by()
+            .values("question")
+            .annotate(total=Sum("votes"))
+            .values("total")
+        )
+        bump_results_version(self.values_list("pk", flat=True))
+        return self.update(vote_count=Coalesce(Subquery(totals), Value(0)))
+
+    def with_live_vote_count(self) -> "QuestionQuerySet":
+        """
+        Annotate `live_vote_count`, the total votes including votes still
+        sitting in counter shards.
+        """
+        return self.annotate(
+            live_vote_count=F("vote_count") + pending_question_votes(OuterRef("pk"))
+        )
+
+    def with_choice_count(self) -> "QuestionQuerySet":
+        """
+        Annotate `choice_count` with a correlated subquery rather than a
+        join and GROUP BY, so the rows can still be read off an index.
+        """
+        choice_count = (
+            Choice.objects.filter(question=OuterRef("pk"))
+            .order_by()
+            .values("question")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return self.annotate(choice_count=Coalesce(Subquery(choice_count), Value(0)))
+
+    def trending(self) -> "QuestionQuerySet":
+        """
+        The questions with trending scores, hottest first, annotated with
+        `choice_count`. Served from the score index, without aggregating votes.
+        """
+        return (
+            self.filter(trending_score__isnull=False)
+            .with_choice_count()
+            .order_by("-trending_score__score", "-pk")
+        )
+
+
+def pending_question_votes(question) -> Coalesce:
+    """
+    The votes of `question` (a pk or an outer reference) not yet compacted
+    out of its counter shards.
+    """
+    pending = (
+        ChoiceVoteShard.objects.filter(choice__question=question)
+        .values("choice__question")
+        .annotate(total=Sum("votes"))
+        .values("total")
+    )
+    return Coalesce(Subquery(pending), Value(0))
+
 
 class Question(models.Model):
     """
     A poll question that users can vote on.
     """
 
+    class BallotType(models.TextChoices):
+        SINGLE = "single", "Single choice"
+        APPROVAL = "approval", "Multiple choice (approval)"
+        RANKED = "ranked", "Ranked choice (instant runoff)"
+
     question_text = models.CharField(
         max_length=200, help_text="The question being asked"
     )
@@ -18,15 +123,52 @@ class Question(models.Model):
         default=timezone.now,
         help_text="When this question was published",
     )
+    vote_shard_count = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="Number of counter rows each choice spreads its votes over, "
+        "raise it for polls with heavy concurrent voting",
+    )
+    vote_count = models.IntegerField(
+        "total votes",
+        default=0,
+        editable=False,
+        help_text="Denormalized sum of the votes of all choices",
+    )
+    ballot_type = models.CharField(
+        max_length=10,
+        choices=BallotType.choices,
+        default=BallotType.SINGLE,
+        help_text="How voters pick: one choice, any number of choices, or a ranking",
+    )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the poll was closed, its results are frozen from then on",
+    )
+
+    objects = QuestionQuerySet.as_manager()
 
     class Meta:
         ordering = ["-pub_date"]
         verbose_name = "Poll Question"
         verbose_name_plural = "Poll Questions"
+        indexes = [
+            # keyset pagination of the index
+            models.Index(fields=["pub_date", "id"], name="polls_question_pub_date_id"),
+        ]
 
     def __str__(self):
         return self.question_text
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_results_version([self.pk])
+
+    @property
+    def is_closed(self) -> bool:
+        return self.closed_at is not None
+
     @admin.display(
         boolean=True,
         ordering="pub_date",
@@ -41,9 +183,77 @@ class Question(models.Model):
 
     def total_votes(self):
         """
-        Returns the total number of votes for this question.
+        Returns the total number of votes for this question, as of when it
+        was loaded. Use `with_live_vote_count()` for a fresh total.
+        """
+        if self.vote_shard_count == 1:
+            return self.vote_count
+
+        pending = ChoiceVoteShard.objects.filter(choice__question=self).aggregate(
+            total=Sum("votes")
+        )["total"]
+        return self.vote_count + (pending or 0)
+
+
+class ChoiceQuerySet(models.QuerySet):
+    def add_votes(
+        self, deltas: dict[int, int], cast_at: datetime.datetime | None = None
+    ) -> int:
+        """
+        Add aggregated vote deltas (choice id -> votes) in batched UPDATEs,
+        keeping `Question.vote_count` in step. Returns the number of rows updated.
+
+        Votes cast at `cast_at` are also counted into the vote time series,
+        corrections leave it out.
+        """
+        updated = 0
+        pks = sorted(deltas)
+        series: dict[tuple[datetime.datetime, int, int], int] = {}
+        with transaction.atomic(using=self.db):
+            for start in range(0, len(pks), settings.BATCH_SIZE):
+                batch = {
+                    pk: deltas[pk] for pk in pks[start : start + settings.BATCH_SIZE]
+                }
+                choices = self.filter(pk__in=batch)
+
+                question_deltas: Counter[int] = Counter()
+                for pk, question_id in choices.values_list("pk", "question_id"):
+                    question_deltas[question_id] += batch[pk]
+                    series[cast_at, question_id, pk] = batch[pk]
+
+                updated += choices.update(votes=F("votes") + delta_case(batch))
+                Question.objects.filter(pk__in=question_deltas).update(
+                    vote_count=F("vote_count") + delta_case(question_deltas)
+                )
+                bump_results_version(question_deltas)
+            if cast_at is not None:
+                count_vote_series(series)
+        return updated
+
+    def with_live_votes(self) -> "ChoiceQuerySet":
+        """
+        Annotate `live_votes`, the compacted count plus votes still sitting in
+        counter shards.
+        """
+        pending = (
+            ChoiceVoteShard.objects.filter(choice=OuterRef("pk"))
+            .values("choice")
+            .annotate(total=Sum("votes"))
+            .values("total")
+        )
+        return self.annotate(
+            live_votes=F("votes") + Coalesce(Subquery(pending), Value(0))
+        )
+
+    def with_question_live_votes(self) -> "ChoiceQuerySet":
+        """
+        Annotate `question_live_votes`, the live total of the choice's question,
+        so percentages need no query per choice.
         """
-        return sum(choice.votes for choice in self.choice_set.all())
+        return self.annotate(
+            question_live_votes=F("question__vote_count")
+            + pending_question_votes(OuterRef("question"))
+        )
 
 
 class Choice(models.Model):
@@ -59,6 +269,8 @@ class Choice(models.Model):
     choice_text = models.CharField(max_length=200, help_text="The choice text")
     votes = models.IntegerField(default=0, help_text="Number of votes for this choice")
 
+    objects = ChoiceQuerySet.as_manager()
+
     class Meta:
         ordering = ["-votes", "choice_text"]
         verbose_name = "Poll Choice"
@@ -67,11 +279,689 @@ class Choice(models.Model):
     def __str__(self):
         return f"{self.choice_text} ({self.votes} votes)"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # the choice text is part of the results too, so bump on any save
+            bump_results_version(
+                {self.question_id, getattr(self, "_loaded_question_id", None)} - {None}
+            )
+            self._sync_question_vote_count(adding, kwargs.get("update_fields"))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered to keep Question.vote_count in step on save
+        instance._loaded_votes = instance.__dict__.get("votes")
+        instance._loaded_question_id = instance.__dict__.get("question_id")
+        return instance
+
+    def _sync_question_vote_count(self, adding, update_fields):
+        """
+        Apply the change of this choice's votes to `Question.vote_count`.
+        """
+        if update_fields is not None and not {"votes", "question"} & set(update_fields):
+            return
+
+        loaded_votes = getattr(self, "_loaded_votes", None)
+        loaded_question_id = getattr(self, "_loaded_question_id", None)
+        if not isinstance(self.votes, int) or (not adding and loaded_votes is None):
+            # an expression such as F("votes") + 1, the new value is unknown
+            question_ids = {self.question_id, loaded_question_id} - {None}
+            Question.objects.filter(pk__in=question_ids).recount_votes()
+        elif adding or loaded_question_id == self.question_id:
+            delta = self.votes - (0 if adding else loaded_votes)
+            if delta:
+                Question.objects.filter(pk=self.question_id).update(
+                    vote_count=F("vote_count") + delta
+                )
+                if self._meta.get_field("question").is_cached(self):
+                    # keep the question this choice was created from in step
+                    self.question.vote_count += delta
+        else:
+            Question.objects.filter(pk=loaded_question_id).update(
+                vote_count=F("vote_count") - loaded_votes
+            )
+            Question.objects.filter(pk=self.question_id).update(
+                vote_count=F("vote_count") + self.votes
+            )
+
+        if isinstance(self.votes, int):
+            self._loaded_votes = self.votes
+            self._loaded_question_id = self.question_id
+        else:
+            self._loaded_votes = self._loaded_question_id = None
+
+    def live_votes_count(self):
+        """
+        Returns the votes of this choice including un-compacted shard votes.
+        """
+        if hasattr(self, "live_votes"):
+            return self.live_votes
+        pending = self.vote_shards.aggregate(total=Sum("votes"))["total"] or 0
+        return self.votes + pending
+
     def vote_percentage(self):
         """
         Returns the percentage of votes this choice has received for its question.
         """
-        total = self.question.total_votes()
+        if hasattr(self, "question_live_votes"):
+            total = self.question_live_votes
+        else:
+            total = self.question.total_votes()
         if total == 0:
             return 0
-        return round((self.votes / total) * 100, 1)
+        return round((self.live_votes_count() / total) * 100, 1)
+
+
+class ResultsSnapshot(models.Model):
+    """
+    The frozen results of a closed poll: the results payload and the rendered
+    choices fragment, served as is instead of being recomputed.
+    """
+
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="results_snapshot",
+        help_text="The closed question",
+    )
+    payload = models.JSONField(help_text="Question and results, as dumped")
+    html = models.TextField(help_text="Rendered choices fragment")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Results Snapshot"
+        verbose_name_plural = "Results Snapshots"
+
+    def __str__(self):
+        return f"Results of {self.question_id} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class ChoiceVoteShard(models.Model):
+    """
+    One of the counter rows a hot choice spreads its votes over.
+
+    Concurrent votes land on different rows instead of queueing on the lock of
+    the single `Choice` row; compaction folds the shards back into `Choice.votes`.
+    """
+
+    choice = models.ForeignKey(
+        Choice,
+        on_delete=models.CASCADE,
+        related_name="vote_shards",
+        help_text="The choice this shard counts votes for",
+    )
+    shard = models.PositiveSmallIntegerField(help_text="Shard number")
+    votes = models.IntegerField(default=0, help_text="Votes not yet compacted")
+
+    class Meta:
+        verbose_name = "Choice Vote Shard"
+        verbose_name_plural = "Choice Vote Shards"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["choice", "shard"], name="unique_choice_vote_shard"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id}#{self.shard} ({self.votes} votes)"
+
+
+class Vote(models.Model):
+    """
+    One cast vote, an append-only event.
+
+    Events are never updated; the rollup folds them into `Choice.votes` past a
+    high-water mark. The table is keyed by an increasing id and indexed on
+    `created_at`, so it can be range partitioned by time and old partitions
+    detached without touching the counters.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    choice = models.ForeignKey(
+        Choice, on_delete=models.CASCADE, help_text="The chosen choice"
+    )
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, help_text="The question voted on"
+    )
+    user = models.ForeignKey(
+        django_settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text="The voter, if signed in",
+    )
+    session_key = models.CharField(
+        max_length=40, blank=True, help_text="The voter's session, if any"
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now, help_text="When the vote was cast"
+    )
+
+    class Meta:
+        verbose_name = "Vote"
+        verbose_name_plural = "Votes"
+        indexes = [
+            models.Index(fields=["created_at"], name="polls_vote_created_at"),
+            models.Index(
+                fields=["question", "created_at"], name="polls_vote_question_time"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id} at {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+
+class Ballot(models.Model):
+    """
+    A multi-select or ranked ballot.
+
+    The picked choice ids are packed into `choices` as little-endian int32s,
+    in order of preference for ranked polls (see `polls.ballots`), so millions
+    of ballots load as one buffer per tally.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, help_text="The question voted on"
+    )
+    choices = models.BinaryField(help_text="Packed choice ids")
+    created_at = models.DateTimeField(
+        default=timezone.now, help_text="When the ballot was cast"
+    )
+
+    class Meta:
+        verbose_name = "Ballot"
+        verbose_name_plural = "Ballots"
+
+    def __str__(self):
+        return f"Ballot {self.pk} on {self.question_id}"
+
+
+class VoteReceipt(models.Model):
+    """
+    Marks that a voter has voted on a question, when each voter gets one vote
+    (`ENABLE_ONE_VOTE_PER_VOTER`).
+
+    The unique constraint is the authority; `polls.voters` keeps an in-memory
+    filter of the receipts so new voters skip the lookup.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, help_text="The question voted on"
+    )
+    voter = models.CharField(
+        max_length=48, help_text="The user id or session key of the voter"
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now, help_text="When the vote was cast"
+    )
+
+    class Meta:
+        verbose_name = "Vote Receipt"
+        verbose_name_plural = "Vote Receipts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question", "voter"], name="polls_vote_receipt_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.voter} on {self.question_id}"
+
+
+class VoteRollupMark(models.Model):
+    """
+    High-water mark of the vote log, every event up to `last_vote_id` has been
+    counted into `Choice.votes`.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    last_vote_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Vote Rollup Mark"
+        verbose_name_plural = "Vote Rollup Marks"
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_vote_id}"
+
+
+class VoteBufferFlush(models.Model):
+    """
+    The last flush applied from a vote buffer, so a flush interrupted after
+    its deltas were committed is not applied again.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    last_flush_id = models.BigIntegerField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Vote Buffer Flush"
+        verbose_name_plural = "Vote Buffer Flushes"
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_flush_id}"
+
+
+class VoteBucketQuerySet(models.QuerySet):
+    def add_votes(
+        self,
+        deltas: dict[tuple[int, int], int],
+        cast_at: datetime.datetime,
+        resolution: str = "minute",
+    ) -> None:
+        """
+        Count votes ((question id, choice id) -> votes) into the buckets of
+        `cast_at`, creating missing buckets.
+        """
+        self.add_counts(
+            {
+                (cast_at, question_id, choice_id): votes
+                for (question_id, choice_id), votes in deltas.items()
+            },
+            resolution,
+        )
+
+    def add_counts(
+        self,
+        counts: dict[tuple[datetime.datetime, int, int], int],
+        resolution: str = "minute",
+    ) -> None:
+        """
+        Count votes ((cast at, question id, choice id) -> votes) into their
+        buckets: one INSERT of the missing buckets, which start at their
+        votes, and batched UPDATEs of the others.
+        """
+        resolution = VoteBucket.Resolution(resolution)
+        votes: Counter[tuple[datetime.datetime, int, int]] = Counter()
+        for (cast_at, question_id, choice_id), count in counts.items():
+            votes[resolution.truncate(cast_at), question_id, choice_id] += count
+        if not votes:
+            return
+
+        buckets = self.filter(
+            resolution=resolution,
+            choice__in={choice_id for _, _, choice_id in votes},
+            start__in={start for start, _, _ in votes},
+        )
+
+        def bucket_pks() -> dict[tuple[int, datetime.datetime], int]:
+            return {
+                (choice_id, start): pk
+                for pk, choice_id, start in buckets.values_list("pk", "choice", "start")
+            }
+
+        pks = bucket_pks()
+        missing = [key for key in votes if (key[2], key[0]) not in pks]
+        if missing:
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create(
+                        [
+                            VoteBucket(
+                                question_id=question_id,
+                                choice_id=choice_id,
+                                resolution=resolution,
+                                start=start,
+                                votes=votes[start, question_id, choice_id],
+                            )
+                            for start, question_id, choice_id in missing
+                        ],
+                        batch_size=settings.BATCH_SIZE,
+                    )
+            except IntegrityError:
+                # a concurrent flush created some of them, add to all buckets
+                self.bulk_create(
+                    [
+                        VoteBucket(
+                            question_id=question_id,
+                            choice_id=choice_id,
+                            resolution=resolution,
+                            start=start,
+                        )
+                        for start, question_id, choice_id in missing
+                    ],
+                    ignore_conflicts=True,
+                    batch_size=settings.BATCH_SIZE,
+                )
+                pks = bucket_pks()
+
+        deltas = {
+            pks[choice_id, start]: count
+            for (start, _, choice_id), count in votes.items()
+            if (choice_id, start) in pks
+        }
+        ordered = sorted(deltas)
+        for i in range(0, len(ordered), settings.BATCH_SIZE):
+            batch = {pk: deltas[pk] for pk in ordered[i : i + settings.BATCH_SIZE]}
+            self.filter(pk__in=batch).update(votes=F("votes") + delta_case(batch))
+
+
+class VoteBucket(models.Model):
+    """
+    Votes a choice received during one minute, hour or day.
+
+    Votes are counted into minute buckets as they are applied to
+    `Choice.votes`; compaction folds old minutes into hours and old hours into
+    days. Chart series are read with one range scan of
+    `polls_vote_bucket_series`.
+    """
+
+    class Resolution(models.TextChoices):
+        MINUTE = "minute", "Minute"
+        HOUR = "hour", "Hour"
+        DAY = "day", "Day"
+
+        @property
+        def width(self) -> datetime.timedelta:
+            return {
+                "minute": datetime.timedelta(minutes=1),
+                "hour": datetime.timedelta(hours=1),
+                "day": datetime.timedelta(days=1),
+            }[self.value]
+
+        def truncate(self, moment: datetime.datetime) -> datetime.datetime:
+            """Return the start of the UTC bucket `moment` falls in."""
+            moment = moment.astimezone(datetime.UTC).replace(second=0, microsecond=0)
+            if self is not VoteBucket.Resolution.MINUTE:
+                moment = moment.replace(minute=0)
+            if self is VoteBucket.Resolution.DAY:
+                moment = moment.replace(hour=0)
+            return moment
+
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, help_text="The question voted on"
+    )
+    choice = models.ForeignKey(
+        Choice, on_delete=models.CASCADE, help_text="The chosen choice"
+    )
+    resolution = models.CharField(
+        max_length=6, choices=Resolution.choices, help_text="Width of the bucket"
+    )
+    start = models.DateTimeField(help_text="Start of the bucket")
+    votes = models.PositiveIntegerField(default=0)
+
+    objects = VoteBucketQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Vote Bucket"
+        verbose_name_plural = "Vote Buckets"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["choice", "resolution", "start"],
+                name="unique_choice_vote_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["question", "start"], name="polls_vote_bucket_series"),
+            models.Index(fields=["resolution", "start"], name="polls_vote_bucket_age"),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id} {self.resolution} {self.start:%Y-%m-%d %H:%M}"
+
+
+class DemographicCountQuerySet(models.QuerySet):
+    def add_votes(self, counts: dict[tuple[int, int, str, str], int]) -> None:
+        """
+        Add votes ((question id, choice id, dimension, value) -> votes) to the
+        cube in batched statements, creating missing cells.
+        """
+        cells = self.filter(
+            choice__in={choice_id for _, choice_id, _, _ in counts},
+            dimension__in={dimension for _, _, dimension, _ in counts},
+        )
+
+        def cell_pks() -> dict[tuple[int, str, str], int]:
+            return {
+                (choice_id, dimension, value): pk
+                for pk, choice_id, dimension, value in cells.values_list(
+                    "pk", "choice", "dimension", "value"
+                )
+            }
+
+        pks = cell_pks()
+        missing = [key for key in counts if key[1:] not in pks]
+        if missing:
+            self.bulk_create(
+                [
+                    DemographicCount(
+                        question_id=question_id,
+                        choice_id=choice_id,
+                        dimension=dimension,
+                        value=value,
+                    )
+                    for question_id, choice_id, dimension, value in missing
+                ],
+                ignore_conflicts=True,
+                batch_size=settings.BATCH_SIZE,
+            )
+            pks = cell_pks()
+
+        deltas = {pks[key[1:]]: votes for key, votes in counts.items()}
+        self.filter(pk__in=deltas).update(votes=F("votes") + delta_case(deltas))
+
+
+class DemographicCount(models.Model):
+    """
+    Votes of one choice cast by voters with one value of a demographic
+    dimension, e.g. ("skill_level", "expert").
+
+    The cube is counted from the vote log, so a breakdown of a question is one
+    read of `polls_demographic_breakdown` instead of joining votes to profiles.
+    """
+
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, help_text="The question voted on"
+    )
+    choice = models.ForeignKey(
+        Choice, on_delete=models.CASCADE, help_text="The chosen choice"
+    )
+    dimension = models.CharField(max_length=50, help_text="Voter attribute")
+    value = models.CharField(
+        max_length=50, blank=True, help_text="Attribute value, blank when unknown"
+    )
+    votes = models.PositiveIntegerField(default=0)
+
+    objects = DemographicCountQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Demographic Count"
+        verbose_name_plural = "Demographic Counts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["choice", "dimension", "value"],
+                name="unique_choice_demographic_value",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["question", "dimension"], name="polls_demographic_breakdown"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id} {self.dimension}={self.value} ({self.votes} votes)"
+
+
+@receiver(post_delete, sender=Question)
+def bump_deleted_question_version(sender, instance, **kwargs):
+    """
+    Invalidate everything cached for a deleted question.
+    """
+    from .snapshots import snapshot_cache_key
+
+    bump_results_version([instance.pk])
+    # snapshots are cached without a timeout, so drop them explicitly
+    key = snapshot_cache_key(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_delete, sender=Choice)
+def subtract_deleted_choice_votes(sender, instance, origin=None, **kwargs):
+    """
+    Keep `Question.vote_count` in step when choices are deleted.
+    """
+    bump_results_version([instance.question_id])
+    if isinstance(origin, Question) or getattr(origin, "model", None) is Question:
+        # the question goes away together with its choices
+        return
+
+    Question.objects.filter(pk=instance.question_id).update(
+        vote_count=F("vote_count") - instance.votes
+    )
+
+
+# scores are logs of votes weighted by their age relative to this instant
+TRENDING_EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
+# score of a row before its first vote, log of (nearly) zero votes
+NO_VOTES_SCORE = -1e9
+# gap between two log-scores past which the smaller one is negligible
+MAX_EXP_GAP = 700
+
+
+def log_add(a: float, b: float) -> float:
+    """
+    Return log(exp(a) + exp(b)), without overflowing.
+    """
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+class TrendingScoreQuerySet(models.QuerySet):
+    def add_votes(self, deltas: dict[int, int], cast_at: datetime.datetime) -> None:
+        """
+        Count votes (question id -> votes) cast at `cast_at` into the scores,
+        creating missing rows.
+        """
+        self.add_counts(
+            {(cast_at, question_id): votes for question_id, votes in deltas.items()}
+        )
+
+    def add_counts(self, counts: dict[tuple[datetime.datetime, int], int]) -> None:
+        """
+        Count votes ((cast at, question id) -> votes) into the scores, one
+        statement for the missing rows and one UPDATE for the others.
+        """
+        weights: dict[int, float] = {}
+        for (cast_at, question_id), votes in counts.items():
+            if votes > 0:
+                weight = TrendingScore.weight(votes, cast_at)
+                if question_id in weights:
+                    weight = log_add(weights[question_id], weight)
+                weights[question_id] = weight
+        if not weights:
+            return
+        existing = set(
+            self.filter(question__in=weights).values_list("question", flat=True)
+        )
+        missing = set(weights) - existing
+        if missing:
+            try:
+                with transaction.atomic():
+                    # new rows start at their weight and need no UPDATE
+                    self.bulk_create(
+                        [
+                            TrendingScore(question_id=pk, score=weights[pk])
+                            for pk in missing
+                        ],
+                        batch_size=settings.BATCH_SIZE,
+                    )
+            except IntegrityError:
+                # a concurrent vote created some of them, add to all rows
+                self.bulk_create(
+                    [TrendingScore(question_id=pk) for pk in missing],
+                    ignore_conflicts=True,
+                    batch_size=settings.BATCH_SIZE,
+                )
+            else:
+                weights = {pk: weights[pk] for pk in existing}
+                if not weights:
+                    return
+
+        weight = Case(
+            *[When(question=pk, then=Value(w)) for pk, w in weights.items()],
+            default=Value(NO_VOTES_SCORE),
+            output_field=FloatField(),
+        )
+        diff = Abs(F("score") - weight)
+        # log(exp(score) + exp(weight)), without overflowing; past a gap of
+        # MAX_EXP_GAP the correction is below float precision, and EXP of
+        # such large negatives underflows to an error on PostgreSQL
+        self.filter(question__in=weights).update(
+            score=Greatest(F("score"), weight)
+            + Case(
+                When(GreaterThan(diff, MAX_EXP_GAP), then=Value(0.0)),
+                default=Ln(1 + Exp(-diff)),
+                output_field=FloatField(),
+            )
+        )
+
+
+class TrendingScore(models.Model):
+    """
+    Vote velocity of a question, with exponential time decay.
+
+    A vote cast at t counts 2^-(now - t)/half-life. Rather than decaying every
+    score as time passes, `score` holds the log of the votes each weighted by
+    2^(t - epoch)/half-life: adding votes is one UPDATE of the question's row,
+    and the ranking, which is the same at any instant, is read from the score
+    index.
+    """
+
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="trending_score",
+    )
+    score = models.FloatField(default=NO_VOTES_SCORE)
+
+    objects = TrendingScoreQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Trending Score"
+        verbose_name_plural = "Trending Scores"
+        indexes = [models.Index(fields=["-score"], name="polls_trending_score")]
+
+    def __str__(self):
+        return f"{self.question_id}: {self.score:.3f}"
+
+    @staticmethod
+    def weight(votes: int, at: datetime.datetime) -> float:
+        """
+        The log-space weight of `votes` cast at `at`.
+        """
+        half_lives = (at - TRENDING_EPOCH).total_seconds() / (
+            settings.TRENDING_HALF_LIFE_HOURS * 3600
+        )
+        return math.log(votes) + half_lives * math.log(2)
+
+    def decayed_votes(self, now: datetime.datetime | None = None) -> float:
+        """
+        The votes decayed to `now`, i.e. the recent vote velocity.
+        """
+        now = timezone.now() if now is None else now
+        return math.exp(self.score - TrendingScore.weight(1, now))
+
+
+def count_vote_series(counts: dict[tuple[datetime.datetime, int, int], int]) -> None:
+    """
+    Count votes ((cast at, question id, choice id) -> votes) into the vote time
+    series and the trending scores, with a few set-based statements however
+    many minutes they span.
+    """
+    if settings.ENABLE_VOTE_TIMESERIES:
+        VoteBucket.objects.add_counts(counts)
+    if settings.ENABLE_TRENDING:
+        question_counts: Counter[tuple[datetime.datetime, int]] = Counter()
+        for (cast_at, question_id, _), votes in counts.items():
+            question_counts[cast_at, question_id] += votes
+        TrendingScore.objects.add_counts(question_counts)
@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with a `WHERE (key) < (cursor)` range on an indexed,
+unique ordering instead of OFFSET, and without a `COUNT(*)`, so every page of
+a huge table costs the same single index range scan. Cursors encode the
+ordering key of the first or last row of a page and stay stable while rows are
+inserted.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from django.db.models import Model, QuerySet
+
+
+class InvalidCursorError(ValueError):
+    """Malformed or tampered pagination cursor."""
+
+
+@dataclass
+class KeysetPage:
+    object_list: list[Model]
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by `ordering`, whose fields must all sort in the same
+    direction and end with a unique field, e.g. `("-pub_date", "-id")`.
+    """
+
+    def __init__(
+        self, queryset: QuerySet, ordering: Sequence[str], page_size: int
+    ) -> None:
+        descending = {name.startswith("-") for name in ordering}
+        if len(descending) != 1:
+            msg = "Keyset ordering fields must all sort in the same direction"
+            raise ValueError(msg)
+
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.fields = [name.lstrip("-") for name in ordering]
+        self.descending = descending.pop()
+        self.page_size = page_size
+
+    def get_page(self, cursor: str | None = None) -> KeysetPage:
+        """
+        Return the page after (or, for a previous cursor, before) `cursor`,
+        the first page when there is none.
+        """
+        backwards, key = self.decode_cursor(cursor) if cursor else (False, None)
+
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._beyond(key, backwards))
+        ordering = self._reversed_ordering() if backwards else self.ordering
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if backwards:
+            rows.reverse()
+
+        # the row the cursor was taken from lies behind the direction of travel
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        page = KeysetPage(rows)
+        if rows and has_next:
+            page.next_cursor = self.encode_cursor(rows[-1], backwards=False)
+        if rows and has_previous:
+            page.previous_cursor = self.encode_cursor(rows[0], backwards=True)
+        return page
+
+    def encode_cursor(self, obj: Model, backwards: bool) -> str:
+        values = [self._field(name).value_to_string(obj) for name in self.fields]
+        payload = json.dumps({"b": backwards, "k": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[bool, list[Any]]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            values = payload["k"]
+            if len(values) != len(self.fields):
+                raise InvalidCursorError(cursor)
+            key = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values, strict=True)
+            ]
+        except (ValueError, TypeError, KeyError, ValidationError) as e:
+            raise InvalidCursorError(cursor) from e
+        return bool(payload.get("b")), key
+
+    def _field(self, name: str):
+        return self.queryset.model._meta.get_field(name)
+
+    def _reversed_ordering(self) -> list[str]:
+        return [name[1:] if self.descending else f"-{name}" for name in self.ordering]
+
+    def _beyond(self, key: list[Any], backwards: bool) -> Q:
+        """
+        Rows strictly past `key` in the direction of travel. The leading
+        inclusive bound on the first field lets the database use the index for
+        the range, the OR of equal prefixes settles ties.
+        """
+        before = self.descending != backwards
+        strict, inclusive = ("lt", "lte") if before else ("gt", "gte")
+
+        beyond = Q()
+        for i, name in enumerate(self.fields):
+            prefix = {self.fields[j]: key[j] for j in range(i)}
+            beyond |= Q(**prefix, **{f"{name}__{strict}": key[i]})
+        return Q(**{f"{self.fields[0]}__{inclusive}": key[0]}) & beyond
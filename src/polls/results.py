@@ -0,0 +1,156 @@
+"""
+Precomputed poll results.
+
+The results and detail pages render from a `PollResults` built with a single
+annotated query, instead of walking `question.choice_set` and calling
+`Choice.vote_percentage()` (one more query each) per choice.
+
+The results page additionally caches the results and the rendered choices
+fragment under the question's results version (see `polls.versions`).
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+
+from .models import Choice, Question
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+RESULTS_CACHE_HITS = "polls:results_cache:hits"
+RESULTS_CACHE_MISSES = "polls:results_cache:misses"
+
+
+@dataclass(frozen=True)
+class ChoiceResult:
+    id: int
+    choice_text: str
+    votes: int
+    percentage: float
+
+
+@dataclass(frozen=True)
+class PollResults:
+    question_id: int
+    choices: list[ChoiceResult]
+    total_votes: int
+
+    @property
+    def choice_count(self) -> int:
+        return len(self.choices)
+
+
+def build_results(question: Question) -> PollResults:
+    """
+    Build the results of `question`, including un-compacted shard votes, from
+    one query.
+    """
+    return results_from_rows(question.pk, list(results_rows(question)))
+
+
+async def abuild_results(question: Question) -> PollResults:
+    """
+    Async `build_results`.
+    """
+    rows = [row async for row in results_rows(question)]
+    return results_from_rows(question.pk, rows)
+
+
+def results_rows(question: Question) -> QuerySet:
+    return (
+        Choice.objects.filter(question=question)
+        .with_live_votes()
+        .order_by("-live_votes", "choice_text")
+        .values_list("pk", "choice_text", "live_votes")
+    )
+
+
+def results_from_rows(
+    question_id: int, rows: list[tuple[int, str, int]]
+) -> PollResults:
+    total = sum(votes for _, _, votes in rows)
+    return PollResults(
+        question_id=question_id,
+        choices=[
+            ChoiceResult(
+                id=pk,
+                choice_text=choice_text,
+                votes=votes,
+                percentage=round(votes / total * 100, 1) if total else 0,
+            )
+            for pk, choice_text, votes in rows
+        ],
+        total_votes=total,
+    )
+
+
+def results_cache_key(question_id: int, version: int, part: str) -> str:
+    return f"polls:results:{question_id}:{version}:{part}"
+
+
+def dump_results(question: Question, results: PollResults) -> dict:
+    """
+    Serialize the question and its results to a JSON-able dict.
+    """
+    return {
+        "id": question.pk,
+        "question_text": question.question_text,
+        "pub_date": question.pub_date.isoformat(),
+        "total_votes": results.total_votes,
+        "choices": [asdict(choice) for choice in results.choices],
+    }
+
+
+def load_results(payload: dict) -> tuple[Question, PollResults]:
+    """
+    Rebuild an unsaved question and its results from `dump_results` output.
+    """
+    question = Question(
+        pk=payload["id"],
+        question_text=payload["question_text"],
+        pub_date=datetime.fromisoformat(payload["pub_date"]),
+    )
+    results = PollResults(
+        question_id=payload["id"],
+        choices=[ChoiceResult(**choice) for choice in payload["choices"]],
+        total_votes=payload["total_votes"],
+    )
+    return question, results
+
+
+def count_results_cache(hit: bool) -> None:
+    key = RESULTS_CACHE_HITS if hit else RESULTS_CACHE_MISSES
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+async def acount_results_cache(hit: bool) -> None:
+    key = RESULTS_CACHE_HITS if hit else RESULTS_CACHE_MISSES
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, None):
+            await cache.aincr(key)
+
+
+def get_results_cache_stats() -> dict[str, int]:
+    """
+    Return the results cache hit and miss counters.
+    """
+    counters = cache.get_many([RESULTS_CACHE_HITS, RESULTS_CACHE_MISSES])
+    return {
+        "hits": counters.get(RESULTS_CACHE_HITS, 0),
+        "misses": counters.get(RESULTS_CACHE_MISSES, 0),
+    }
+
+
+def reset_results_cache_stats() -> None:
+    cache.delete_many([RESULTS_CACHE_HITS, RESULTS_CACHE_MISSES])
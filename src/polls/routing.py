@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    # ex: /ws/polls/5/results/
+    path("ws/polls/<int:question_id>/results/", consumers.ResultsConsumer.as_asgi()),
+]
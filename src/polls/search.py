@@ -0,0 +1,327 @@
+"""
+Poll search.
+
+Questions and choices are searched through the database's own text index
+instead of `icontains`, which scans the whole table:
+- PostgreSQL: `tsvector` match ranked with `ts_rank`, plus `pg_trgm`
+  similarity, both served by GIN expression indexes
+- SQLite: FTS5 tables kept in sync with triggers, ranked with `bm25`
+- anything else (or SQLite without FTS5): `icontains`, unranked
+
+All of them annotate `search_rank`, higher is more relevant. The indexes are
+created by the `0006_search_indexes` migration, and checked after every
+migrate by `install_search_indexes`: SQLite drops the FTS5 triggers whenever a
+migration rebuilds an indexed table, and test databases created without
+migrations have no indexes at all.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from core.config import settings
+
+from .models import Choice, Question
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+    from django.db.models import QuerySet
+
+_fts_tables: dict[str, bool] = {}
+
+# the migration the indexes belong to
+SEARCH_MIGRATION = ("polls", "0006_search_indexes")
+
+POSTGRESQL_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS polls_question_text_trgm "
+    "ON polls_question USING gin (question_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS polls_choice_text_trgm "
+    "ON polls_choice USING gin (choice_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS polls_question_text_tsv "
+    "ON polls_question USING gin (to_tsvector('{config}'::regconfig, question_text))",
+    "CREATE INDEX IF NOT EXISTS polls_choice_text_tsv "
+    "ON polls_choice USING gin (to_tsvector('{config}'::regconfig, choice_text))",
+]
+
+# external content FTS5 tables, kept in sync by triggers
+SQLITE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE {fts} "
+    "USING fts5({column}, content='{table}', content_rowid='id')"
+)
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, {column}) "
+    "VALUES ('delete', old.id, old.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} "
+    "BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+    "VALUES ('delete', old.id, old.{column}); "
+    "INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+]
+SQLITE_FTS_REBUILD = "INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+SQLITE_TABLES = [
+    ("polls_question", "polls_question_fts", "question_text"),
+    ("polls_choice", "polls_choice_fts", "choice_text"),
+]
+
+
+class ILikeContains(Lookup):
+    """
+    Case-insensitive containment as `ILIKE` on the bare column, which the
+    trigram indexes serve. `icontains` compiles to `UPPER(col) LIKE UPPER(%s)`
+    on PostgreSQL, which they cannot.
+    """
+
+    lookup_name = "ilike_contains"
+    # the text is only escaped into a pattern, in get_db_prep_lookup
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
+
+
+def search_questions(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Filter `queryset` to the questions whose text or choices match `query`,
+    annotated with `search_rank`.
+    """
+    query = query.strip()
+    if not query:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    backend = get_search_backend(queryset.db)
+    if backend == "postgresql":
+        return _search_questions_postgresql(queryset, query)
+    if backend == "fts5":
+        return _search_questions_fts5(queryset, query)
+
+    choices = Choice.objects.filter(choice_text__icontains=query).values("question")
+    return queryset.filter(
+        Q(question_text__icontains=query) | Q(pk__in=choices)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search_choices(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Filter `queryset` to the choices whose text, or whose question's text,
+    matches `query`, annotated with `search_rank`.
+    """
+    query = query.strip()
+    if not query:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    backend = get_search_backend(queryset.db)
+    if backend == "postgresql":
+        from django.contrib.postgres.search import SearchRank, TrigramSimilarity
+
+        search_query = _postgresql_query(query)
+        return queryset.filter(
+            Q(pk__in=_matching(Choice, "choice_text", search_query))
+            | ILikeContains(F("choice_text"), query)
+            | Q(question__in=_matching(Question, "question_text", search_query))
+            | ILikeContains(F("question__question_text"), query)
+        ).annotate(
+            search_rank=SearchRank(_ts_vector("choice_text"), search_query)
+            + TrigramSimilarity("choice_text", query)
+            # a match on the question counts half as much as one on the choice
+            + 0.5 * SearchRank(_ts_vector("question__question_text"), search_query)
+        )
+    if backend == "fts5":
+        match = fts5_query(query)
+        by_choice = RawSQL(
+            "SELECT rowid FROM polls_choice_fts WHERE polls_choice_fts MATCH %s",
+            [match],
+        )
+        by_question = RawSQL(
+            "SELECT rowid FROM polls_question_fts WHERE polls_question_fts MATCH %s",
+            [match],
+        )
+        return queryset.filter(
+            Q(pk__in=by_choice) | Q(question__in=by_question)
+        ).annotate(
+            search_rank=_fts5_rank("polls_choice_fts", match, "polls_choice.id")
+            + 0.5 * _fts5_rank("polls_question_fts", match, "polls_choice.question_id")
+        )
+
+    return queryset.filter(
+        Q(choice_text__icontains=query) | Q(question__question_text__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def get_search_backend(using: str = "default") -> str:
+    """
+    Return the search backend of the database: "postgresql", "fts5" or
+    "icontains".
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        return "postgresql"
+    if connection.vendor != "sqlite":
+        return "icontains"
+
+    name = str(connection.settings_dict["NAME"])
+    if name not in _fts_tables:
+        with connection.cursor() as cursor:
+            _fts_tables[name] = (
+                "polls_question_fts" in connection.introspection.table_names(cursor)
+            )
+    return "fts5" if _fts_tables[name] else "icontains"
+
+
+def install_search_indexes(using: str = DEFAULT_DB_ALIAS, **kwargs) -> None:
+    """
+    Create the search indexes of the database that are missing; connected to
+    `post_migrate`. Databases migrated back before `0006_search_indexes` are
+    left alone.
+    """
+    connection = connections[using]
+    module, _ = MigrationLoader.migrations_module("polls")
+    if module is not None and SEARCH_MIGRATION not in (
+        MigrationRecorder(connection).applied_migrations()
+    ):
+        return
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for sql in POSTGRESQL_INDEXES:
+                cursor.execute(sql.format(config=settings.POLLS_SEARCH_CONFIG))
+    elif connection.vendor == "sqlite" and _has_fts5(connection):
+        _install_fts5_tables(connection)
+        _fts_tables.pop(str(connection.settings_dict["NAME"]), None)
+
+
+def _has_fts5(connection: BaseDatabaseWrapper) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return "ENABLE_FTS5" in {row[0] for row in cursor.fetchall()}
+
+
+def _install_fts5_tables(connection: BaseDatabaseWrapper) -> None:
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {row[0] for row in cursor.fetchall()}
+        for table, fts, column in SQLITE_TABLES:
+            if table not in tables:
+                continue
+            if {f"{fts}_ai", f"{fts}_ad", f"{fts}_au"} <= triggers:
+                continue
+            names = {"table": table, "fts": fts, "column": column}
+            if fts not in tables:
+                cursor.execute(SQLITE_FTS_TABLE.format(**names))
+            for sql in SQLITE_FTS_TRIGGERS:
+                cursor.execute(sql.format(**names))
+            # writes made while a trigger was missing are not indexed
+            cursor.execute(SQLITE_FTS_REBUILD.format(**names))
+
+
+def fts5_query(query: str) -> str:
+    """
+    Turn user input into an FTS5 query matching every word as a prefix, so
+    FTS5 operators and quotes in the input are never interpreted.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words) or '""'
+
+
+def _search_questions_fts5(queryset: QuerySet, query: str) -> QuerySet:
+    match = fts5_query(query)
+    by_question = RawSQL(
+        "SELECT rowid FROM polls_question_fts WHERE polls_question_fts MATCH %s",
+        [match],
+    )
+    by_choice = RawSQL(
+        "SELECT c.question_id FROM polls_choice_fts f "
+        "JOIN polls_choice c ON c.id = f.rowid WHERE polls_choice_fts MATCH %s",
+        [match],
+    )
+    # a match on the question counts twice as much as one on a choice
+    choice_rank = RawSQL(
+        "SELECT -bm25(polls_choice_fts) FROM polls_choice_fts "
+        "JOIN polls_choice c ON c.id = polls_choice_fts.rowid "
+        "WHERE polls_choice_fts MATCH %s AND c.question_id = polls_question.id "
+        "ORDER BY bm25(polls_choice_fts) LIMIT 1",
+        [match],
+        output_field=FloatField(),
+    )
+    return queryset.filter(Q(pk__in=by_question) | Q(pk__in=by_choice)).annotate(
+        search_rank=2.0 * _fts5_rank("polls_question_fts", match, "polls_question.id")
+        + Coalesce(choice_rank, 0.0)
+    )
+
+
+def _fts5_rank(fts_table: str, match: str, rowid: str) -> Coalesce:
+    """The rank of the `fts_table` row whose rowid is the `rowid` column."""
+    # table and column names are constants of this module, never user input
+    rank = RawSQL(  # noqa: S611
+        f"SELECT -bm25({fts_table}) FROM {fts_table} "  # noqa: S608
+        f"WHERE {fts_table} MATCH %s AND rowid = {rowid}",
+        [match],
+        output_field=FloatField(),
+    )
+    return Coalesce(rank, 0.0)
+
+
+def _search_questions_postgresql(queryset: QuerySet, query: str) -> QuerySet:
+    from django.contrib.postgres.search import SearchRank, TrigramSimilarity
+
+    search_query = _postgresql_query(query)
+    choices = Choice.objects.filter(
+        Q(pk__in=_matching(Choice, "choice_text", search_query))
+        | ILikeContains(F("choice_text"), query)
+    ).values("question")
+    return queryset.filter(
+        Q(pk__in=_matching(queryset.model, "question_text", search_query))
+        | ILikeContains(F("question_text"), query)
+        | Q(pk__in=choices)
+    ).annotate(
+        search_rank=SearchRank(_ts_vector("question_text"), search_query)
+        + TrigramSimilarity("question_text", query)
+    )
+
+
+def _postgresql_query(query: str):
+    from django.contrib.postgres.search import SearchQuery
+
+    return SearchQuery(
+        query, config=settings.POLLS_SEARCH_CONFIG, search_type="websearch"
+    )
+
+
+def _ts_vector(field: str) -> Func:
+    """
+    `to_tsvector(config, field)`, spelled exactly like the expression index.
+    """
+    from django.contrib.postgres.search import SearchConfig, SearchVectorField
+
+    return Func(
+        SearchConfig(settings.POLLS_SEARCH_CONFIG),
+        F(field),
+        function="to_tsvector",
+        output_field=SearchVectorField(),
+    )
+
+
+def _matching(model, field: str, search_query) -> QuerySet:
+    """The pks of the `model` rows whose `field` vector matches the query."""
+    return (
+        model.objects.annotate(search_vector=_ts_vector(field))
+        .filter(search_vector=search_query)
+        .values("pk")
+    )
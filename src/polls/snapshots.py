@@ -0,0 +1,106 @@
+"""
+Frozen results of closed polls.
+
+Closing a poll applies the votes still pending in the vote buffer or log, marks
+the poll closed and stores its results payload and rendered choices fragment
+in a `ResultsSnapshot`. The results page then serves the snapshot, from the
+cache or with one query, and never reads the vote tables again.
+"""
+
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import SafeString, mark_safe
+
+from core.config import settings
+
+from .buffers import get_vote_buffer
+from .models import Question, ResultsSnapshot
+from .results import PollResults, build_results, dump_results, load_results
+from .votelog import get_vote_log, roll_up_votes
+
+Snapshot = tuple[Question, PollResults, SafeString]
+
+
+def snapshot_cache_key(question_id: int) -> str:
+    return f"polls:results_snapshot:{question_id}"
+
+
+def close_poll(question: Question) -> ResultsSnapshot:
+    """
+    Close the poll and freeze its results.
+    Closing a closed poll returns its existing snapshot.
+    """
+    if settings.ENABLE_VOTE_BUFFER:
+        get_vote_buffer().flush()
+    if settings.ENABLE_VOTE_LOG:
+        get_vote_log().flush()
+        roll_up_votes(lag=0)
+
+    with transaction.atomic():
+        question = Question.objects.select_for_update().get(pk=question.pk)
+        if question.is_closed:
+            return question.results_snapshot
+
+        question.closed_at = timezone.now()
+        question.save(update_fields=["closed_at"])
+        results = build_results(question)
+        snapshot = ResultsSnapshot.objects.create(
+            question=question,
+            payload=dump_results(question, results),
+            html=render_to_string("polls/results_choices.html", {"results": results}),
+        )
+        transaction.on_commit(
+            lambda: cache.set(
+                snapshot_cache_key(question.pk), (snapshot.payload, snapshot.html), None
+            )
+        )
+    return snapshot
+
+
+def unpack(payload: dict, html: str) -> Snapshot:
+    question, results = load_results(payload)
+    # rendered by `close_poll` from the autoescaped fragment template
+    return question, results, mark_safe(html)  # noqa: S308
+
+
+def get_cached_snapshot(question_id: int) -> Snapshot | None:
+    """
+    Return the cached snapshot of the question, None when the poll is open or
+    the snapshot is not cached.
+    """
+    cached = cache.get(snapshot_cache_key(question_id))
+    return None if cached is None else unpack(*cached)
+
+
+async def aget_cached_snapshot(question_id: int) -> Snapshot | None:
+    """
+    Async `get_cached_snapshot`.
+    """
+    cached = await cache.aget(snapshot_cache_key(question_id))
+    return None if cached is None else unpack(*cached)
+
+
+def load_snapshot(question_id: int) -> Snapshot:
+    """
+    Read the snapshot of a closed poll and cache it.
+    """
+    row = ResultsSnapshot.objects.values_list("payload", "html").get(
+        question_id=question_id
+    )
+    cache.set(snapshot_cache_key(question_id), row, None)
+    return unpack(*row)
+
+
+async def aload_snapshot(question_id: int) -> Snapshot:
+    """
+    Async `load_snapshot`.
+    """
+    row = await ResultsSnapshot.objects.values_list("payload", "html").aget(
+        question_id=question_id
+    )
+    await cache.aset(snapshot_cache_key(question_id), row, None)
+    return unpack(*row)
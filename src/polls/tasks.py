@@ -0,0 +1,58 @@
+from celery.signals import worker_ready
+from django.utils.module_loading import import_string
+
+from core.config import settings
+from example_project.celery import app
+
+from . import timeseries, votelog, votes
+from .buffers import get_vote_buffer
+from .deferred import SignalEvent
+
+
+@app.task
+def flush_vote_buffer() -> int:
+    """
+    Flush buffered votes into `Choice.votes`.
+    """
+    return get_vote_buffer().flush()
+
+
+@app.task
+def compact_vote_shards() -> int:
+    """
+    Fold counter shards into `Choice.votes`.
+    """
+    return votes.compact_vote_shards()
+
+
+@app.task
+def roll_up_votes() -> int:
+    """
+    Count newly logged vote events into `Choice.votes`.
+    """
+    return votelog.roll_up_votes()
+
+
+@app.task
+def compact_vote_buckets() -> int:
+    """
+    Fold old minute and hour vote buckets into coarser ones.
+    """
+    return timeseries.compact_vote_buckets()
+
+
+@app.task
+def dispatch_deferred_signals(receiver: str, events: list[dict]) -> int:
+    """
+    Run a batch of deferred signal events through their `DeferredReceiver`.
+    """
+    return import_string(receiver).run([SignalEvent.from_payload(e) for e in events])
+
+
+@worker_ready.connect
+def reconcile_vote_buffer(**kwargs: dict) -> None:
+    """
+    Reconcile deltas left over by a flush interrupted before the restart.
+    """
+    if settings.ENABLE_VOTE_BUFFER:
+        flush_vote_buffer.delay()
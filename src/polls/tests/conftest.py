@@ -0,0 +1,101 @@
+"""
+Fixtures shared by the polls tests.
+"""
+
+import atexit
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from polls.buffers import VoteSeriesBuffer
+from polls.models import Choice, Question
+
+
+@pytest.fixture(autouse=True)
+def vote_series_buffer(monkeypatch):
+    """
+    The series counts of direct votes, written by `flush()` rather than by a
+    timer that would outlive the test database.
+    """
+    buffer = VoteSeriesBuffer(flush_interval=0)
+    monkeypatch.setattr("polls.votes.get_vote_series_buffer", lambda: buffer)
+    yield buffer
+    atexit.unregister(buffer._flush_quietly)
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """
+    A local-memory default cache, emptied after the test, keeping the database
+    cache's own queries out of query counts.
+    """
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_question(db):
+    """
+    Create a question with choices by text and votes, e.g.
+    `make_question("Best?", Yes=1, No=3)`, published now unless `pub_date` is
+    given.
+    """
+
+    def make(text="Question?", *, pub_date=None, **choices):
+        question = Question.objects.create(
+            question_text=text, pub_date=pub_date or timezone.now()
+        )
+        for choice_text, votes in choices.items():
+            Choice.objects.create(
+                question=question, choice_text=choice_text, votes=votes
+            )
+        return question
+
+    return make
+
+
+@pytest.fixture
+def question(make_question):
+    """
+    A question with two choices, Yes with 1 vote and No with 3.
+    """
+    return make_question(Yes=1, No=3)
+
+
+@pytest.fixture
+def create_question(make_question):
+    """
+    Create a question published `days` ago with `choice_count` choices, the
+    i-th named "Choice i" with i votes.
+    """
+
+    def create(text="Question?", choice_count=2, days=0):
+        return make_question(
+            text,
+            pub_date=timezone.now() - datetime.timedelta(days=days),
+            **{f"Choice {i}": i for i in range(choice_count)},
+        )
+
+    return create
+
+
+@pytest.fixture
+def count_queries():
+    """
+    GET a URL with a test client, returning the response and the number of
+    queries it ran.
+    """
+
+    def count(client, url, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, **extra)
+        return response, len(queries)
+
+    return count
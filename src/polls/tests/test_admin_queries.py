@@ -0,0 +1,46 @@
+"""
+Query count regression tests for the polls admin changelists.
+"""
+
+import pytest
+from django.urls import reverse
+
+from polls.models import ChoiceVoteShard
+
+
+@pytest.fixture
+def admin_client(db, admin_user, client):
+    client.force_login(admin_user)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name", ["admin:polls_question_changelist", "admin:polls_choice_changelist"]
+)
+def test_changelist_query_count_is_constant(
+    admin_client, create_question, count_queries, url_name
+):
+    url = reverse(url_name)
+    for i in range(2):
+        create_question(f"Question {i}?", choice_count=3)
+    _, small = count_queries(admin_client, url)
+    for i in range(2, 32):
+        create_question(f"Question {i}?", choice_count=3)
+    response, large = count_queries(admin_client, url)
+
+    assert response.status_code == 200
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_changelists_show_live_totals(admin_client, make_question):
+    question = make_question("Sharded?", Yes=1, No=1)
+    yes = question.choice_set.get(choice_text="Yes")
+    ChoiceVoteShard.objects.create(choice=yes, shard=0, votes=2)
+
+    questions = admin_client.get(reverse("admin:polls_question_changelist"))
+    choices = admin_client.get(reverse("admin:polls_choice_changelist"))
+
+    assert '<td class="field-total_votes">4</td>' in questions.content.decode()
+    assert '<td class="field-vote_percentage">75.0%</td>' in choices.content.decode()
@@ -0,0 +1,124 @@
+"""
+Polls JSON API tests.
+"""
+
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.config import settings
+from polls.models import Choice
+from polls.versions import results_version_key
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.mark.django_db
+def test_list_query_count_is_constant(client, create_question, count_queries):
+    url = reverse("polls_api:list")
+    create_question("Small?", choice_count=2)
+    _, small_count = count_queries(client, url)
+
+    for i in range(10):
+        create_question(f"Large {i}?", choice_count=25, days=i + 1)
+    response, large_count = count_queries(client, url)
+
+    assert small_count == large_count == 2, "questions + one choices prefetch"
+    assert len(response.json()["results"]) == 11
+
+
+@pytest.mark.django_db
+def test_list_payload_and_cursor(client, create_question):
+    newest = create_question("Newest?", choice_count=3, days=0)
+    oldest = create_question("Oldest?", days=1)
+
+    response = client.get(reverse("polls_api:list"), {"per_page": 1})
+    payload = response.json()
+
+    assert payload["previous"] is None
+    assert payload["results"] == [
+        {
+            "id": newest.pk,
+            "question_text": "Newest?",
+            "pub_date": payload["results"][0]["pub_date"],
+            "total_votes": 3,
+            "choices": [
+                {"id": c.pk, "choice_text": c.choice_text, "votes": c.votes}
+                for c in newest.choice_set.order_by("pk")
+            ],
+        }
+    ]
+
+    payload = client.get(payload["next"]).json()
+    assert [q["id"] for q in payload["results"]] == [oldest.pk]
+    assert payload["next"] is None
+    assert payload["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_list_search(client, create_question):
+    create_question("What about the weather?")
+    create_question("Pizza or pasta?")
+
+    response = client.get(reverse("polls_api:list"), {"search": "pizza"})
+
+    assert [q["question_text"] for q in response.json()["results"]] == [
+        "Pizza or pasta?"
+    ]
+
+
+@pytest.mark.django_db
+def test_list_bad_parameters(client):
+    url = reverse("polls_api:list")
+    assert client.get(url, {"per_page": "many"}).status_code == 400
+    assert client.get(url, {"cursor": "garbage"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_detail_revalidation_skips_database(client, create_question, count_queries):
+    question = create_question("Cached?", choice_count=25)
+    url = reverse("polls_api:detail", args=[question.pk])
+
+    response, count = count_queries(client, url)
+    assert response.status_code == 200
+    assert count == 2
+    etag = response["ETag"]
+
+    response, count = count_queries(client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert count == 0
+
+
+@pytest.mark.django_db
+def test_etags_change_with_votes(
+    client, create_question, django_capture_on_commit_callbacks
+):
+    question = create_question("Changing?")
+    detail_url = reverse("polls_api:detail", args=[question.pk])
+    list_url = reverse("polls_api:list")
+    detail_etag = client.get(detail_url)["ETag"]
+    list_etag = client.get(list_url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Choice.objects.add_votes({question.choice_set.first().pk: 1})
+
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+    assert response.status_code == 200
+    assert response["ETag"] != detail_etag
+    assert response.json()["total_votes"] == 2
+    response = client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+    assert response["ETag"] != list_etag
+
+
+@pytest.mark.django_db
+def test_detail_missing(client):
+    response = client.get(reverse("polls_api:detail", args=[999]))
+    assert response.status_code == 404
+
+    # the version looked up for the missing poll expires
+    expires_at = cache._expire_info[cache.make_key(results_version_key(999))]
+    assert expires_at <= time.time() + settings.RESULTS_VERSION_TIMEOUT
@@ -0,0 +1,91 @@
+"""
+Async polls views tests.
+"""
+
+import importlib
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.urls import clear_url_caches, resolve, reverse
+
+import example_project.urls
+import polls.urls
+from core.config import settings as polls_settings
+from polls.models import Question
+
+
+def reload_urls():
+    # the project urlconf holds the resolver caching the polls patterns
+    importlib.reload(polls.urls)
+    importlib.reload(example_project.urls)
+    clear_url_caches()
+
+
+@pytest.fixture(autouse=True)
+def async_views(monkeypatch, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    monkeypatch.setattr(
+        polls_settings, "ASYNC_POLLS_VIEWS", ["detail", "results", "vote"]
+    )
+    reload_urls()
+    yield
+    monkeypatch.undo()
+    reload_urls()
+    cache.clear()
+
+
+def test_async_views_are_selected():
+    for name, args in [("detail", [1]), ("results", [1]), ("vote", [1])]:
+        match = resolve(reverse(f"polls:{name}", args=args))
+        assert iscoroutinefunction(match.func)
+
+
+@pytest.mark.django_db
+def test_detail_and_results_pages(client, question):
+    detail = client.get(reverse("polls:detail", args=[question.id]))
+    assert detail.status_code == 200
+    assert detail.context["results"].total_votes == 4
+
+    for _ in range(2):
+        results = client.get(reverse("polls:results", args=[question.id]))
+        assert results.status_code == 200
+        assert "75.0%" in results.content.decode()
+
+    assert client.get(reverse("polls:results", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_vote(client, question):
+    yes = question.choice_set.get(choice_text="Yes")
+
+    response = client.post(
+        reverse("polls:vote", args=[question.id]), {"choice": yes.id}
+    )
+
+    assert response.status_code == 302
+    yes.refresh_from_db()
+    question.refresh_from_db()
+    assert (yes.votes, question.vote_count) == (2, 5)
+
+
+@pytest.mark.django_db
+def test_sharded_vote(client, question):
+    Question.objects.filter(pk=question.pk).update(vote_shard_count=4)
+    yes = question.choice_set.get(choice_text="Yes")
+
+    client.post(reverse("polls:vote", args=[question.id]), {"choice": yes.id})
+
+    question.refresh_from_db()
+    assert yes.vote_shards.get().votes == 1
+    assert question.total_votes() == 5
+
+
+@pytest.mark.django_db
+def test_vote_without_choice_redisplays_form(client, question):
+    response = client.post(reverse("polls:vote", args=[question.id]))
+
+    assert response.status_code == 200
+    assert "You didn&#x27;t select a choice." in response.content.decode()
@@ -0,0 +1,181 @@
+"""
+Approval and ranked ballot tests.
+"""
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.ballots import (
+    get_tally,
+    pack_ballot,
+    parse_ballot,
+    record_ballot,
+    tally_question,
+    unpack_ballot,
+)
+from polls.models import Ballot, Choice, Question
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+def make_poll(ballot_type, *texts):
+    question = Question.objects.create(
+        question_text="Best planet?", pub_date=timezone.now(), ballot_type=ballot_type
+    )
+    return question, [
+        Choice.objects.create(question=question, choice_text=text) for text in texts
+    ]
+
+
+def cast(question, *ballots):
+    Ballot.objects.bulk_create(
+        Ballot(question=question, choices=pack_ballot(c.pk for c in ballot))
+        for ballot in ballots
+    )
+
+
+def test_pack_ballot_round_trips():
+    assert unpack_ballot(pack_ballot([3, 1, 2])) == [3, 1, 2]
+    assert unpack_ballot(pack_ballot([])) == []
+
+
+@pytest.mark.django_db
+def test_instant_runoff_eliminates_until_a_majority():
+    question, (a, b, c, d) = make_poll(Question.BallotType.RANKED, "A", "B", "C", "D")
+    cast(question, *[[a, b]] * 4, *[[b, a]] * 3, *[[c, b]] * 2, [d])
+
+    tally = tally_question(question)
+
+    assert tally.ballots == 10
+    assert [r.counts for r in tally.rounds] == [
+        {a.pk: 4, b.pk: 3, c.pk: 2, d.pk: 1},
+        {a.pk: 4, b.pk: 3, c.pk: 2},
+        {a.pk: 4, b.pk: 5},
+    ]
+    assert [r.eliminated for r in tally.rounds] == [d.pk, c.pk, None]
+    assert [r.exhausted for r in tally.rounds] == [0, 1, 1]
+    assert tally.winner == b.pk
+
+
+@pytest.mark.django_db
+def test_instant_runoff_ties_eliminate_the_later_choice():
+    question, (a, b, c) = make_poll(Question.BallotType.RANKED, "A", "B", "C")
+    cast(question, [a], [b], [c, a])
+
+    tally = tally_question(question)
+
+    assert [r.eliminated for r in tally.rounds] == [c.pk, None]
+    assert tally.winner == a.pk
+
+
+@pytest.mark.django_db
+def test_approval_counts_every_pick():
+    question, (a, b, c) = make_poll(Question.BallotType.APPROVAL, "A", "B", "C")
+    cast(question, [a, b], [b], [b, c])
+
+    tally = tally_question(question)
+
+    assert len(tally.rounds) == 1
+    assert tally.rounds[0].counts == {a.pk: 1, b.pk: 3, c.pk: 1}
+    assert tally.winner == b.pk
+
+
+@pytest.mark.django_db
+def test_tally_without_ballots():
+    question, _ = make_poll(Question.BallotType.RANKED, "A", "B")
+
+    tally = tally_question(question)
+
+    assert tally.rounds == []
+    assert tally.winner is None
+
+
+@pytest.mark.django_db
+def test_picks_of_deleted_choices_are_skipped():
+    question, (a, b, c) = make_poll(Question.BallotType.RANKED, "A", "B", "C")
+    cast(question, [c, a], [b])
+    c.delete()
+
+    tally = tally_question(question)
+
+    assert tally.rounds[0].counts == {a.pk: 1, b.pk: 1}
+
+
+@pytest.mark.django_db
+def test_parse_ballot_orders_ranked_picks():
+    question, (a, b, c) = make_poll(Question.BallotType.RANKED, "A", "B", "C")
+
+    picked = parse_ballot(question, {f"rank_{a.pk}": "2", f"rank_{c.pk}": "1"})
+
+    assert picked == [c, a]
+    with pytest.raises(ValueError, match="rank"):
+        parse_ballot(question, {f"rank_{a.pk}": "1", f"rank_{b.pk}": "1"})
+    with pytest.raises(ValueError, match="Invalid"):
+        parse_ballot(question, {"rank_0": "1"})
+
+
+@pytest.mark.django_db
+def test_tally_is_cached_until_the_next_ballot(
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    question, (a, b) = make_poll(Question.BallotType.APPROVAL, "A", "B")
+    with django_capture_on_commit_callbacks(execute=True):
+        record_ballot(question, [a, b])
+    assert get_tally(question).ballots == 1
+
+    with django_assert_num_queries(0):
+        assert get_tally(question).ballots == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        record_ballot(question, [b])
+    assert get_tally(question).rounds[0].counts == {a.pk: 1, b.pk: 2}
+
+
+@pytest.mark.django_db
+def test_vote_records_an_approval_ballot(client):
+    question, (a, b, c) = make_poll(Question.BallotType.APPROVAL, "A", "B", "C")
+
+    response = client.post(
+        reverse("polls:vote", args=[question.id]), {"choice": [a.pk, c.pk]}
+    )
+
+    assert response.status_code == 302
+    assert unpack_ballot(Ballot.objects.get().choices) == [a.pk, c.pk]
+    assert dict(question.choice_set.values_list("pk", "votes")) == {
+        a.pk: 1,
+        b.pk: 0,
+        c.pk: 1,
+    }
+
+
+@pytest.mark.django_db
+def test_vote_records_a_ranked_ballot(client):
+    question, (a, b, c) = make_poll(Question.BallotType.RANKED, "A", "B", "C")
+
+    response = client.post(
+        reverse("polls:vote", args=[question.id]),
+        {f"rank_{a.pk}": "2", f"rank_{b.pk}": "", f"rank_{c.pk}": "1"},
+    )
+
+    assert response.status_code == 302
+    assert unpack_ballot(Ballot.objects.get().choices) == [c.pk, a.pk]
+    question.refresh_from_db()
+    assert question.total_votes() == 1, "only the first preference is counted"
+
+    response = client.get(reverse("polls_api:tally", args=[question.id]))
+    assert response.json()["winner"] == c.pk
+
+
+@pytest.mark.django_db
+def test_vote_rejects_an_invalid_ballot(client):
+    question, (a, b) = make_poll(Question.BallotType.RANKED, "A", "B")
+
+    response = client.post(
+        reverse("polls:vote", args=[question.id]),
+        {f"rank_{a.pk}": "1", f"rank_{b.pk}": "1"},
+    )
+
+    assert response.status_code == 200
+    assert not Ballot.objects.exists()
+    assert "Your ballot is not valid." in response.content.decode()
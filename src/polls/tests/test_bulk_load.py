@@ -0,0 +1,114 @@
+"""
+Bulk poll loading tests.
+"""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import post_save
+
+from polls.bulk import PollLoader, generate_polls
+from polls.models import Choice, Question, Vote
+
+
+def snapshot():
+    return list(
+        Choice.objects.order_by("question__question_text", "choice_text").values_list(
+            "question__question_text", "choice_text", "votes"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_generated_dataset_is_reproducible():
+    call_command("load_polls", questions=7, seed=42, chunk_size=3)
+    first = snapshot()
+    Question.objects.all().delete()
+
+    call_command("load_polls", questions=7, seed=42, chunk_size=3)
+
+    assert len(first) == 28
+    assert snapshot() == first
+
+
+def test_generated_dates_do_not_depend_on_the_clock():
+    assert list(generate_polls(3, seed=1)) == list(generate_polls(3, seed=1))
+    until = datetime(2026, 1, 1, tzinfo=UTC)
+    assert all(
+        until - timedelta(days=7) <= record.pub_date <= until
+        for record in generate_polls(3, days=7, seed=1, now=until)
+    )
+
+
+@pytest.mark.django_db
+def test_vote_count_is_filled_in():
+    PollLoader(chunk_size=2).load(generate_polls(5, votes_per_question=50, seed=1))
+
+    for question in Question.objects.all():
+        assert question.vote_count == sum(
+            question.choice_set.values_list("votes", flat=True)
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("suffix", ["jsonl", "csv"])
+def test_import_file(tmp_path, suffix):
+    path = tmp_path / f"polls.{suffix}"
+    if suffix == "jsonl":
+        path.write_text(
+            "\n".join(
+                json.dumps(
+                    {
+                        "question_text": f"Imported {i}?",
+                        "pub_date": "2025-01-01T12:00:00",
+                        "choices": [
+                            {"choice_text": "Yes", "votes": i},
+                            {"choice_text": "No", "votes": 1},
+                        ],
+                    }
+                )
+                for i in range(3)
+            )
+        )
+    else:
+        path.write_text(
+            "question_text,pub_date,choice_text,votes\n"
+            + "".join(
+                f"Imported {i}?,2025-01-01T12:00:00,Yes,{i}\n"
+                f"Imported {i}?,2025-01-01T12:00:00,No,1\n"
+                for i in range(3)
+            )
+        )
+
+    call_command("load_polls", str(path), chunk_size=2)
+
+    assert Question.objects.count() == 3
+    assert sorted(Question.objects.values_list("vote_count", flat=True)) == [1, 2, 3]
+
+
+@pytest.mark.django_db
+def test_vote_events_are_rolled_up():
+    call_command("load_polls", questions=3, votes=5, seed=3, vote_events=True)
+
+    assert Vote.objects.count() == sum(Choice.objects.values_list("votes", flat=True))
+    for question in Question.objects.all():
+        assert question.vote_count == question.vote_set.count()
+
+
+@pytest.mark.django_db
+def test_signals_are_opt_in():
+    saved = []
+
+    def receiver(sender, instance, **kwargs):
+        saved.append(instance)
+
+    post_save.connect(receiver, sender=Question)
+    try:
+        PollLoader().load(generate_polls(2, seed=0))
+        assert saved == []
+        PollLoader(send_signals=True).load(generate_polls(2, seed=0))
+        assert len(saved) == 2
+    finally:
+        post_save.disconnect(receiver, sender=Question)
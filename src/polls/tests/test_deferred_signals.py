@@ -0,0 +1,115 @@
+"""
+Deferred, batched signal handler tests.
+"""
+
+import pytest
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from polls import tasks
+from polls.deferred import DeferredReceiver, SignalEvent
+from polls.models import Choice, Question
+
+
+@pytest.fixture
+def connect():
+    connected = []
+
+    def connect(receiver, sender):
+        post_save.connect(receiver.receive, sender=sender, weak=False)
+        connected.append((receiver, sender))
+        return receiver
+
+    yield connect
+    for receiver, sender in connected:
+        post_save.disconnect(receiver.receive, sender=sender)
+
+
+def create_choices(count):
+    question = Question.objects.create(question_text="Burst?", pub_date=timezone.now())
+    return [
+        Choice.objects.create(question=question, choice_text=f"Choice {i}")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_handler_gets_committed_events_as_one_list(
+    connect, django_capture_on_commit_callbacks
+):
+    calls = []
+    receiver = connect(
+        DeferredReceiver(calls.append, batch=True, window_ms=60_000), Choice
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        choices = create_choices(5)
+        assert receiver.flush() == 0, "nothing is queued before the commit"
+
+    assert calls == []
+    assert receiver.flush() == 5
+    assert len(calls) == 1
+    assert [event.pk for event in calls[0]] == [c.pk for c in choices]
+    assert calls[0][0].kwargs["created"] is True
+    assert calls[0][0].instance is choices[0]
+
+
+@pytest.mark.django_db
+def test_full_batches_are_dispatched_on_commit(
+    connect, django_capture_on_commit_callbacks
+):
+    calls = []
+    connect(DeferredReceiver(calls.append, window_ms=60_000, max_batch_size=2), Choice)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_choices(3)
+
+    assert len(calls) == 2, "one call per event, for the full batch only"
+    assert all(isinstance(event, SignalEvent) for event in calls)
+
+
+@pytest.mark.django_db
+def test_rolled_back_events_are_dropped(connect, django_capture_on_commit_callbacks):
+    calls = []
+    receiver = connect(
+        DeferredReceiver(calls.append, batch=True, window_ms=60_000), Choice
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        kept = create_choices(1)
+        with pytest.raises(RuntimeError), transaction.atomic():
+            create_choices(2)
+            raise RuntimeError
+
+    receiver.flush()
+    assert [event.pk for event in calls[0]] == [kept[0].pk]
+
+
+@pytest.mark.django_db
+def test_task_dispatch(connect, monkeypatch, django_capture_on_commit_callbacks):
+    sent = []
+    monkeypatch.setattr(
+        tasks.dispatch_deferred_signals,
+        "delay",
+        lambda *args: sent.append(args),
+    )
+    calls = []
+    receiver = connect(
+        DeferredReceiver(
+            calls.append, batch=True, task=True, window_ms=60_000, max_batch_size=2
+        ),
+        Choice,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        choices = create_choices(3)
+    receiver.flush()
+
+    assert [len(payloads) for _, payloads in sent] == [2, 1]
+    assert sent[0][0] == receiver.path
+    events = [SignalEvent.from_payload(p) for _, payloads in sent for p in payloads]
+    assert receiver.run(events) == 3
+    assert [(event.model, event.pk) for event in calls[0]] == [
+        (Choice, c.pk) for c in choices
+    ]
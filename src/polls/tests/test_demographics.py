@@ -0,0 +1,106 @@
+"""
+Demographic cube tests.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.demographics import demographic_breakdown, rebuild_demographic_cube
+from polls.models import Choice, DemographicCount, Question, Vote
+from polls.votelog import roll_up_votes
+from users.models import User, UserProfile
+
+
+@pytest.fixture
+def poll(db):
+    question = Question.objects.create(question_text="Tabs?", pub_date=timezone.now())
+    yes = Choice.objects.create(question=question, choice_text="Yes")
+    no = Choice.objects.create(question=question, choice_text="No")
+    return question, yes, no
+
+
+@pytest.fixture
+def voters(db):
+    def voter(name, language, skill_level=None):
+        user = User.objects.create(username=name, preferred_language=language)
+        if skill_level:
+            UserProfile.objects.create(user=user, skill_level=skill_level)
+        return user
+
+    return [
+        voter("ada", "en", UserProfile.SkillLevel.EXPERT),
+        voter("bo", "fr", UserProfile.SkillLevel.BEGINNER),
+        voter("cy", "en", UserProfile.SkillLevel.EXPERT),
+        voter("di", "en"),
+    ]
+
+
+def log_votes(question, votes):
+    Vote.objects.bulk_create(
+        [Vote(question=question, choice=choice, user=user) for choice, user in votes]
+    )
+
+
+@pytest.mark.django_db
+def test_rollup_counts_logged_votes_into_the_cube(poll, voters):
+    question, yes, no = poll
+    ada, bo, cy, di = voters
+    log_votes(question, [(yes, ada), (yes, cy), (no, bo), (no, di), (no, None)])
+    roll_up_votes(lag=0)
+    log_votes(question, [(yes, bo)])
+    roll_up_votes(lag=0)
+
+    assert demographic_breakdown(question.pk, "skill_level") == {
+        "expert": {yes.pk: 2},
+        "beginner": {yes.pk: 1, no.pk: 1},
+        "": {no.pk: 1},
+    }
+    assert demographic_breakdown(question.pk, "preferred_language") == {
+        "en": {yes.pk: 2, no.pk: 1},
+        "fr": {yes.pk: 1, no.pk: 1},
+    }
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_counts(poll, voters):
+    question, yes, no = poll
+    ada, bo, cy, di = voters
+    log_votes(question, [(yes, ada), (yes, cy), (no, bo), (no, di), (yes, bo)])
+    roll_up_votes(lag=0)
+    incremental = set(
+        DemographicCount.objects.values_list("choice", "dimension", "value", "votes")
+    )
+    log_votes(question, [(no, ada)])  # not rolled up yet, left out
+
+    DemographicCount.objects.update(votes=0)
+    assert rebuild_demographic_cube(chunk_size=2) == len(incremental)
+
+    assert (
+        set(
+            DemographicCount.objects.values_list(
+                "choice", "dimension", "value", "votes"
+            )
+        )
+        == incremental
+    )
+
+
+@pytest.mark.django_db
+def test_breakdown_endpoint(client, poll, voters):
+    question, yes, _ = poll
+    log_votes(question, [(yes, voters[0]), (yes, voters[1])])
+    roll_up_votes(lag=0)
+    url = reverse("polls_api:breakdown", args=[question.pk])
+
+    with CaptureQueriesContext(connection) as queries:
+        payload = client.get(url, {"dimension": "skill_level"}).json()
+
+    assert len(queries) == 1
+    assert payload["values"] == [
+        {"value": "beginner", "total": 1, "choices": [{"id": yes.pk, "votes": 1}]},
+        {"value": "expert", "total": 1, "choices": [{"id": yes.pk, "votes": 1}]},
+    ]
+    assert client.get(url, {"dimension": "password"}).status_code == 400
@@ -0,0 +1,84 @@
+"""
+Live results consumer and coalesced broadcast tests.
+"""
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+
+from core.config import settings as polls_settings
+from polls.live import get_results_ticker
+from polls.models import Choice
+from polls.routing import websocket_urlpatterns
+from polls.versions import results_version_key
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+def connect(question_id):
+    return WebsocketCommunicator(
+        URLRouter(websocket_urlpatterns), f"/ws/polls/{question_id}/results/"
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_client_gets_current_results_on_connect(question):
+    async def scenario():
+        communicator = connect(question.id)
+        connected, _ = await communicator.connect()
+        assert connected
+        message = await communicator.receive_json_from()
+        await communicator.disconnect()
+        return message
+
+    message = async_to_sync(scenario)()
+
+    assert message["total_votes"] == 4
+    assert [c["choice_text"] for c in message["choices"]] == ["No", "Yes"]
+    assert "75.0%" in message["html"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unknown_question_is_rejected():
+    async def scenario():
+        connected, _ = await connect(0).connect()
+        return connected
+
+    assert not async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_vote_burst_is_coalesced_into_one_broadcast(question, monkeypatch):
+    # a tick long enough for the test to drive the broadcasts itself
+    monkeypatch.setattr(polls_settings, "LIVE_RESULTS_TICK_MS", 60_000)
+    get_results_ticker.cache_clear()
+    ticker = get_results_ticker()
+
+    async def scenario():
+        communicator = connect(question.id)
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        # a burst of votes, each bumping the results version
+        await Choice.objects.filter(question=question, choice_text="Yes").aupdate(
+            votes=101
+        )
+        for _ in range(100):
+            await cache.aincr(results_version_key(question.id))
+
+        sent = [await ticker.broadcast_changes() for _ in range(3)]
+        watched = dict(ticker.watched)
+        message = await communicator.receive_json_from()
+        nothing_more = await communicator.receive_nothing()
+        await communicator.disconnect()
+        return sent, watched, message, nothing_more
+
+    sent, watched, message, nothing_more = async_to_sync(scenario)()
+    get_results_ticker.cache_clear()
+
+    assert watched == {question.id: 1}
+    assert sent == [1, 0, 0]
+    assert message["total_votes"] == 104
+    assert nothing_more
@@ -0,0 +1,85 @@
+"""
+Keyset pagination tests for the poll index.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Question
+from polls.pagination import KeysetPaginator
+
+
+@pytest.fixture
+def questions(db):
+    now = timezone.now()
+    # pairs share a pub_date, so ties are broken by id
+    return [
+        Question.objects.create(
+            question_text=f"Question {i}?", pub_date=now - timedelta(days=i // 2)
+        )
+        for i in range(25)
+    ]
+
+
+def expected_order(questions):
+    return sorted(questions, key=lambda q: (q.pub_date, q.pk), reverse=True)
+
+
+@pytest.mark.django_db
+def test_pages_walk_forward_and_back(questions):
+    paginator = KeysetPaginator(Question.objects.all(), ("-pub_date", "-id"), 10)
+
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [q for page in pages for q in page] == expected_order(questions)
+    assert not pages[0].has_previous()
+
+    back = paginator.get_page(pages[2].previous_cursor)
+    assert back.object_list == pages[1].object_list
+    back = paginator.get_page(back.previous_cursor)
+    assert back.object_list == pages[0].object_list
+    assert not back.has_previous()
+
+
+@pytest.mark.django_db
+def test_cursor_is_stable_under_inserts(questions):
+    paginator = KeysetPaginator(Question.objects.all(), ("-pub_date", "-id"), 10)
+    first = paginator.get_page()
+
+    Question.objects.create(question_text="Newest?", pub_date=timezone.now())
+
+    second = paginator.get_page(first.next_cursor)
+    assert second.object_list == expected_order(questions)[10:20]
+
+
+@pytest.mark.django_db
+def test_index_pages_without_count(client, questions):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("polls:index"))
+
+    assert not any("COUNT(*)" in query["sql"] for query in queries)
+    assert len(queries) == 1
+    # choice counts come from a subquery, the questions are not grouped
+    assert 'GROUP BY "polls_question"' not in queries[0]["sql"]
+    assert len(response.context["latest_question_list"]) == 10
+
+    page = response.context["page_obj"]
+    response = client.get(reverse("polls:index"), {"cursor": page.next_cursor})
+    assert (
+        list(response.context["latest_question_list"])
+        == expected_order(questions)[10:20]
+    )
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_not_found(client):
+    response = client.get(reverse("polls:index"), {"cursor": "not-a-cursor"})
+    assert response.status_code == 404
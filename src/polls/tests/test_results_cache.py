@@ -0,0 +1,68 @@
+"""
+Version-keyed results cache tests.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.config import settings as polls_settings
+from polls.results import get_results_cache_stats
+from polls.versions import get_results_version
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.mark.django_db
+def test_warm_results_page_skips_the_database(client, question):
+    url = reverse("polls:results", args=[question.id])
+    cold = client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        warm = client.get(url)
+
+    assert len(queries) == 0
+    assert warm.content == cold.content
+    assert "75.0%" in warm.content.decode()
+    assert get_results_cache_stats() == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.django_db
+def test_vote_bumps_the_version(client, question, django_capture_on_commit_callbacks):
+    url = reverse("polls:results", args=[question.id])
+    client.get(url)
+    version = get_results_version(question.id)
+    no = question.choice_set.get(choice_text="No")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("polls:vote", args=[question.id]), {"choice": no.id})
+
+    assert get_results_version(question.id) == version + 1
+    assert "80.0%" in client.get(url).content.decode()
+    assert get_results_cache_stats() == {"hits": 0, "misses": 2}
+
+
+@pytest.mark.django_db
+def test_disabled_cache_renders_from_the_database(client, question, monkeypatch):
+    monkeypatch.setattr(polls_settings, "ENABLE_RESULTS_CACHE", False)
+    url = reverse("polls:results", args=[question.id])
+
+    assert "75.0%" in client.get(url).content.decode()
+    assert get_results_cache_stats() == {"hits": 0, "misses": 0}
+
+
+@pytest.mark.django_db
+def test_missing_question_is_not_found(client):
+    assert client.get(reverse("polls:results", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_stats_command_resets_counters(client, question, capsys):
+    client.get(reverse("polls:results", args=[question.id]))
+
+    call_command("results_cache_stats", reset=True)
+
+    assert "0 hits, 1 misses" in capsys.readouterr().out
+    assert get_results_cache_stats() == {"hits": 0, "misses": 0}
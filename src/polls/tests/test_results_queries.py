@@ -0,0 +1,48 @@
+"""
+Query count regression tests for the results and detail pages.
+"""
+
+import pytest
+from django.urls import reverse
+
+from polls.results import build_results
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["polls:results", "polls:detail"])
+def test_page_query_count_is_constant(client, create_question, count_queries, url_name):
+    small = create_question("2 choices?", choice_count=2)
+    large = create_question("25 choices?", choice_count=25)
+
+    response, small_count = count_queries(client, reverse(url_name, args=[small.id]))
+    assert response.status_code == 200
+    response, large_count = count_queries(client, reverse(url_name, args=[large.id]))
+    assert response.status_code == 200
+
+    assert small_count == large_count == 2, "question + one results query"
+
+
+@pytest.mark.django_db
+def test_cached_results_page_query_count(client, create_question, count_queries):
+    question = create_question("25 choices?", choice_count=25)
+    url = reverse("polls:results", args=[question.id])
+
+    response, count = count_queries(client, url)
+    assert (response.status_code, count) == (200, 2)
+    response, count = count_queries(client, url)
+    assert (response.status_code, count) == (200, 0)
+
+
+@pytest.mark.django_db
+def test_build_results_percentages(make_question):
+    question = make_question("Split?", A=25, B=75)
+
+    results = build_results(question)
+
+    assert results.total_votes == 100
+    assert [(c.choice_text, c.percentage) for c in results.choices] == [
+        ("B", 75.0),
+        ("A", 25.0),
+    ]
@@ -0,0 +1,146 @@
+"""
+Poll search tests.
+"""
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Choice, Question
+from polls.search import (
+    ILikeContains,
+    fts5_query,
+    get_search_backend,
+    install_search_indexes,
+    search_choices,
+    search_questions,
+)
+
+
+@pytest.fixture
+def questions(db):
+    planets = Question.objects.create(
+        question_text="Which planet should we colonize first?", pub_date=timezone.now()
+    )
+    Choice.objects.create(question=planets, choice_text="Mars")
+    Choice.objects.create(question=planets, choice_text="Europa")
+    languages = Question.objects.create(
+        question_text="Best language for planet rovers?", pub_date=timezone.now()
+    )
+    Choice.objects.create(question=languages, choice_text="Rust")
+    movies = Question.objects.create(
+        question_text="Favorite space movie?", pub_date=timezone.now()
+    )
+    Choice.objects.create(question=movies, choice_text="The Martian")
+    return planets, languages, movies
+
+
+@pytest.mark.django_db
+def test_sqlite_uses_fts5():
+    assert get_search_backend() == "fts5"
+
+
+@pytest.mark.django_db
+def test_search_matches_questions_and_choices(questions):
+    planets, languages, movies = questions
+
+    found = search_questions(Question.objects.all(), "planet")
+    assert set(found) == {planets, languages}
+
+    # "mar" is a prefix of "Martian", and of "Mars" choice of the planets question
+    found = search_questions(Question.objects.all(), "mar")
+    assert set(found) == {planets, movies}
+
+
+@pytest.mark.django_db
+def test_choices_match_their_question_text(questions):
+    _, _, movies = questions
+    Choice.objects.create(question=movies, choice_text="Forbidden Planet")
+
+    found = search_choices(Choice.objects.all(), "rovers")
+    assert [c.choice_text for c in found] == ["Rust"]
+
+    # a match on the choice itself ranks first
+    found = search_choices(Choice.objects.all(), "planet").order_by("-search_rank")
+    assert found[0].choice_text == "Forbidden Planet"
+    assert {c.choice_text for c in found[1:]} == {"Mars", "Europa", "Rust"}
+
+
+@pytest.mark.django_db
+def test_search_is_ranked(questions):
+    planets, _, _ = questions
+    Question.objects.create(
+        question_text="Planet, planet, planet?", pub_date=timezone.now()
+    )
+
+    found = list(
+        search_questions(Question.objects.all(), "planet").order_by("-search_rank")
+    )
+
+    assert found[0].question_text == "Planet, planet, planet?"
+    assert planets in found
+
+
+@pytest.mark.django_db
+def test_index_follows_updates_and_deletes(questions):
+    planets, _, _ = questions
+    planets.question_text = "Which moon should we colonize first?"
+    planets.save()
+    Choice.objects.filter(choice_text="Rust").delete()
+
+    assert planets not in search_questions(Question.objects.all(), "planet")
+    assert planets in search_questions(Question.objects.all(), "moon")
+    assert not search_choices(Choice.objects.all(), "rust").exists()
+
+
+@pytest.mark.django_db
+def test_lost_triggers_are_reinstalled(questions):
+    planets, _, _ = questions
+    with connection.cursor() as cursor:
+        # as after a migration that rebuilds the table
+        cursor.execute("DROP TRIGGER polls_question_fts_au")
+    planets.question_text = "Which moon should we colonize first?"
+    planets.save()
+
+    install_search_indexes()
+    install_search_indexes()
+
+    assert planets in search_questions(Question.objects.all(), "moon")
+    planets.question_text = "Which comet should we colonize first?"
+    planets.save()
+    assert planets in search_questions(Question.objects.all(), "comet")
+
+
+def test_ilike_contains_compiles_to_ilike_on_the_column():
+    queryset = Question.objects.filter(ILikeContains(F("question_text"), "50%_off"))
+
+    sql, params = queryset.query.get_compiler("default").as_sql()
+
+    assert '"polls_question"."question_text" ILIKE %s' in sql
+    assert "UPPER" not in sql
+    assert params == (r"%50\%\_off%",)
+
+
+def test_fts5_query_escapes_operators():
+    assert fts5_query('mars OR "venus" -*') == '"mars"* "OR"* "venus"*'
+    assert fts5_query("  ") == '""'
+
+
+@pytest.mark.django_db
+def test_admin_search_routes_through_index(client, admin_user, questions):
+    client.force_login(admin_user)
+
+    response = client.get(reverse("admin:polls_question_changelist"), {"q": "mar"})
+    assert response.status_code == 200
+    assert len(response.context["cl"].result_list) == 2
+
+    response = client.get(reverse("admin:polls_choice_changelist"), {"q": "europa"})
+    assert [c.choice_text for c in response.context["cl"].result_list] == ["Europa"]
+
+    response = client.get(reverse("admin:polls_choice_changelist"), {"q": "colonize"})
+    assert {c.choice_text for c in response.context["cl"].result_list} == {
+        "Mars",
+        "Europa",
+    }
@@ -0,0 +1,95 @@
+"""
+Closed poll results snapshot tests.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Choice, Question, ResultsSnapshot
+from polls.snapshots import close_poll, snapshot_cache_key
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.fixture
+def closed_poll(db, django_capture_on_commit_callbacks):
+    question = Question.objects.create(question_text="Final?", pub_date=timezone.now())
+    Choice.objects.create(question=question, choice_text="Yes", votes=3)
+    Choice.objects.create(question=question, choice_text="No", votes=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        close_poll(question)
+    return question
+
+
+def get_results(client, question):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("polls:results", args=[question.id]))
+    assert response.status_code == 200
+    return response, [query["sql"] for query in queries]
+
+
+@pytest.mark.django_db
+def test_close_freezes_the_results(closed_poll):
+    snapshot = ResultsSnapshot.objects.get(question=closed_poll)
+    closed_poll.refresh_from_db()
+
+    assert closed_poll.is_closed
+    assert snapshot.payload["total_votes"] == 4
+    assert "3 votes" in snapshot.html
+    assert close_poll(closed_poll) == snapshot, "closing again keeps the snapshot"
+
+
+@pytest.mark.django_db
+def test_closed_results_are_served_from_the_snapshot(client, closed_poll):
+    Choice.objects.filter(question=closed_poll).update(votes=100)
+
+    response, queries = get_results(client, closed_poll)
+
+    assert queries == []
+    assert response.context["total_votes"] == 4
+    assert response.context["closed"]
+    assert "Final Results" in response.content.decode()
+    assert "public" in response["Cache-Control"]
+    assert "max-age=86400" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_snapshot_is_reloaded_without_vote_queries(client, closed_poll):
+    cache.clear()
+
+    _, queries = get_results(client, closed_poll)
+    assert len(queries) == 2, "the question, then its snapshot"
+    assert not any("polls_choice" in sql for sql in queries)
+
+    _, queries = get_results(client, closed_poll)
+    assert queries == []
+
+
+@pytest.mark.django_db
+def test_votes_on_closed_polls_are_refused(client, closed_poll):
+    choice = closed_poll.choice_set.get(choice_text="Yes")
+
+    response = client.post(
+        reverse("polls:vote", args=[closed_poll.id]), {"choice": choice.id}
+    )
+
+    assert response.status_code == 302
+    choice.refresh_from_db()
+    assert choice.votes == 3
+
+
+@pytest.mark.django_db
+def test_deleting_a_question_drops_its_cached_snapshot(
+    closed_poll, django_capture_on_commit_callbacks
+):
+    key = snapshot_cache_key(closed_poll.pk)
+    assert cache.get(key) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        closed_poll.delete()
+
+    assert cache.get(key) is None
@@ -0,0 +1,137 @@
+"""
+Trending polls ranking tests.
+"""
+
+import math
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3._functions import _sqlite_exp
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import (
+    MAX_EXP_GAP,
+    Choice,
+    Question,
+    TrendingScore,
+    TrendingScoreQuerySet,
+)
+
+
+@pytest.mark.django_db
+def test_recent_votes_outrank_older_ones(make_question):
+    now = timezone.now()
+    old, recent = make_question("Old?", Yes=0), make_question("Recent?", Yes=0)
+    # 10 votes four half-lives ago are worth 0.625 votes now
+    TrendingScore.objects.add_votes({old.pk: 10}, now - timedelta(hours=24))
+    TrendingScore.objects.add_votes({recent.pk: 2}, now)
+
+    assert list(Question.objects.trending()) == [recent, old]
+    assert old.trending_score.decayed_votes(now) == pytest.approx(0.625)
+
+
+@pytest.mark.django_db
+def test_scores_add_up_incrementally(make_question):
+    now = timezone.now()
+    question = make_question("Busy?", Yes=0)
+    TrendingScore.objects.add_votes({question.pk: 1}, now - timedelta(hours=6))
+    TrendingScore.objects.add_votes({question.pk: 3}, now)
+    TrendingScore.objects.add_votes({question.pk: 0}, now)
+
+    score = TrendingScore.objects.get(question=question)
+    assert score.decayed_votes(now) == pytest.approx(3.5)
+    assert score.score == pytest.approx(math.log(3.5) + TrendingScore.weight(1, now))
+
+
+@pytest.mark.django_db
+def test_counted_votes_update_the_score(make_question):
+    question = make_question("Counted?", Yes=0)
+    choice = question.choice_set.get()
+
+    Choice.objects.add_votes({choice.pk: 4}, cast_at=timezone.now())
+    Choice.objects.add_votes({choice.pk: 100})
+
+    assert question.trending_score.decayed_votes() == pytest.approx(4, rel=1e-3)
+
+
+@pytest.mark.django_db
+def test_trending_view(
+    client, django_assert_max_num_queries, vote_series_buffer, make_question
+):
+    quiet, busy = make_question("Quiet?", Yes=0), make_question("Busy?", Yes=0)
+    make_question("Unvoted?", Yes=0)
+    client.post(
+        reverse("polls:vote", args=[quiet.id]), {"choice": quiet.choice_set.get().pk}
+    )
+    for _ in range(2):
+        client.post(
+            reverse("polls:vote", args=[busy.id]), {"choice": busy.choice_set.get().pk}
+        )
+    vote_series_buffer.flush()
+
+    with django_assert_max_num_queries(2):
+        response = client.get(reverse("polls:trending"))
+
+    assert response.status_code == 200
+    assert list(response.context["latest_question_list"]) == [busy, quiet]
+    assert response.context["latest_question_list"][0].choice_count == 1
+    assert "Trending Polls" in response.content.decode()
+
+
+@pytest.fixture
+def exp_arguments(db):
+    """
+    Record the arguments SQLite's EXP() is called with.
+    """
+    if connection.vendor != "sqlite":
+        pytest.skip("EXP is replaced through the SQLite driver")
+    arguments = []
+
+    def exp(x):
+        arguments.append(x)
+        return _sqlite_exp(x)
+
+    connection.ensure_connection()
+    connection.connection.create_function("EXP", 1, exp, deterministic=True)
+    yield arguments
+    connection.connection.create_function("EXP", 1, _sqlite_exp, deterministic=True)
+
+
+@pytest.mark.django_db
+def test_scores_never_take_exp_of_large_negatives(exp_arguments, make_question):
+    now = timezone.now()
+    fresh, voted, unvoted = (
+        make_question(text, Yes=0) for text in ("New?", "Old?", "None?")
+    )
+    TrendingScore.objects.add_votes({voted.pk: 1}, now - timedelta(days=365))
+    # a row created before its first vote, at the default score
+    TrendingScore.objects.create(question=unvoted)
+
+    TrendingScore.objects.add_votes({fresh.pk: 1, voted.pk: 1, unvoted.pk: 2}, now)
+
+    assert all(x >= -MAX_EXP_GAP for x in exp_arguments)
+    scores = dict(TrendingScore.objects.values_list("question", "score"))
+    assert scores[fresh.pk] == pytest.approx(TrendingScore.weight(1, now))
+    assert scores[voted.pk] == pytest.approx(TrendingScore.weight(1, now))
+    assert scores[unvoted.pk] == pytest.approx(TrendingScore.weight(2, now))
+
+
+@pytest.mark.django_db
+def test_racing_first_votes_are_all_counted(monkeypatch, make_question):
+    now = timezone.now()
+    question = make_question("Raced?", Yes=0)
+    # created by a concurrent vote after this one looked for the row
+    TrendingScore.objects.create(question=question, score=TrendingScore.weight(1, now))
+    values_list = TrendingScoreQuerySet.values_list
+
+    def find_none_once(self, *args, **kwargs):
+        monkeypatch.setattr(TrendingScoreQuerySet, "values_list", values_list)
+        return values_list(self.none(), *args, **kwargs)
+
+    monkeypatch.setattr(TrendingScoreQuerySet, "values_list", find_none_once)
+    TrendingScore.objects.add_votes({question.pk: 1}, now)
+
+    score = TrendingScore.objects.get(question=question)
+    assert score.decayed_votes(now) == pytest.approx(2)
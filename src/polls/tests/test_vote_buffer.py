@@ -0,0 +1,128 @@
+"""
+Write-behind vote buffer tests.
+"""
+
+import pytest
+import redis
+from django.urls import reverse
+from django.utils import timezone
+
+from core.config import settings
+from polls.buffers import LocalVoteBuffer, RedisVoteBuffer
+from polls.models import Choice, Question, VoteBufferFlush, VoteRollupMark
+
+
+@pytest.fixture
+def question_with_choices(db):
+    question = Question.objects.create(
+        question_text="Buffered?", pub_date=timezone.now()
+    )
+    yes = Choice.objects.create(question=question, choice_text="Yes", votes=1)
+    no = Choice.objects.create(question=question, choice_text="No", votes=0)
+    return question, yes, no
+
+
+@pytest.fixture
+def local_buffer():
+    return LocalVoteBuffer(flush_interval=0)
+
+
+@pytest.fixture
+def redis_buffer():
+    buffer = RedisVoteBuffer()
+    try:
+        buffer.client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not available")
+    # keep clear of a buffer in actual use
+    for name in ("pending_key", "processing_key", "lock_key"):
+        setattr(buffer, name, f"test:{getattr(buffer, name)}")
+    keys = [buffer.pending_key, buffer.processing_key, buffer.lock_key]
+    buffer.client.delete(*keys)
+    yield buffer
+    buffer.client.delete(*keys)
+
+
+@pytest.fixture(params=["local_buffer", "redis_buffer"])
+def buffer(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.django_db
+def test_flush_applies_aggregated_deltas(question_with_choices, buffer):
+    _, yes, no = question_with_choices
+
+    for _ in range(5):
+        buffer.add(yes.pk)
+    buffer.add(no.pk, count=2)
+
+    assert buffer.flush() == 7
+    yes.refresh_from_db()
+    no.refresh_from_db()
+    assert (yes.votes, no.votes) == (6, 2)
+    assert buffer.pending() == {}
+
+
+@pytest.mark.django_db
+def test_interrupted_flush_is_reconciled(question_with_choices, buffer):
+    _, yes, _ = question_with_choices
+    buffer.add(yes.pk, count=3)
+
+    # a flush that claimed the deltas but died before applying them
+    buffer.claim()
+    buffer.add(yes.pk)
+
+    assert buffer.pending() == {yes.pk: 4}
+    assert buffer.flush() == 4
+    yes.refresh_from_db()
+    assert yes.votes == 5
+
+
+@pytest.mark.django_db
+def test_flush_committed_but_not_acked_is_not_applied_twice(
+    question_with_choices, buffer, monkeypatch
+):
+    _, yes, no = question_with_choices
+    buffer.add(yes.pk, count=3)
+
+    def die():
+        raise ConnectionError
+
+    # a flush that committed the deltas but died before dropping them
+    with monkeypatch.context() as patch, pytest.raises(ConnectionError):
+        patch.setattr(buffer, "ack", die)
+        buffer.flush()
+    yes.refresh_from_db()
+    assert yes.votes == 4
+    assert buffer.pending() == {yes.pk: 3}
+
+    buffer.add(no.pk)
+    assert buffer.flush() == 1, "only the vote cast since"
+    yes.refresh_from_db()
+    no.refresh_from_db()
+    assert (yes.votes, no.votes) == (4, 1)
+    assert buffer.pending() == {}
+    assert buffer.claim() is None
+    # recorded apart from the vote log's high-water marks
+    assert VoteBufferFlush.objects.get().last_flush_id is not None
+    assert not VoteRollupMark.objects.exists()
+
+
+@pytest.mark.django_db
+def test_vote_view_buffers_when_enabled(client, monkeypatch, question_with_choices):
+    question, yes, _ = question_with_choices
+    buffer = LocalVoteBuffer(flush_interval=0)
+    monkeypatch.setattr(settings, "ENABLE_VOTE_BUFFER", True)
+    monkeypatch.setattr("polls.votes.get_vote_buffer", lambda: buffer)
+
+    response = client.post(
+        reverse("polls:vote", args=[question.id]), {"choice": yes.id}
+    )
+
+    assert response.status_code == 302
+    yes.refresh_from_db()
+    assert yes.votes == 1, "Vote should wait in the buffer"
+
+    buffer.flush()
+    yes.refresh_from_db()
+    assert yes.votes == 2
@@ -0,0 +1,74 @@
+"""
+Denormalized Question.vote_count tests.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Choice, Question
+
+
+@pytest.fixture
+def question(make_question):
+    return make_question("Counted?")
+
+
+def vote_count(question):
+    return Question.objects.values_list("vote_count", flat=True).get(pk=question.pk)
+
+
+@pytest.mark.django_db
+def test_choice_create_update_delete_keep_vote_count(question):
+    yes = Choice.objects.create(question=question, choice_text="Yes", votes=10)
+    no = Choice.objects.create(question=question, choice_text="No", votes=5)
+    assert vote_count(question) == 15
+
+    yes = Choice.objects.get(pk=yes.pk)
+    yes.votes = 12
+    yes.save()
+    assert vote_count(question) == 17
+
+    no.delete()
+    assert vote_count(question) == 12
+
+    Choice.objects.filter(pk=yes.pk).delete()
+    assert vote_count(question) == 0
+
+
+@pytest.mark.django_db
+def test_choice_moved_between_questions(question):
+    other = Question.objects.create(question_text="Other?", pub_date=timezone.now())
+    choice = Choice.objects.create(question=question, choice_text="Yes", votes=4)
+
+    choice = Choice.objects.get(pk=choice.pk)
+    choice.question = other
+    choice.save()
+
+    assert vote_count(question) == 0
+    assert vote_count(other) == 4
+
+
+@pytest.mark.django_db
+def test_vote_and_bulk_deltas_update_vote_count(client, question):
+    yes = Choice.objects.create(question=question, choice_text="Yes")
+    no = Choice.objects.create(question=question, choice_text="No")
+
+    client.post(reverse("polls:vote", args=[question.id]), {"choice": yes.id})
+    assert vote_count(question) == 1
+
+    Choice.objects.add_votes({yes.pk: 3, no.pk: 2})
+    assert vote_count(question) == 6
+    question.refresh_from_db()
+    assert question.total_votes() == 6
+
+
+@pytest.mark.django_db
+def test_recount_command_repairs_drift(question):
+    Choice.objects.create(question=question, choice_text="Yes", votes=7)
+    Question.objects.filter(pk=question.pk).update(vote_count=999)
+
+    call_command("recount_question_votes", batch_size=1)
+
+    assert vote_count(question) == 7
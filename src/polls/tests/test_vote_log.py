@@ -0,0 +1,181 @@
+"""
+Append-only vote log and rollup tests.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError
+from django.urls import reverse
+from django.utils import timezone
+
+from core.config import settings
+from polls.models import Choice, Question, Vote, VoteRollupMark
+from polls.votelog import VoteLog, roll_up_votes
+
+
+@pytest.fixture
+def question_with_choices(db):
+    question = Question.objects.create(question_text="Logged?", pub_date=timezone.now())
+    yes = Choice.objects.create(question=question, choice_text="Yes")
+    no = Choice.objects.create(question=question, choice_text="No")
+    return question, yes, no
+
+
+@pytest.mark.django_db
+def test_log_writes_full_batches(
+    question_with_choices, django_capture_on_commit_callbacks
+):
+    question, yes, no = question_with_choices
+    log = VoteLog(batch_size=3, flush_interval=0)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        log.append(question.pk, yes.pk)
+        log.append(question.pk, no.pk)
+    assert Vote.objects.count() == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        log.append(question.pk, yes.pk)
+        # once the voting transaction commits
+        assert Vote.objects.count() == 0
+    assert Vote.objects.count() == 3
+    assert log.flush() == 0
+
+
+@pytest.mark.django_db
+def test_rollup_folds_new_events_once(question_with_choices):
+    question, yes, no = question_with_choices
+    log = VoteLog(batch_size=10, flush_interval=0)
+    for choice in (yes, yes, no):
+        log.append(question.pk, choice.pk)
+    log.flush()
+
+    assert roll_up_votes(lag=0) == 3
+    assert roll_up_votes(lag=0) == 0
+
+    log.append(question.pk, no.pk)
+    log.flush()
+    assert roll_up_votes(lag=0) == 1
+
+    yes.refresh_from_db()
+    no.refresh_from_db()
+    assert (yes.votes, no.votes) == (2, 2)
+    question.refresh_from_db()
+    assert question.total_votes() == 4
+    assert VoteRollupMark.objects.get().last_vote_id == Vote.objects.latest("pk").pk
+
+
+@pytest.mark.django_db
+def test_failed_write_keeps_the_events(
+    question_with_choices, monkeypatch, django_capture_on_commit_callbacks
+):
+    question, yes, no = question_with_choices
+    log = VoteLog(batch_size=2, flush_interval=0)
+    log.append(question.pk, yes.pk)
+
+    def fail(*args, **kwargs):
+        raise OperationalError("database is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Vote.objects, "bulk_create", fail)
+        with django_capture_on_commit_callbacks(execute=True):
+            log.append(question.pk, yes.pk)
+        log.append(question.pk, no.pk)
+        with pytest.raises(OperationalError):
+            log.flush()
+    assert not Vote.objects.exists()
+
+    assert log.flush() == 3
+    assert list(Vote.objects.order_by("pk").values_list("choice", flat=True)) == [
+        yes.pk,
+        yes.pk,
+        no.pk,
+    ]
+
+
+@pytest.mark.django_db
+def test_votes_of_deleted_choices_are_dropped(question_with_choices):
+    question, yes, no = question_with_choices
+    log = VoteLog(batch_size=10, flush_interval=0)
+    for choice in (yes, no, no):
+        log.append(question.pk, choice.pk)
+    no.delete()
+
+    assert log.flush() == 1
+    assert log.flush() == 0
+    assert list(Vote.objects.values_list("choice", flat=True)) == [yes.pk]
+
+
+@pytest.mark.django_db
+def test_failed_integrity_drops_the_events(question_with_choices, monkeypatch):
+    question, yes, _ = question_with_choices
+    log = VoteLog(batch_size=10, flush_interval=0)
+    log.append(question.pk, yes.pk)
+
+    def fail(*args, **kwargs):
+        raise IntegrityError("constraint failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Vote.objects, "bulk_create", fail)
+        with pytest.raises(IntegrityError):
+            log.flush()
+
+    log.append(question.pk, yes.pk)
+    assert log.flush() == 1
+
+
+@pytest.mark.django_db
+def test_rollup_leaves_recent_events(question_with_choices):
+    question, yes, _ = question_with_choices
+    log = VoteLog(batch_size=10, flush_interval=0)
+    log.append(question.pk, yes.pk)
+    log.flush()
+
+    assert roll_up_votes(lag=60) == 0
+    assert roll_up_votes(lag=0) == 1
+
+
+@pytest.mark.django_db
+def test_logged_vote_is_counted_by_rollup(
+    client,
+    question_with_choices,
+    monkeypatch,
+    django_user_model,
+    django_capture_on_commit_callbacks,
+):
+    question, yes, _ = question_with_choices
+    monkeypatch.setattr(settings, "ENABLE_VOTE_LOG", True)
+    monkeypatch.setattr(settings, "VOTE_LOG_BATCH_SIZE", 1)
+    user = django_user_model.objects.create_user(username="voter", password="x")
+    client.force_login(user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("polls:vote", args=[question.id]), {"choice": yes.id})
+
+    yes.refresh_from_db()
+    assert yes.votes == 0
+    assert Vote.objects.get().user == user
+
+    roll_up_votes(lag=0)
+    yes.refresh_from_db()
+    assert yes.votes == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_reports_and_repairs_drift(question_with_choices, capsys):
+    question, yes, no = question_with_choices
+    log = VoteLog(batch_size=10, flush_interval=0)
+    log.append(question.pk, yes.pk)
+    log.append(question.pk, no.pk)
+    log.flush()
+    roll_up_votes(lag=0)
+    Choice.objects.filter(pk=no.pk).update(votes=7)
+
+    call_command("reconcile_vote_log", workers=1, chunk_size=1)
+    assert f"Choice {no.pk}: 7 counted, 1 logged" in capsys.readouterr().out
+
+    call_command("reconcile_vote_log", workers=1, repair=True)
+    no.refresh_from_db()
+    assert no.votes == 1
+
+    call_command("reconcile_vote_log", workers=1)
+    assert "match" in capsys.readouterr().out
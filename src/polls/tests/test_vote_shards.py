@@ -0,0 +1,62 @@
+"""
+Sharded vote counter tests.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.config import settings
+from polls.models import Choice, ChoiceVoteShard, Question
+from polls.votes import compact_vote_shards, record_vote, report_vote_latency
+
+
+@pytest.fixture
+def sharded_question(db):
+    question = Question.objects.create(
+        question_text="Sharded?", pub_date=timezone.now(), vote_shard_count=4
+    )
+    choice = Choice.objects.create(question=question, choice_text="Yes", votes=10)
+    return question, choice
+
+
+@pytest.mark.django_db
+def test_sharded_votes_are_read_live(sharded_question):
+    question, choice = sharded_question
+
+    for _ in range(20):
+        record_vote(question, choice)
+
+    choice.refresh_from_db()
+    assert choice.votes == 10, "Sharded votes should not touch the choice row"
+    assert ChoiceVoteShard.objects.filter(choice=choice).count() > 1
+    assert question.total_votes() == 30
+    assert Choice.objects.with_live_votes().get(pk=choice.pk).live_votes == 30
+
+
+@pytest.mark.django_db
+def test_compaction_folds_shards_into_choice(sharded_question):
+    question, choice = sharded_question
+    for _ in range(7):
+        record_vote(question, choice)
+
+    assert compact_vote_shards() == 7
+
+    choice.refresh_from_db()
+    assert choice.votes == 17
+    assert not ChoiceVoteShard.objects.exclude(votes=0).exists()
+    question.refresh_from_db()
+    assert question.total_votes() == 17
+
+
+@pytest.mark.django_db
+def test_contention_grows_shard_count(monkeypatch, sharded_question):
+    question, _ = sharded_question
+    cache.clear()
+    monkeypatch.setattr(settings, "VOTE_SHARD_CONTENTION_LIMIT", 3)
+
+    for _ in range(3):
+        report_vote_latency(question, settings.VOTE_SHARD_CONTENTION_THRESHOLD_MS)
+
+    question.refresh_from_db()
+    assert question.vote_shard_count == 8
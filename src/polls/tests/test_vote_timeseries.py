@@ -0,0 +1,163 @@
+"""
+Vote time series tests.
+"""
+
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Choice, Question, Vote, VoteBucket
+from polls.timeseries import compact_vote_buckets, vote_series
+from polls.votelog import roll_up_votes
+
+UTC = datetime.UTC
+
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.fixture
+def question_with_choices(db):
+    question = Question.objects.create(
+        question_text="Trending?", pub_date=timezone.now()
+    )
+    yes = Choice.objects.create(question=question, choice_text="Yes")
+    no = Choice.objects.create(question=question, choice_text="No")
+    return question, yes, no
+
+
+def buckets(resolution):
+    return sorted(
+        VoteBucket.objects.filter(resolution=resolution).values_list(
+            "choice", "start", "votes"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_votes_are_counted_into_minute_buckets(
+    client, question_with_choices, vote_series_buffer, django_assert_num_queries
+):
+    question, yes, no = question_with_choices
+
+    for choice in (yes, yes, no):
+        # the question and choice, then the two UPDATEs in their savepoint,
+        # no bucket or score rows
+        with django_assert_num_queries(6):
+            client.post(
+                reverse("polls:vote", args=[question.id]), {"choice": choice.id}
+            )
+    assert vote_series_buffer.flush() == 3
+    Choice.objects.add_votes({no.pk: 5})  # a correction, not votes being cast
+
+    counted = {}
+    for choice_id, _, votes in buckets("minute"):
+        counted[choice_id] = counted.get(choice_id, 0) + votes
+    assert counted == {yes.pk: 2, no.pk: 1}
+
+
+@pytest.mark.django_db
+def test_rollup_buckets_events_by_cast_time(question_with_choices):
+    question, yes, no = question_with_choices
+    cast_at = datetime.datetime(2026, 1, 1, 12, 30, 45, tzinfo=UTC)
+    Vote.objects.bulk_create(
+        [
+            Vote(question=question, choice=yes, created_at=cast_at),
+            Vote(question=question, choice=yes, created_at=cast_at),
+            Vote(
+                question=question,
+                choice=no,
+                created_at=cast_at + datetime.timedelta(minutes=1),
+            ),
+        ]
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        assert roll_up_votes(lag=0) == 3
+    assert buckets("minute") == [
+        (yes.pk, cast_at.replace(second=0), 2),
+        (no.pk, cast_at.replace(minute=31, second=0), 1),
+    ]
+    updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+    # one window, however many minutes it spans
+    assert sum('UPDATE "polls_choice"' in sql for sql in updates) == 1
+    assert sum('UPDATE "polls_question"' in sql for sql in updates) == 1
+    assert not any('UPDATE "polls_votebucket"' in sql for sql in updates)
+
+
+@pytest.mark.django_db
+def test_failed_series_flush_keeps_the_counts(
+    question_with_choices, vote_series_buffer, monkeypatch
+):
+    question, yes, _ = question_with_choices
+    vote_series_buffer.add(question.pk, yes.pk, timezone.now())
+
+    def fail(counts):
+        raise RuntimeError("database is down")
+
+    with monkeypatch.context() as patch, pytest.raises(RuntimeError):
+        patch.setattr("polls.buffers.count_vote_series", fail)
+        vote_series_buffer.flush()
+    assert not buckets("minute")
+
+    assert vote_series_buffer.flush() == 1
+    assert [votes for *_, votes in buckets("minute")] == [1]
+
+
+@pytest.mark.django_db
+def test_compaction_folds_into_coarser_buckets(question_with_choices):
+    question, yes, no = question_with_choices
+    now = datetime.datetime(2026, 6, 1, 12, 0, tzinfo=UTC)
+    old = datetime.datetime(2026, 1, 1, 10, 0, tzinfo=UTC)
+    for minute in (1, 2, 59):
+        VoteBucket.objects.add_votes(
+            {(question.pk, yes.pk): 1}, old + datetime.timedelta(minutes=minute)
+        )
+    VoteBucket.objects.add_votes({(question.pk, no.pk): 4}, now)
+
+    assert compact_vote_buckets(now=now) == 4, "3 minutes, then their hour"
+
+    assert buckets("minute") == [(no.pk, now, 4)]
+    assert buckets("hour") == []
+    assert buckets("day") == [(yes.pk, old.replace(hour=0), 3)]
+
+
+@pytest.mark.django_db
+def test_series_is_one_range_scan(question_with_choices):
+    question, yes, no = question_with_choices
+    until = datetime.datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+    VoteBucket.objects.add_votes({(question.pk, yes.pk): 2}, until.replace(hour=9))
+    VoteBucket.objects.add_votes(
+        {(question.pk, yes.pk): 1, (question.pk, no.pk): 3},
+        until.replace(hour=11, minute=15),
+    )
+    VoteBucket.objects.add_votes({(question.pk, no.pk): 7}, until.replace(hour=1))
+
+    with CaptureQueriesContext(connection) as queries:
+        series = vote_series(question.pk, "hour", 3, until)
+
+    assert len(queries) == 1
+    assert series.starts == [until.replace(hour=h) for h in (9, 10, 11)]
+    assert series.totals == [2, 0, 4]
+    assert series.choices == {yes.pk: [2, 0, 1], no.pk: [0, 0, 3]}
+
+
+@pytest.mark.django_db
+def test_series_endpoint(client, question_with_choices, vote_series_buffer):
+    question, yes, _ = question_with_choices
+    url = reverse("polls_api:series", args=[question.pk])
+    client.post(reverse("polls:vote", args=[question.id]), {"choice": yes.id})
+    vote_series_buffer.flush()
+
+    payload = client.get(url, {"resolution": "minute", "points": 5}).json()
+
+    assert payload["resolution"] == "minute"
+    assert len(payload["starts"]) == 5
+    assert sum(payload["totals"]) == 1
+    assert [c["id"] for c in payload["choices"]] == [yes.pk]
+    assert client.get(url, {"resolution": "week"}).status_code == 400
+    assert client.get(reverse("polls_api:series", args=[999])).status_code == 404
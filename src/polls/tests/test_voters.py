@@ -0,0 +1,134 @@
+"""
+One-vote-per-voter tests.
+"""
+
+import pytest
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.config import settings
+from polls import voters
+from polls.models import VoteReceipt
+from polls.voters import BloomFilter, claim_vote, get_voter_filter
+
+pytestmark = pytest.mark.usefixtures("locmem_cache")
+
+
+@pytest.fixture(autouse=True)
+def voter_filters():
+    voters._filters.clear()
+    yield
+    voters._filters.clear()
+
+
+@pytest.fixture
+def question(make_question):
+    return make_question("Once?", Yes=0)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"user:{i}")
+
+    assert all(f"user:{i}" in bloom for i in range(1000))
+    false_positives = sum(f"session:{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+def test_claim_vote_once(question):
+    assert claim_vote(question.pk, "user:1")
+    assert not claim_vote(question.pk, "user:1")
+    assert claim_vote(question.pk, "user:2")
+    assert VoteReceipt.objects.filter(question=question).count() == 2
+
+
+@pytest.mark.django_db
+def test_claim_only_inserts(question):
+    VoteReceipt.objects.create(question=question, voter="user:1")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert not claim_vote(question.pk, "user:1")
+        assert claim_vote(question.pk, "user:2")
+
+    assert not any("SELECT" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_new_voters_skip_the_lookup(question):
+    get_voter_filter(question.pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert claim_vote(question.pk, "user:1", use_filter=True)
+
+    assert not any("SELECT" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_filter_is_rebuilt_from_the_receipts(question):
+    VoteReceipt.objects.create(question=question, voter="user:1")
+
+    assert "user:1" in get_voter_filter(question.pk)
+    assert not claim_vote(question.pk, "user:1", use_filter=True)
+
+
+@pytest.mark.django_db
+def test_stale_filter_falls_back_on_the_constraint(question):
+    get_voter_filter(question.pk)
+    # voted through another process, unknown to this filter
+    VoteReceipt.objects.create(question=question, voter="user:1")
+
+    assert not claim_vote(question.pk, "user:1", use_filter=True)
+    assert VoteReceipt.objects.filter(question=question).count() == 1
+
+
+@pytest.mark.django_db
+def test_false_positives_are_looked_up(question):
+    get_voter_filter(question.pk).add("user:1")
+
+    assert claim_vote(question.pk, "user:1", use_filter=True)
+
+
+@pytest.mark.django_db
+def test_vote_once_per_session(client, monkeypatch, question):
+    monkeypatch.setattr(settings, "ENABLE_ONE_VOTE_PER_VOTER", True)
+    choice = question.choice_set.get()
+    url = reverse("polls:vote", args=[question.id])
+
+    client.post(url, {"choice": choice.pk})
+    response = client.post(url, {"choice": choice.pk}, follow=True)
+
+    assert "You have already voted on this poll." in response.content.decode()
+    question.refresh_from_db()
+    assert question.total_votes() == 1
+    client.cookies.clear()
+    client.post(url, {"choice": choice.pk})
+    question.refresh_from_db()
+    assert question.total_votes() == 2
+
+
+@pytest.mark.django_db
+def test_failed_vote_leaves_no_receipt(client, monkeypatch, question):
+    monkeypatch.setattr(settings, "ENABLE_ONE_VOTE_PER_VOTER", True)
+
+    def fail(*args, **kwargs):
+        raise DatabaseError("database is down")
+
+    monkeypatch.setattr("polls.views.record_vote", fail)
+    url = reverse("polls:vote", args=[question.id])
+    with pytest.raises(DatabaseError):
+        client.post(url, {"choice": question.choice_set.get().pk})
+
+    assert not VoteReceipt.objects.exists()
+
+
+@pytest.mark.django_db
+def test_filter_is_shared_through_the_cache(question, django_assert_num_queries):
+    get_voter_filter(question.pk)
+    # another process, with no copy of its own
+    voters._filters.clear()
+
+    with django_assert_num_queries(0):
+        get_voter_filter(question.pk)
@@ -0,0 +1,126 @@
+"""
+Vote time series.
+
+Votes are counted into per-choice `VoteBucket`s of their minute as they are
+applied to `Choice.votes` (see `ChoiceQuerySet.add_votes`), or for direct votes
+a few seconds later (see `VoteSeriesBuffer`). Compaction folds
+minutes past their retention into hours and hours into days, so the table
+stays small while recent activity keeps its detail.
+
+A chart series is one range scan of a question's buckets, grouped by the
+requested resolution; buckets coarser than that resolution show up at their
+own start.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from core.config import settings
+
+from .models import VoteBucket
+
+logger = logging.getLogger("default")
+
+Resolution = VoteBucket.Resolution
+
+
+@dataclass(frozen=True)
+class VoteSeries:
+    resolution: str
+    starts: list[datetime.datetime]
+    totals: list[int]
+    choices: dict[int, list[int]]
+
+
+def vote_series(
+    question_id: int, resolution: str, points: int, until: datetime.datetime
+) -> VoteSeries:
+    """
+    Return the votes of the question and its choices for the `points` buckets
+    of `resolution` ending before `until`, zeros included.
+    """
+    resolution = Resolution(resolution)
+    until = resolution.truncate(until)
+    starts = [until - resolution.width * i for i in range(points, 0, -1)]
+    index = {start: i for i, start in enumerate(starts)}
+
+    rows = (
+        VoteBucket.objects.filter(
+            question_id=question_id, start__gte=starts[0], start__lt=until
+        )
+        .annotate(bucket=Trunc("start", resolution.value, tzinfo=datetime.UTC))
+        .order_by()
+        .values_list("choice", "bucket")
+        .annotate(total=Sum("votes"))
+    )
+    totals = [0] * points
+    choices: dict[int, list[int]] = defaultdict(lambda: [0] * points)
+    for choice_id, bucket, votes in rows:
+        i = index[bucket]
+        totals[i] += votes
+        choices[choice_id][i] += votes
+
+    return VoteSeries(
+        resolution=resolution.value,
+        starts=starts,
+        totals=totals,
+        choices=dict(choices),
+    )
+
+
+def compact_vote_buckets(now: datetime.datetime | None = None) -> int:
+    """
+    Fold minute buckets past their retention into hours, and hours into days.
+    Returns the number of buckets folded.
+    """
+    now = now or timezone.now()
+    minute_cutoff = Resolution.HOUR.truncate(
+        now - datetime.timedelta(hours=settings.VOTE_MINUTE_BUCKET_RETENTION_HOURS)
+    )
+    hour_cutoff = Resolution.DAY.truncate(
+        now - datetime.timedelta(days=settings.VOTE_HOUR_BUCKET_RETENTION_DAYS)
+    )
+    folded = fold_vote_buckets(Resolution.MINUTE, Resolution.HOUR, minute_cutoff)
+    folded += fold_vote_buckets(Resolution.HOUR, Resolution.DAY, hour_cutoff)
+
+    if folded:
+        msg = f"Folded {folded} vote buckets"
+        logger.info(msg)
+    return folded
+
+
+def fold_vote_buckets(
+    source: Resolution, target: Resolution, cutoff: datetime.datetime
+) -> int:
+    """
+    Fold the `source` buckets starting before `cutoff`, which must be aligned
+    on `target`, into `target` buckets.
+    """
+    with transaction.atomic():
+        buckets = list(
+            VoteBucket.objects.select_for_update()
+            .filter(resolution=source, start__lt=cutoff)
+            .values_list("pk", "question_id", "choice_id", "start", "votes")
+        )
+        if not buckets:
+            return 0
+
+        sums: Counter[tuple[datetime.datetime, int, int]] = Counter()
+        for _, question_id, choice_id, start, votes in buckets:
+            sums[start, question_id, choice_id] += votes
+        VoteBucket.objects.add_counts(sums, target)
+
+        pks = [pk for pk, *_ in buckets]
+        for i in range(0, len(pks), settings.BATCH_SIZE):
+            VoteBucket.objects.filter(pk__in=pks[i : i + settings.BATCH_SIZE]).delete()
+
+    return len(buckets)
@@ -1,15 +1,41 @@
 from django.urls import path
 
+from core.config import settings
+
 from . import views
 
+
+def select_view(name, view, async_view):
+    """Serve the async variant of the view when `name` is in ASYNC_POLLS_VIEWS."""
+    return async_view if name in settings.ASYNC_POLLS_VIEWS else view
+
+
 app_name = "polls"
 urlpatterns = [
     # ex: /polls/
     path("", views.IndexView.as_view(), name="index"),
+    # ex: /polls/trending/
+    path("trending/", views.TrendingView.as_view(), name="trending"),
     # ex: /polls/5/
-    path("<int:pk>/", views.DetailView.as_view(), name="detail"),
+    path(
+        "<int:pk>/",
+        select_view(
+            "detail", views.DetailView.as_view(), views.AsyncDetailView.as_view()
+        ),
+        name="detail",
+    ),
     # ex: /polls/5/results/
-    path("<int:pk>/results/", views.ResultsView.as_view(), name="results"),
+    path(
+        "<int:pk>/results/",
+        select_view(
+            "results", views.ResultsView.as_view(), views.AsyncResultsView.as_view()
+        ),
+        name="results",
+    ),
     # ex: /polls/5/vote/
-    path("<int:question_id>/vote/", views.vote, name="vote"),
+    path(
+        "<int:question_id>/vote/",
+        select_view("vote", views.vote, views.async_vote),
+        name="vote",
+    ),
 ]
@@ -0,0 +1,95 @@
+"""
+Per-question results versions.
+
+Every change to a question's counts bumps its version, so anything derived from
+the results can be cached under `(question_id, version)` and never needs to be
+invalidated explicitly: readers simply stop asking for stale versions, which
+then expire by TTL. Versions expire too, after `RESULTS_VERSION_TIMEOUT`, so
+looking up questions that do not exist leaves no key behind for good.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+def results_version_key(question_id: int) -> str:
+    return f"polls:results_version:{question_id}"
+
+
+def get_results_version(question_id: int) -> int:
+    """
+    Return the current results version of the question.
+    """
+    key = results_version_key(question_id)
+    version = cache.get(key)
+    if version is None:
+        # seeded from the clock, so a version evicted from the cache is never
+        # handed out again for different counts
+        cache.add(key, time.time_ns() // 1000, settings.RESULTS_VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+async def aget_results_version(question_id: int) -> int:
+    """
+    Async `get_results_version`.
+    """
+    key = results_version_key(question_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns() // 1000, settings.RESULTS_VERSION_TIMEOUT)
+        version = await cache.aget(key)
+    return version
+
+
+def get_results_versions(question_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Return the current results versions of many questions, with one cache
+    round trip when they are all seeded.
+    """
+    keys = {results_version_key(pk): pk for pk in question_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    for pk in keys.values():
+        if pk not in versions:
+            versions[pk] = get_results_version(pk)
+    return versions
+
+
+def bump_results_version(question_ids: Iterable[int]) -> None:
+    """
+    Bump the results versions once the current transaction commits.
+    """
+    question_ids = set(question_ids)
+    if question_ids:
+        transaction.on_commit(lambda: _bump(question_ids))
+
+
+def _bump(question_ids: set[int]) -> None:
+    for question_id in question_ids:
+        try:
+            cache.incr(results_version_key(question_id))
+        except ValueError:
+            # not seeded yet, the first reader seeds a fresh version
+            continue
+
+
+async def abump_results_version(question_ids: Iterable[int]) -> None:
+    """
+    Bump the results versions right away, for async code, which always runs
+    in autocommit mode.
+    """
+    for question_id in set(question_ids):
+        try:
+            await cache.aincr(results_version_key(question_id))
+        except ValueError:
+            continue
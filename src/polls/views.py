@@ -1,11 +1,39 @@
+import functools
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
-from django.db.models import F
-from django.http import HttpResponseRedirect
-from django.shortcuts import get_object_or_404, render
+from django.core.cache import cache
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import aget_object_or_404, get_object_or_404, render
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.views import generic
 
+from core.config import settings
+
+from .ballots import parse_ballot, record_ballot
 from .models import Choice, Question
+from .pagination import InvalidCursorError, KeysetPaginator
+from .results import (
+    abuild_results,
+    acount_results_cache,
+    build_results,
+    count_results_cache,
+    dump_results,
+    load_results,
+    results_cache_key,
+)
+from .snapshots import (
+    aget_cached_snapshot,
+    aload_snapshot,
+    get_cached_snapshot,
+    load_snapshot,
+)
+from .versions import aget_results_version, get_results_version
+from .voters import avote_once, vote_once
+from .votes import arecord_vote, record_vote
 
 
 class IndexView(generic.ListView):
@@ -16,10 +44,36 @@ class IndexView(generic.ListView):
     template_name = "polls/index.html"
     context_object_name = "latest_question_list"
     paginate_by = 10
+    ordering = ("-pub_date", "-id")
+
+    def get_queryset(self):
+        """Return the published questions, newest first."""
+        return Question.objects.with_choice_count()
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate by `?cursor=` keyset cursors instead of OFFSET pages.
+        """
+        paginator = KeysetPaginator(queryset, self.ordering, page_size)
+        try:
+            page = paginator.get_page(self.request.GET.get("cursor"))
+        except InvalidCursorError as e:
+            raise Http404("Invalid cursor") from e
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class TrendingView(generic.ListView):
+    """
+    Display the poll questions with the most recent votes.
+    """
+
+    template_name = "polls/index.html"
+    context_object_name = "latest_question_list"
+    extra_context = {"trending": True}
 
     def get_queryset(self):
-        """Return the last ten published questions."""
-        return Question.objects.order_by("-pub_date")[:10]
+        """Return the top trending questions."""
+        return Question.objects.trending()[: settings.TRENDING_PAGE_SIZE]
 
 
 class DetailView(generic.DetailView):
@@ -32,7 +86,8 @@ class DetailView(generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["total_votes"] = self.object.total_votes()
+        context["results"] = build_results(self.object)
+        context["total_votes"] = context["results"].total_votes
         return context
 
 
@@ -44,36 +99,146 @@ class ResultsView(generic.DetailView):
     model = Question
     template_name = "polls/results.html"
 
+    def get(self, request, *args, **kwargs):
+        snapshot = get_cached_snapshot(self.kwargs[self.pk_url_kwarg])
+        if snapshot is not None:
+            self.object, results, results_html = snapshot
+        elif not settings.ENABLE_RESULTS_CACHE:
+            self.object = self.get_object()
+            results, results_html = self.build_results()
+        else:
+            results, results_html = self.get_cached_results()
+
+        closed = snapshot is not None or self.object.is_closed
+        context = self.get_context_data(
+            object=self.object,
+            results=results,
+            results_html=results_html,
+            closed=closed,
+        )
+        response = self.render_to_response(context)
+        if closed:
+            cache_frozen_results(request, response)
+        return response
+
+    def build_results(self):
+        """
+        Return the results and the rendered choices fragment of `self.object`,
+        from its snapshot once the poll is closed.
+        """
+        if self.object.is_closed:
+            _, results, results_html = load_snapshot(self.object.pk)
+            return results, results_html
+        results = build_results(self.object)
+        results_html = render_to_string(
+            "polls/results_choices.html", {"results": results}
+        )
+        return results, results_html
+
+    def get_cached_results(self):
+        """
+        Return the results and the rendered choices fragment from the cache,
+        keyed by the current results version, building both on a miss. The
+        fragment is cached as the `SafeString` `render_to_string` returns.
+        """
+        question_id = self.kwargs[self.pk_url_kwarg]
+        version = get_results_version(question_id)
+        keys = [
+            results_cache_key(question_id, version, part) for part in ("json", "html")
+        ]
+        cached = cache.get_many(keys)
+        if len(cached) == len(keys):
+            count_results_cache(hit=True)
+            self.object, results = load_results(cached[keys[0]])
+            return results, cached[keys[1]]
+
+        count_results_cache(hit=False)
+        self.object = self.get_object()
+        results, results_html = self.build_results()
+        if self.object.is_closed:
+            return results, results_html
+        cache.set_many(
+            {keys[0]: dump_results(self.object, results), keys[1]: results_html},
+            settings.RESULTS_CACHE_TIMEOUT,
+        )
+        return results, results_html
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["total_votes"] = self.object.total_votes()
+        context["total_votes"] = context["results"].total_votes
         return context
 
 
+def cache_frozen_results(request, response):
+    """
+    Let anyone cache the frozen results page of a closed poll, unless it
+    showed one-off messages.
+    """
+
+    def patch(response):
+        if not messages.get_messages(request).used:
+            patch_cache_control(
+                response, public=True, max_age=settings.CLOSED_RESULTS_MAX_AGE
+            )
+
+    response.add_post_render_callback(patch)
+
+
+def already_voted(request, question):
+    messages.error(request, "You have already voted on this poll.")
+    return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+
+
 def vote(request, question_id):
     """
     Handle voting on a poll question.
     """
     question = get_object_or_404(Question, pk=question_id)
+    if question.is_closed:
+        messages.error(request, "This poll is closed.")
+        return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+
+    if question.ballot_type != Question.BallotType.SINGLE:
+        try:
+            choices = parse_ballot(question, request.POST)
+        except ValueError:
+            messages.error(request, "Your ballot is not valid.")
+        else:
+            record = functools.partial(record_ballot, question, choices, request)
+            if not vote_once(question, request, record):
+                return already_voted(request, question)
+            messages.success(request, "Your ballot has been recorded!")
+            return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+        results = build_results(question)
+        return render(
+            request,
+            "polls/detail.html",
+            {
+                "question": question,
+                "results": results,
+                "total_votes": results.total_votes,
+            },
+        )
 
     try:
         selected_choice = question.choice_set.get(pk=request.POST["choice"])
-    except (KeyError, Choice.DoesNotExist):
+    except (KeyError, ValueError, Choice.DoesNotExist):
         # Redisplay the question voting form with error message
         messages.error(request, "You didn't select a choice.")
+        results = build_results(question)
         return render(
             request,
             "polls/detail.html",
             {
                 "question": question,
-                "total_votes": question.total_votes(),
+                "results": results,
+                "total_votes": results.total_votes,
             },
         )
     else:
-        # Use F() to avoid race conditions
-        selected_choice.votes = F("votes") + 1
-        selected_choice.save()
-        selected_choice.refresh_from_db()  # Get the updated vote count
+        record = functools.partial(record_vote, question, selected_choice, request)
+        if not vote_once(question, request, record):
+            return already_voted(request, question)
 
         messages.success(
             request, f"Your vote for '{selected_choice.choice_text}' has been recorded!"
@@ -83,3 +248,162 @@ def vote(request, question_id):
         # with POST data to prevent data from being posted twice if a
         # user hits the Back button.
         return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+
+
+# Async variants, served instead of the views above for the URL names listed in
+# `ASYNC_POLLS_VIEWS` (see `polls.urls`). They use the async ORM and cache API,
+# pages are `TemplateResponse`s rendered by the handler, since templates may
+# touch the session or the user.
+
+
+class AsyncDetailView(generic.View):
+    """
+    Display a poll question with its choices for voting.
+    """
+
+    template_name = "polls/detail.html"
+
+    async def get(self, request, pk):
+        question = await aget_object_or_404(Question, pk=pk)
+        results = await abuild_results(question)
+        return TemplateResponse(
+            request,
+            self.template_name,
+            {
+                "object": question,
+                "question": question,
+                "results": results,
+                "total_votes": results.total_votes,
+            },
+        )
+
+
+class AsyncResultsView(generic.View):
+    """
+    Display the results of a poll question.
+    """
+
+    template_name = "polls/results.html"
+
+    async def get(self, request, pk):
+        snapshot = await aget_cached_snapshot(pk)
+        if snapshot is not None:
+            question, results, results_html = snapshot
+        elif settings.ENABLE_RESULTS_CACHE:
+            question, results, results_html = await self.get_cached_results(pk)
+        else:
+            question = await aget_object_or_404(Question, pk=pk)
+            results, results_html = await self.build_results(question)
+
+        closed = snapshot is not None or question.is_closed
+        response = TemplateResponse(
+            request,
+            self.template_name,
+            {
+                "object": question,
+                "question": question,
+                "results": results,
+                "results_html": results_html,
+                "total_votes": results.total_votes,
+                "closed": closed,
+            },
+        )
+        if closed:
+            cache_frozen_results(request, response)
+        return response
+
+    async def build_results(self, question):
+        """
+        Async `ResultsView.build_results`.
+        """
+        if question.is_closed:
+            _, results, results_html = await aload_snapshot(question.pk)
+            return results, results_html
+        results = await abuild_results(question)
+        results_html = render_to_string(
+            "polls/results_choices.html", {"results": results}
+        )
+        return results, results_html
+
+    async def get_cached_results(self, pk):
+        """
+        Async `ResultsView.get_cached_results`.
+        """
+        version = await aget_results_version(pk)
+        keys = [results_cache_key(pk, version, part) for part in ("json", "html")]
+        cached = await cache.aget_many(keys)
+        if len(cached) == len(keys):
+            await acount_results_cache(hit=True)
+            question, results = load_results(cached[keys[0]])
+            return question, results, cached[keys[1]]
+
+        await acount_results_cache(hit=False)
+        question = await aget_object_or_404(Question, pk=pk)
+        results, results_html = await self.build_results(question)
+        if question.is_closed:
+            return question, results, results_html
+        await cache.aset_many(
+            {keys[0]: dump_results(question, results), keys[1]: results_html},
+            settings.RESULTS_CACHE_TIMEOUT,
+        )
+        return question, results, results_html
+
+
+async def async_vote(request, question_id):
+    """
+    Handle voting on a poll question.
+    """
+    question = await aget_object_or_404(Question, pk=question_id)
+    if question.is_closed:
+        messages.error(request, "This poll is closed.")
+        return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+
+    if question.ballot_type != Question.BallotType.SINGLE:
+        try:
+            choices = await sync_to_async(parse_ballot)(question, request.POST)
+        except ValueError:
+            messages.error(request, "Your ballot is not valid.")
+        else:
+            record = functools.partial(record_ballot, question, choices, request)
+            if not await avote_once(question, request, record, sync_to_async(record)):
+                return already_voted(request, question)
+            messages.success(request, "Your ballot has been recorded!")
+            return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
+        results = await abuild_results(question)
+        return TemplateResponse(
+            request,
+            "polls/detail.html",
+            {
+                "question": question,
+                "results": results,
+                "total_votes": results.total_votes,
+            },
+        )
+
+    try:
+        selected_choice = await question.choice_set.aget(pk=request.POST["choice"])
+    except (KeyError, ValueError, Choice.DoesNotExist):
+        messages.error(request, "You didn't select a choice.")
+        results = await abuild_results(question)
+        return TemplateResponse(
+            request,
+            "polls/detail.html",
+            {
+                "question": question,
+                "results": results,
+                "total_votes": results.total_votes,
+            },
+        )
+
+    if not await avote_once(
+        question,
+        request,
+        functools.partial(record_vote, question, selected_choice, request),
+        functools.partial(arecord_vote, question, selected_choice, request),
+    ):
+        return already_voted(request, question)
+
+    messages.success(
+        request, f"Your vote for '{selected_choice.choice_text}' has been recorded!"
+    )
+    return HttpResponseRedirect(reverse("polls:results", args=(question.id,)))
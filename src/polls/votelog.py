@@ -0,0 +1,214 @@
+"""
+Append-only vote log.
+
+With `ENABLE_VOTE_LOG` every vote is stored as a `Vote` event instead of being
+counted on the spot. Events are written with batched INSERTs, and the rollup
+folds the events past the `VoteRollupMark` high-water mark into
+`Choice.votes`, so the counters can always be audited and rebuilt from the log.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import logging
+import threading
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from functools import cache
+from typing import TYPE_CHECKING
+
+from django.contrib.auth import get_user_model
+from django.db import InterfaceError, OperationalError, transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from core.config import settings
+
+from .demographics import count_demographics
+from .models import Choice, Vote, VoteRollupMark, count_vote_series
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+logger = logging.getLogger("default")
+
+ROLLUP_MARK = "choice_votes"
+
+
+class VoteLog:
+    """
+    Collects vote events and writes them with one bulk INSERT per batch.
+
+    Full batches are written by the voting request once its transaction
+    commits, partial ones by a daemon timer (and once more at interpreter
+    exit). Until then the events live in the worker's memory only and do NOT
+    survive a crash; a write failing on a transient error puts them back to be
+    retried with the next one, other failures drop them.
+    """
+
+    def __init__(
+        self, batch_size: int | None = None, flush_interval: float | None = None
+    ) -> None:
+        self.batch_size = (
+            settings.VOTE_LOG_BATCH_SIZE if batch_size is None else batch_size
+        )
+        self.flush_interval = (
+            settings.VOTE_LOG_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self._pending: list[Vote] = []
+        self._mutex = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self._flush_quietly)
+
+    def append(
+        self, question_id: int, choice_id: int, request: HttpRequest | None = None
+    ) -> None:
+        """Log one vote for the choice, cast by the user of `request`."""
+        user = getattr(request, "user", None)
+        session = getattr(request, "session", None)
+        vote = Vote(
+            question_id=question_id,
+            choice_id=choice_id,
+            user_id=user.pk if user is not None and user.is_authenticated else None,
+            session_key=(session.session_key or "") if session is not None else "",
+        )
+        with self._mutex:
+            self._pending.append(vote)
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None and self.flush_interval > 0:
+                self._schedule()
+
+        if full:
+            # outside the voting transaction, which may still roll back, and
+            # the vote is kept if the write fails, so the voter need not know
+            transaction.on_commit(self._flush_quietly)
+
+    def flush(self) -> int:
+        """
+        Insert the pending events.
+        Returns the number of events written.
+        """
+        with self._mutex:
+            events, self._pending = self._pending, []
+        if not events:
+            return 0
+        try:
+            with transaction.atomic():
+                # choices deleted since their votes were logged have no rows
+                live = set(
+                    Choice.objects.filter(
+                        pk__in={event.choice_id for event in events}
+                    ).values_list("pk", flat=True)
+                )
+                events = [event for event in events if event.choice_id in live]
+                # and voters deleted since leave anonymous votes, as on delete
+                user_ids = {e.user_id for e in events if e.user_id is not None}
+                if user_ids:
+                    users = set(
+                        get_user_model()
+                        .objects.filter(pk__in=user_ids)
+                        .values_list("pk", flat=True)
+                    )
+                    for event in events:
+                        if event.user_id not in users:
+                            event.user_id = None
+                Vote.objects.bulk_create(events, batch_size=settings.BATCH_SIZE)
+        except (OperationalError, InterfaceError):
+            msg = f"Failed to write {len(events)} logged votes, keeping them"
+            logger.exception(msg)
+            with self._mutex:
+                # ahead of the events appended meanwhile, in casting order
+                self._pending[:0] = events
+                if self._timer is None and self.flush_interval > 0:
+                    self._schedule()
+            raise
+        except Exception:
+            # retrying would fail the same way, and hold back every later event
+            msg = f"Failed to write {len(events)} logged votes, dropping them"
+            logger.exception(msg)
+            raise
+        return len(events)
+
+    def _schedule(self) -> None:
+        self._timer = threading.Timer(self.flush_interval, self._run_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        # logged by flush, the events are kept for the next one
+        with contextlib.suppress(Exception):
+            self.flush()
+
+    def _run_timer(self) -> None:
+        try:
+            self._flush_quietly()
+        finally:
+            with self._mutex:
+                self._timer = None
+                if self._pending:
+                    self._schedule()
+
+
+@cache
+def get_vote_log() -> VoteLog:
+    """Return the process wide vote log writer."""
+    return VoteLog()
+
+
+def roll_up_votes(lag: float | None = None) -> int:
+    """
+    Count the events logged since the last rollup into `Choice.votes` and
+    advance the high-water mark.
+    Returns the number of votes rolled up.
+    """
+    lag = settings.VOTE_ROLLUP_LAG if lag is None else lag
+    cutoff = timezone.now() - timedelta(seconds=lag)
+
+    with transaction.atomic():
+        mark, _ = VoteRollupMark.objects.select_for_update().get_or_create(
+            name=ROLLUP_MARK
+        )
+        events = Vote.objects.filter(pk__gt=mark.last_vote_id)
+        high = events.filter(created_at__lte=cutoff).aggregate(high=Max("pk"))["high"]
+        if high is None:
+            return 0
+
+        # counted per minute, so the time series buckets the events by when
+        # they were cast rather than by when they were rolled up
+        series: dict[tuple[datetime, int, int], int] = {}
+        deltas: Counter[int] = Counter()
+        for minute, question_id, choice_id, votes in (
+            events.filter(pk__lte=high)
+            .annotate(minute=TruncMinute("created_at", tzinfo=UTC))
+            .order_by()
+            .values_list("minute", "question", "choice")
+            .annotate(votes=Count("pk"))
+        ):
+            series[minute, question_id, choice_id] = votes
+            deltas[choice_id] += votes
+        Choice.objects.add_votes(deltas)
+        count_vote_series(series)
+
+        if settings.ENABLE_DEMOGRAPHIC_CUBE:
+            count_demographics(
+                {
+                    (question_id, choice_id, user_id): votes
+                    for question_id, choice_id, user_id, votes in events.filter(
+                        pk__lte=high, user__isnull=False
+                    )
+                    .order_by()
+                    .values_list("question", "choice", "user")
+                    .annotate(votes=Count("pk"))
+                }
+            )
+        mark.last_vote_id = high
+        mark.save(update_fields=["last_vote_id", "updated_at"])
+
+    rolled_up = sum(deltas.values())
+    msg = f"Rolled up {rolled_up} logged votes up to event {high}"
+    logger.info(msg)
+    return rolled_up
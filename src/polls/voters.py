@@ -0,0 +1,200 @@
+"""
+One vote per voter.
+
+With `ENABLE_ONE_VOTE_PER_VOTER` a vote claims a `VoteReceipt` for its voter
+(the signed-in user, else the session) in the transaction recording it. The
+receipts' unique constraint is the authority: the receipt is inserted, and a
+repeat voter fails on the constraint. With `ENABLE_VOTER_FILTER`, a
+per-question Bloom filter of the voters spares repeat voters that failed INSERT
+(and the rolled back savepoint around it), as voters the filter may have seen
+are looked up first:
+
+- not in the filter: a new voter, the receipt is inserted right away
+- in the filter: a repeat voter or a false positive, the receipt is looked up
+
+The filter is rebuilt from the receipts by one caller at a time, shared
+through the cache and kept in process until `VOTER_FILTER_TTL`. A stale or
+lossy filter only misses voters, and those still fail on the unique
+constraint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+
+from core.cache import cacheable
+from core.config import settings
+
+from .models import VoteReceipt
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from django.http import HttpRequest
+
+    from .models import Question
+
+# questions whose filter is kept in process
+MAX_LOCAL_FILTERS = 256
+
+_filters: dict[int, tuple[float, BloomFilter]] = {}
+_filters_mutex = threading.Lock()
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives, in about
+    1.2 bytes per item at a 1% error rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # double hashing, k positions from one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        # concurrent adds may lose a bit, which only makes a false negative
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def voter_filter_cache_key(question_id: int) -> str:
+    return f"polls:voter_filter:{question_id}"
+
+
+@cacheable(voter_filter_cache_key, timeout=settings.VOTER_FILTER_TTL)
+def build_voter_filter(question_id: int) -> BloomFilter:
+    """
+    Build the filter of the question's voters from its receipts, or return
+    the cached one.
+    """
+    receipts = VoteReceipt.objects.filter(question_id=question_id).order_by()
+    bloom = BloomFilter(
+        max(settings.VOTER_FILTER_CAPACITY, 2 * receipts.count()),
+        settings.VOTER_FILTER_ERROR_RATE,
+    )
+    for voter in receipts.values_list("voter", flat=True).iterator(
+        chunk_size=settings.BATCH_SIZE
+    ):
+        bloom.add(voter)
+    return bloom
+
+
+def get_voter_filter(question_id: int) -> BloomFilter:
+    """
+    Return the question's filter: the process copy, else the cached one, else
+    a rebuilt one.
+    """
+    now = time.monotonic()
+    with _filters_mutex:
+        entry = _filters.get(question_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    bloom = build_voter_filter(question_id)
+    with _filters_mutex:
+        _filters.pop(question_id, None)
+        _filters[question_id] = (now + settings.VOTER_FILTER_TTL, bloom)
+        while len(_filters) > MAX_LOCAL_FILTERS:
+            del _filters[next(iter(_filters))]
+    return bloom
+
+
+def claim_vote(question_id: int, voter: str, use_filter: bool | None = None) -> bool:
+    """
+    Claim the voter's vote on the question by inserting its receipt.
+    Returns False when the voter has already voted.
+    """
+    if use_filter is None:
+        use_filter = settings.ENABLE_VOTER_FILTER
+    bloom = get_voter_filter(question_id) if use_filter else None
+
+    if (
+        bloom is not None
+        and voter in bloom
+        and VoteReceipt.objects.filter(question_id=question_id, voter=voter).exists()
+    ):
+        return False
+
+    try:
+        with transaction.atomic():
+            VoteReceipt.objects.create(question_id=question_id, voter=voter)
+    except IntegrityError:
+        claimed = False
+    else:
+        claimed = True
+    if bloom is not None:
+        bloom.add(voter)
+    return claimed
+
+
+def get_voter(request: HttpRequest) -> str | None:
+    """
+    Identify the voter by user, else by session (started if needed).
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    session = getattr(request, "session", None)
+    if session is None:
+        return None
+    if not session.session_key:
+        session.save()
+    return f"session:{session.session_key}"
+
+
+def vote_once(
+    question: Question, request: HttpRequest, record: Callable[[], object]
+) -> bool:
+    """
+    Claim the request's vote on the question and `record` it, in one
+    transaction, so a vote that fails to record leaves no receipt behind.
+    Returns False, recording nothing, when the voter has already voted.
+    """
+    if not settings.ENABLE_ONE_VOTE_PER_VOTER:
+        record()
+        return True
+    voter = get_voter(request)
+    with transaction.atomic():
+        if voter is not None and not claim_vote(question.pk, voter):
+            return False
+        record()
+    return True
+
+
+async def avote_once(
+    question: Question,
+    request: HttpRequest,
+    record: Callable[[], object],
+    arecord: Callable[[], Awaitable[object]],
+) -> bool:
+    """
+    Async `vote_once`: the vote is recorded by `arecord`, or by `record` in a
+    thread when it is claimed along with it.
+    """
+    if not settings.ENABLE_ONE_VOTE_PER_VOTER:
+        await arecord()
+        return True
+    return await sync_to_async(vote_once)(question, request, record)
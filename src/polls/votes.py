@@ -0,0 +1,213 @@
+"""
+Vote ingestion.
+
+A vote takes one of four paths:
+- logged: appended to the `Vote` event log and counted by the rollup
+  (`ENABLE_VOTE_LOG`)
+- buffered: absorbed by the write-behind buffer (`ENABLE_VOTE_BUFFER`)
+- sharded: added to one of the question's `ChoiceVoteShard` rows
+- direct: a single `F("votes") + 1` UPDATE on the choice
+
+Only the batched paths write the vote time series and trending scores on the
+spot; direct votes leave theirs to the `VoteSeriesBuffer`.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+import zlib
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.config import settings
+
+from .buffers import get_vote_buffer, get_vote_series_buffer
+from .models import Choice, ChoiceVoteShard, Question, delta_case
+from .versions import abump_results_version, bump_results_version
+from .votelog import get_vote_log
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+logger = logging.getLogger("default")
+
+
+def record_vote(
+    question: Question, choice: Choice, request: HttpRequest | None = None
+) -> None:
+    """
+    Record one vote for `choice` through the configured ingestion path.
+    """
+    if settings.ENABLE_VOTE_LOG:
+        get_vote_log().append(question.pk, choice.pk, request)
+        return
+
+    if settings.ENABLE_VOTE_BUFFER:
+        get_vote_buffer().add(choice.pk)
+        return
+
+    started_at = time.perf_counter()
+    if question.vote_shard_count > 1:
+        shard = pick_shard(question.vote_shard_count, get_shard_key(request))
+        add_sharded_vote(choice.pk, shard)
+    else:
+        add_direct_vote(question.pk, choice.pk)
+
+    bump_results_version([question.pk])
+
+    if settings.ENABLE_VOTE_SHARD_AUTOSCALE:
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        report_vote_latency(question, elapsed_ms)
+
+
+async def arecord_vote(
+    question: Question, choice: Choice, request: HttpRequest | None = None
+) -> None:
+    """
+    Async `record_vote`. Sharded votes run on the async ORM; the vote log and
+    buffer (which may flush or call Redis) and the direct path (which needs a
+    transaction) are handed to a thread.
+    """
+    if settings.ENABLE_VOTE_LOG or settings.ENABLE_VOTE_BUFFER:
+        await sync_to_async(record_vote)(question, choice, request)
+        return
+
+    started_at = time.perf_counter()
+    if question.vote_shard_count > 1:
+        shard = pick_shard(question.vote_shard_count, get_shard_key(request))
+        await aadd_sharded_vote(choice.pk, shard)
+    else:
+        await sync_to_async(add_direct_vote)(question.pk, choice.pk)
+
+    await abump_results_version([question.pk])
+
+    if settings.ENABLE_VOTE_SHARD_AUTOSCALE:
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        await sync_to_async(report_vote_latency)(question, elapsed_ms)
+
+
+def add_direct_vote(question_id: int, choice_id: int) -> None:
+    """
+    Count one vote on the choice and its question's total.
+    """
+    # Use F() to avoid race conditions
+    with transaction.atomic():
+        Choice.objects.filter(pk=choice_id).update(votes=F("votes") + 1)
+        Question.objects.filter(pk=question_id).update(vote_count=F("vote_count") + 1)
+    if settings.ENABLE_VOTE_TIMESERIES or settings.ENABLE_TRENDING:
+        # written in batches, the hot bucket and score rows are not locked
+        # by every vote
+        get_vote_series_buffer().add(question_id, choice_id, timezone.now())
+
+
+def get_shard_key(request: HttpRequest | None) -> str | None:
+    """
+    Use the session, falling back to the client address, so one voter keeps
+    hitting the same shard.
+    """
+    if request is None:
+        return None
+    session = getattr(request, "session", None)
+    if session is not None and session.session_key:
+        return session.session_key
+    return request.META.get("REMOTE_ADDR")
+
+
+def pick_shard(shard_count: int, key: str | None = None) -> int:
+    """
+    Pick a shard by hashing `key`, or randomly when there is no key.
+    """
+    if key is None:
+        return random.randrange(shard_count)
+    return zlib.crc32(key.encode()) % shard_count
+
+
+def add_sharded_vote(choice_id: int, shard: int, count: int = 1) -> None:
+    """
+    Add votes to a counter shard, creating the shard row on first use.
+    """
+    shards = ChoiceVoteShard.objects.filter(choice_id=choice_id, shard=shard)
+    if shards.update(votes=F("votes") + count):
+        return
+
+    ChoiceVoteShard.objects.get_or_create(choice_id=choice_id, shard=shard)
+    shards.update(votes=F("votes") + count)
+
+
+async def aadd_sharded_vote(choice_id: int, shard: int, count: int = 1) -> None:
+    """
+    Async `add_sharded_vote`.
+    """
+    shards = ChoiceVoteShard.objects.filter(choice_id=choice_id, shard=shard)
+    if await shards.aupdate(votes=F("votes") + count):
+        return
+
+    await ChoiceVoteShard.objects.aget_or_create(choice_id=choice_id, shard=shard)
+    await shards.aupdate(votes=F("votes") + count)
+
+
+def report_vote_latency(question: Question, elapsed_ms: float) -> None:
+    """
+    Count votes slowed down by lock waits, and double the question's shard
+    count once too many of them pile up inside the contention window.
+    """
+    if elapsed_ms < settings.VOTE_SHARD_CONTENTION_THRESHOLD_MS:
+        return
+
+    if question.vote_shard_count >= settings.VOTE_SHARD_MAX_COUNT:
+        return
+
+    key = f"polls:vote_contention:{question.pk}"
+    cache.add(key, 0, settings.VOTE_SHARD_CONTENTION_WINDOW)
+    if cache.incr(key) < settings.VOTE_SHARD_CONTENTION_LIMIT:
+        return
+
+    cache.delete(key)
+    shard_count = min(question.vote_shard_count * 2, settings.VOTE_SHARD_MAX_COUNT)
+    grown = Question.objects.filter(
+        pk=question.pk, vote_shard_count=question.vote_shard_count
+    ).update(vote_shard_count=shard_count)
+    if grown:
+        msg = f"Grew vote shards of question {question.pk} to {shard_count}"
+        logger.info(msg)
+
+
+def compact_vote_shards() -> int:
+    """
+    Fold counter shards back into `Choice.votes`.
+    Returns the number of votes compacted.
+    """
+    with transaction.atomic():
+        shards = list(
+            ChoiceVoteShard.objects.select_for_update()
+            .exclude(votes=0)
+            .values_list("pk", "choice_id", "votes")
+        )
+        if not shards:
+            return 0
+
+        deltas: Counter[int] = Counter()
+        for _, choice_id, votes in shards:
+            deltas[choice_id] += votes
+        # shard votes land in the time series when compacted
+        Choice.objects.add_votes(deltas, cast_at=timezone.now())
+
+        # subtract what was folded rather than zeroing the rows
+        for start in range(0, len(shards), settings.BATCH_SIZE):
+            folded = {
+                pk: votes
+                for pk, _, votes in shards[start : start + settings.BATCH_SIZE]
+            }
+            ChoiceVoteShard.objects.filter(pk__in=folded).update(
+                votes=F("votes") - delta_case(folded)
+            )
+
+    return sum(deltas.values())